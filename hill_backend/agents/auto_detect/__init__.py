@@ -12,7 +12,6 @@ async def run_auto_detection(file_id: str, description: str = "Auto-detection re
     import os
     import json
     import pandas as pd
-    from bson.objectid import ObjectId
     from dotenv import load_dotenv
     from pathlib import Path
 
@@ -20,14 +19,15 @@ async def run_auto_detection(file_id: str, description: str = "Auto-detection re
     
     try:
         # Import database functions
-        from database import get_db, get_data_folder_path
+        from database import get_data_folder_path
+        from repositories import files_repo, projects_repo
+        from services import run_io, get_data_reader
         
         # Load file data and project information
-        db = get_db()
         data_folder_path = get_data_folder_path()
         
         # Get file info
-        file_info = db['files'].find_one({'_id': ObjectId(file_id)})
+        file_info = await files_repo.get(file_id)
         if not file_info:
             if notification_callback:
                 await notification_callback(file_id, {
@@ -36,7 +36,7 @@ async def run_auto_detection(file_id: str, description: str = "Auto-detection re
                 })
             return {'success': False, 'error': 'File not found'}
         
-        if not file_info.get('jsonPath'):
+        if not file_info.get('binaryPath'):
             if notification_callback:
                 await notification_callback(file_id, {
                     'type': 'detection_failed', 
@@ -44,49 +44,22 @@ async def run_auto_detection(file_id: str, description: str = "Auto-detection re
                 })
             return {'success': False, 'error': 'No data file available'}
         
-        # Load the time series data
-        json_path = file_info['jsonPath']
-        file_path = f'{data_folder_path}/{json_path}'
-        
-        with open(file_path, 'r') as f:
-            data_json = json.load(f)
+        # Load the time series data from the binary store
+        reader = await run_io(
+            get_data_reader,
+            f'{data_folder_path}/{file_info["binaryPath"]}',
+            f'{data_folder_path}/{file_info["metaPath"]}'
+        )
+        data, _ = await run_io(reader.get_full_data)
         
-        # Convert to DataFrame for analysis
-        if isinstance(data_json, list):
-            df_data = {}
-            x_axis_data = None
-            x_axis_name = None
-            
-            for channel in data_json:
-                if isinstance(channel, dict) and 'name' in channel and 'data' in channel:
-                    channel_name = channel['name']
-                    channel_data = channel['data']
-                    
-                    if channel.get('x', False):
-                        x_axis_data = channel_data
-                        x_axis_name = channel_name
-                    else:
-                        df_data[channel_name] = channel_data
-            
-            if x_axis_data and len(df_data) > 0:
-                max_len = max(len(values) for values in df_data.values())
-                for channel_name, values in df_data.items():
-                    if len(values) < max_len:
-                        df_data[channel_name] = values + [None] * (max_len - len(values))
-                    elif len(values) > max_len:
-                        df_data[channel_name] = values[:max_len]
-                
-                df = pd.DataFrame(df_data)
-            else:
-                df = pd.DataFrame(df_data)
-        else:
-            df = pd.DataFrame(data_json)
+        # One column per channel, as the detection agents expect
+        df = pd.DataFrame(data[:, 1:], columns=[channel['name'] for channel in reader.channels])
         
         # Get project info
-        folder_info = db['folders'].find_one({'fileList': file_id})
+        refs = await files_repo.get_refs(file_info)
         project_info = None
-        if folder_info:
-            project_info = db['projects'].find_one({'_id': ObjectId(folder_info['project']['id'])})
+        if refs:
+            project_info = await projects_repo.get(refs['projectId'])
         
         # Create event patterns dictionary from project classes
         event_patterns = {}
@@ -384,22 +384,14 @@ class AgentCoordinator:
     async def _save_detected_events(self, detected_events: List[Dict]):
         """Save the detected events to the database"""
         try:
-            from database import get_db
-            from datetime import datetime, timezone
-            from bson.objectid import ObjectId
-            
-            db = get_db()
+            from repositories import files_repo, labels_repo
             
             # Get current label info
             # First, find the file info to get the label ID
-            file_info = db['files'].find_one({'_id': ObjectId(self.file_id)})
+            file_info = await files_repo.get(self.file_id)
             if not file_info:
                 raise ValueError("File not found")
                 
-            label_info = db['labels'].find_one({'_id': ObjectId(file_info['label'])})
-            if not label_info:
-                raise ValueError("Label not found")
-            
             # Convert detected events to database format
             new_events = []
             for event in detected_events:
@@ -416,26 +408,12 @@ class AgentCoordinator:
                 }
                 new_events.append(new_event)
             
-            # Add events to existing events
-            if 'events' not in label_info:
-                label_info['events'] = []
-            
-            label_info['events'].extend(new_events)
-            
-            # Update database
-            db['labels'].update_one(
-                {'_id': ObjectId(file_info['label'])},
-                {'$set': {'events': label_info['events']}}
-            )
+            # Append the events to the label (only the new events are written)
+            if not await labels_repo.push_items(file_info['label'], 'events', new_events):
+                raise ValueError("Label not found")
             
-            # Update file metadata
-            db['files'].update_one(
-                {'_id': ObjectId(self.file_id)},
-                {'$set': {
-                    'lastModifier': 'AI Multi-Agent',
-                    'lastUpdate': datetime.now(tz=timezone.utc)
-                }}
-            )
+            # Update file event count and metadata
+            await files_repo.adjust_event_counts(file_info['label'], {'AI Multi-Agent': len(new_events)}, 'AI Multi-Agent')
             
             await self.send_notification('events_saved', {
                 'message': f'Successfully saved {len(new_events)} auto-detected events',
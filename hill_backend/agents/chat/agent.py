@@ -1,9 +1,9 @@
 import os
 import json
+import asyncio
 from datetime import datetime, timezone
 from typing import Optional, Type
 from pydantic import BaseModel, Field
-from bson.objectid import ObjectId
 from langchain_openai import AzureChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from langchain_core.tools import BaseTool
@@ -34,6 +34,25 @@ def set_current_user(user_name: str):
     global current_user_name
     current_user_name = user_name or "AI Assistant"
 
+# Event loop the async database client runs on, set when a response is generated
+app_event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_tool_sync(coro) -> str:
+    """Run an async tool from a sync call (invoke): on the app's event loop from another thread, else in a new loop"""
+    loop = app_event_loop
+    if loop is None or not loop.is_running():
+        return asyncio.run(coro)
+    try:
+        on_loop = asyncio.get_running_loop() is loop
+    except RuntimeError:
+        on_loop = False
+    if on_loop:
+        # Waiting here would block the loop the tool needs
+        coro.close()
+        return "Error: Tool called synchronously from the event loop, use ainvoke"
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
 # Store pending notifications to be sent by the websocket handler
 pending_notifications: dict[str, list[dict]] = {}
 
@@ -64,25 +83,27 @@ class AddEventTool(BaseTool):
     args_schema: Type[BaseModel] = AddEventInput
 
     def _run(self, class_name: str, start: float, end: float, description: str = "created with chat") -> str:
+        return run_tool_sync(self._arun(class_name, start, end, description))
+
+    async def _arun(self, class_name: str, start: float, end: float, description: str = "created with chat") -> str:
         try:
             if not current_file_id:
                 return "Error: No file context available"
             
             # Import here to avoid circular imports
-            from database import get_db
-            db = get_db()
+            from repositories import files_repo, folders_repo, projects_repo, labels_repo
                 
             # Get file info and associated project
-            file_info = db['files'].find_one({'_id': ObjectId(current_file_id)})
+            file_info = await files_repo.get(current_file_id)
             if not file_info:
                 return "Error: File not found"
                 
-            # Get folder and project info to validate class
-            folder_info = db['folders'].find_one({'fileList': current_file_id})
-            if not folder_info:
+            # Get project info to validate class
+            refs = await files_repo.get_refs(file_info)
+            if not refs:
                 return "Error: Folder not found"
                 
-            project_info = db['projects'].find_one({'_id': ObjectId(folder_info['project']['id'])})
+            project_info = await projects_repo.get(refs['projectId'])
             if not project_info:
                 return "Error: Project not found"
                 
@@ -94,11 +115,6 @@ class AddEventTool(BaseTool):
             # Get class info
             class_info = next((cls for cls in project_info['classes'] if cls['name'] == class_name), None)
             
-            # Get current label
-            label_info = db['labels'].find_one({'_id': ObjectId(file_info['label'])})
-            if not label_info:
-                return "Error: Label not found"
-                
             # Create new event
             labeler_name = current_user_name or 'AI Assistant'
             print(f"Creating event with labeler: {labeler_name}")
@@ -113,39 +129,16 @@ class AddEventTool(BaseTool):
                 'hide': False
             }
             
-            # Add event to label
-            if 'events' not in label_info:
-                label_info['events'] = []
-            label_info['events'].append(new_event)
-            
-            # Update database
-            db['labels'].update_one(
-                {'_id': ObjectId(file_info['label'])},
-                {'$set': {'events': label_info['events']}}
-            )
+            # Append the event to the label (only the new event is written)
+            if not await labels_repo.push_items(file_info['label'], 'events', [new_event]):
+                return "Error: Label not found"
             
             # Update file event count
-            events = label_info['events']
-            if len(events) == 0:
-                new_nb_events = '0'
-            else:
-                labelers = list(set([e['labeler'] for e in events]))
-                new_nb_events = ''
-                for labeler in labelers:
-                    events_labeler = [e for e in events if e['labeler'] == labeler]
-                    new_nb_events += f'{len(events_labeler)} by {labeler};'
-                new_nb_events = new_nb_events.rstrip(';')
-                
             last_modifier = current_user_name or 'AI Assistant'
             print(f"Updating file with lastModifier: {last_modifier}")
-            db['files'].update_one(
-                {'_id': ObjectId(current_file_id)},
-                {'$set': {
-                    'nbEvent': new_nb_events,
-                    'lastModifier': last_modifier,
-                    'lastUpdate': datetime.now(tz=timezone.utc).isoformat()
-                }}
-            )
+            result = await files_repo.adjust_event_counts(file_info['label'], {labeler_name: 1}, last_modifier)
+            if result is not None and result[1] == 'unlabeled':
+                await folders_repo.count_labeled_file(refs['folderId'])
             
             # Queue WebSocket notification to frontend
             queue_websocket_notification(current_file_id, {
@@ -167,24 +160,21 @@ class AddGuidelineTool(BaseTool):
     args_schema: Type[BaseModel] = AddGuidelineInput
 
     def _run(self, channel_name: str, value: float, description: str = "created with chat") -> str:
+        return run_tool_sync(self._arun(channel_name, value, description))
+
+    async def _arun(self, channel_name: str, value: float, description: str = "created with chat") -> str:
         try:
             if not current_file_id:
                 return "Error: No file context available"
             
             # Import here to avoid circular imports
-            from database import get_db
-            db = get_db()
+            from repositories import files_repo, labels_repo
                 
             # Get file info
-            file_info = db['files'].find_one({'_id': ObjectId(current_file_id)})
+            file_info = await files_repo.get(current_file_id)
             if not file_info:
                 return "Error: File not found"
                 
-            # Get current label
-            label_info = db['labels'].find_one({'_id': ObjectId(file_info['label'])})
-            if not label_info:
-                return "Error: Label not found"
-                
             # Create new guideline
             new_guideline = {
                 'yaxis': 'y',  # Default to primary y-axis
@@ -194,16 +184,9 @@ class AddGuidelineTool(BaseTool):
                 'hide': False
             }
             
-            # Add guideline to label
-            if 'guidelines' not in label_info:
-                label_info['guidelines'] = []
-            label_info['guidelines'].append(new_guideline)
-            
-            # Update database
-            db['labels'].update_one(
-                {'_id': ObjectId(file_info['label'])},
-                {'$set': {'guidelines': label_info['guidelines']}}
-            )
+            # Append the guideline to the label (only the new guideline is written)
+            if not await labels_repo.push_items(file_info['label'], 'guidelines', [new_guideline]):
+                return "Error: Label not found"
             
             # Queue WebSocket notification to frontend
             queue_websocket_notification(current_file_id, {
@@ -223,21 +206,19 @@ class AddGuidelineTool(BaseTool):
 async def get_project_context(file_id: str) -> str:
     """Get project context including classes and data channels for the current file"""
     try:
-        from database import get_db, get_data_folder_path
-        db = get_db()
-        data_folder_path = get_data_folder_path()
+        from repositories import files_repo, projects_repo
         
         # Get file info
-        file_info = db['files'].find_one({'_id': ObjectId(file_id)})
+        file_info = await files_repo.get(file_id)
         if not file_info:
             return "File not found"
             
-        # Get folder and project info
-        folder_info = db['folders'].find_one({'fileList': file_id})
-        if not folder_info:
+        # Get project info
+        refs = await files_repo.get_refs(file_info)
+        if not refs:
             return "Folder not found"
             
-        project_info = db['projects'].find_one({'_id': ObjectId(folder_info['project']['id'])})
+        project_info = await projects_repo.get(refs['projectId'])
         if not project_info:
             return "Project not found"
             
@@ -254,28 +235,15 @@ Available Event Classes:
                 context += f": {cls['description']}"
             context += "\n"
             
-        # Get data channels from file data
-        if file_info and file_info.get('jsonPath'):
-            try:
-                json_path = file_info['jsonPath']
-                file_path = f'{data_folder_path}/{json_path}'
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    
-                context += "\nAvailable Data Channels:\n"
-                if isinstance(data, list):
-                    for channel in data:
-                        if isinstance(channel, dict) and 'name' in channel:
-                            context += f"- {channel['name']}"
-                            if channel.get('unit'):
-                                context += f" ({channel['unit']})"
-                            context += "\n"
-                elif isinstance(data, dict):
-                    # If data is a dict, try to extract channel names from keys
-                    for key in data.keys():
-                        context += f"- {key}\n"
-            except Exception as e:
-                context += f"\nNote: Could not load data channels ({str(e)})\n"
+        # Data channels from the file's column headers (x first)
+        columns = file_info.get('columns')
+        if columns:
+            context += "\nAvailable Data Channels:\n"
+            for column in columns[1:]:
+                context += f"- {column['name']}"
+                if column.get('unit'):
+                    context += f" ({column['unit']})"
+                context += "\n"
                 
         return context
     except Exception as e:
@@ -283,7 +251,9 @@ Available Event Classes:
 
 async def generate_ai_response(messages: list[dict], file_id: str) -> str:
     """Generate AI response using Azure OpenAI via LangChain with tools"""
-    global current_file_id, current_user_name
+    global current_file_id, current_user_name, app_event_loop
+    
+    app_event_loop = asyncio.get_running_loop()
     
     try:
         # Debug: Print the messages structure
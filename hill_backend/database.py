@@ -2,31 +2,64 @@
 Database Connection
 Simplified database module - only connection management
 """
-import pymongo
-from bson.json_util import dumps
-from bson.objectid import ObjectId
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
 
 from config import settings
+from indexes import audit_queries, ensure_indexes
 
 # Global database connection
+_client = None
 _db = None
 
 
-def init_database():
-    """Initialize database connection and create indexes"""
-    global _db
+def init_database() -> AsyncDatabase:
+    """
+    Create the async MongoDB client.
 
-    client = pymongo.MongoClient(settings.MONGODB_URL)
-    _db = client[settings.DATABASE_NAME]
+    The client connects lazily, so this does no I/O; the pool is sized and
+    timed out from settings so that a slow or unreachable server fails
+    requests quickly instead of piling them up on the event loop.
+    """
+    global _client, _db
 
-    # Create indexes for conversations
-    _db['chat_conversations'].create_index('fileId', unique=True)
-    _db['auto_detection_conversations'].create_index('fileId', unique=True)
+    _client = AsyncMongoClient(
+        settings.MONGODB_URL,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+        serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+    )
+    _db = _client[settings.DATABASE_NAME]
 
     return _db
 
 
-def get_db():
+async def create_indexes():
+    """
+    Create the registered indexes (see indexes.py).
+
+    With MONGO_AUDIT_QUERIES set, the hot lookups are then explained and
+    any that still scan a whole collection are logged as warnings.
+    """
+    db = get_db()
+    await ensure_indexes(db)
+    if settings.MONGO_AUDIT_QUERIES:
+        await audit_queries(db)
+
+
+async def close_database():
+    """Close the client and its connection pool"""
+    global _client, _db
+    if _client is not None:
+        await _client.close()
+    _client = None
+    _db = None
+
+
+def get_db() -> AsyncDatabase:
     """Get database instance"""
     global _db
     if _db is None:
@@ -0,0 +1,129 @@
+"""
+Index Registry
+Indexes the hot lookups need, and a query-plan audit of those lookups
+
+The same registry lives in hill_workers/indexes.py; keep the two in sync so
+that whichever service starts first creates every index.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+from bson.objectid import ObjectId
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Placeholder ID used in audited filters (plans do not depend on the value)
+_SAMPLE_ID = '000000000000000000000000'
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """One index of one collection"""
+    collection: str
+    keys: tuple[tuple[str, int], ...]
+    unique: bool = False
+
+    @property
+    def name(self) -> str:
+        """Index name, as MongoDB derives it from the keys."""
+        return '_'.join(f'{key}_{direction}' for key, direction in self.keys)
+
+
+@dataclass(frozen=True)
+class AuditQuery:
+    """A hot lookup whose query plan is checked in audit mode"""
+    name: str
+    collection: str
+    filter: dict[str, Any] = field(default_factory=dict)
+
+
+INDEXES: list[IndexSpec] = [
+    # Folder of a file: parser, label saves, file deletion, chat tools, auto-detection
+    IndexSpec('folders', (('fileList', 1),)),
+    # File of a label: every label save
+    IndexSpec('files', (('label', 1),)),
+    # Login and folder sharing
+    IndexSpec('users', (('mail', 1),)),
+    IndexSpec('users', (('folderList', 1),)),
+    # One conversation per file
+    IndexSpec('chat_conversations', (('fileId', 1),), unique=True),
+    IndexSpec('auto_detection_conversations', (('fileId', 1),), unique=True),
+    # Sweep of expired resumable upload sessions
+    IndexSpec('uploads', (('expiresAt', 1),)),
+]
+
+AUDIT_QUERIES: list[AuditQuery] = [
+    AuditQuery('folder by file', 'folders', {'fileList': _SAMPLE_ID}),
+    AuditQuery('file by label', 'files', {'label': _SAMPLE_ID}),
+    AuditQuery('label by id', 'labels', {'_id': ObjectId(_SAMPLE_ID)}),
+    AuditQuery('user by mail', 'users', {'mail': ''}),
+    AuditQuery('users by folder', 'users', {'folderList': _SAMPLE_ID}),
+    AuditQuery('chat conversation by file', 'chat_conversations', {'fileId': _SAMPLE_ID}),
+    AuditQuery('detection conversation by file', 'auto_detection_conversations', {'fileId': _SAMPLE_ID}),
+]
+
+
+async def ensure_indexes(db: AsyncDatabase) -> list[str]:
+    """
+    Create the registered indexes (existing ones are left as they are).
+
+    An index that cannot be built, e.g. a unique index over duplicated data,
+    is logged and skipped so that startup still succeeds.
+
+    Args:
+        db: Database to index
+
+    Returns:
+        Names ("collection.index") of the indexes that exist afterwards
+    """
+    created = []
+    for spec in INDEXES:
+        try:
+            await db[spec.collection].create_index(list(spec.keys), name=spec.name, unique=spec.unique)
+            created.append(f'{spec.collection}.{spec.name}')
+        except OperationFailure as e:
+            logger.error(f"Could not create index {spec.collection}.{spec.name}: {e}")
+    logger.info(f"Indexes ready: {', '.join(created)}")
+    return created
+
+
+def _plan_stages(plan: dict[str, Any]) -> list[str]:
+    """Stage names of a winning plan, outermost first."""
+    stages = [plan.get('stage', '')]
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            stages += _plan_stages(plan[key])
+    for child in plan.get('inputStages', []):
+        stages += _plan_stages(child)
+    return stages
+
+
+async def audit_queries(db: AsyncDatabase) -> list[dict[str, Any]]:
+    """
+    Explain the registered hot lookups and flag collection scans.
+
+    Args:
+        db: Database to audit
+
+    Returns:
+        One entry per query: name, collection, filter, plan stages and
+        whether the plan scans the whole collection
+    """
+    results = []
+    for query in AUDIT_QUERIES:
+        explain = await db[query.collection].find(query.filter).explain()
+        stages = _plan_stages(explain.get('queryPlanner', {}).get('winningPlan', {}))
+        collscan = 'COLLSCAN' in stages
+        if collscan:
+            logger.warning(f"Query '{query.name}' scans the whole '{query.collection}' collection: {query.filter}")
+        results.append({
+            'name': query.name,
+            'collection': query.collection,
+            'filter': query.filter,
+            'stages': stages,
+            'collscan': collscan,
+        })
+    return results
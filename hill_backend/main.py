@@ -2,14 +2,19 @@
 Hill Sequence Backend v1.5
 Refactored backend with clean route organization
 """
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi import Request
 
 from config import settings
-from database import init_database
+from database import init_database, create_indexes, close_database
 from redis_client import init_redis
+from services import shutdown_executors
 
 # Import route modules
 from routes import (
@@ -27,11 +32,39 @@ from routes import (
 from ws_handlers.chat import handle_websocket as handle_chat_ws
 from ws_handlers.auto_detect import handle_websocket as handle_auto_detect_ws
 
+logger = logging.getLogger(__name__)
+
+# Interval between sweeps of expired resumable upload sessions
+UPLOAD_SWEEP_INTERVAL_SECONDS = 600
+
+
+async def sweep_uploads_periodically():
+    """Delete expired resumable upload sessions and their partial files, every UPLOAD_SWEEP_INTERVAL_SECONDS"""
+    while True:
+        try:
+            await files.sweep_expired_uploads()
+        except Exception as e:
+            logger.error(f"Upload sweep failed: {e}")
+        await asyncio.sleep(UPLOAD_SWEEP_INTERVAL_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create indexes and start the upload sweep on startup; stop it and close the database pool and executor pools on shutdown"""
+    await create_indexes()
+    sweeper = asyncio.create_task(sweep_uploads_periodically())
+    yield
+    sweeper.cancel()
+    await close_database()
+    shutdown_executors()
+
+
 # Initialize app
 app = FastAPI(
     title="Hill Sequence Backend",
     description="Time series data labeling platform",
-    version="2.0.10"
+    version="2.0.10",
+    lifespan=lifespan
 )
 
 
@@ -64,7 +97,12 @@ app.add_middleware(
         "X-X-Max",
         "X-Channel-Names",
         "X-X-Type",
-        "X-X-Format"
+        "X-X-Format",
+        "X-Tile-Level",
+        "X-Tile-Index",
+        "X-Encoding",
+        "X-Compression",
+        "ETag"
     ],
 )
 
@@ -76,7 +114,7 @@ app.add_middleware(LargeFileMiddleware)
 # Database & Redis Initialization
 # ============================================================================
 
-# Initialize database on startup
+# Create the async database client (connects lazily; indexes are created in lifespan)
 db = init_database()
 
 # Initialize Redis on startup
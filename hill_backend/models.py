@@ -71,7 +71,9 @@ class FileModel(BaseModel):
     nbEvent: str  # "unlabeled" | "3 by Alice; 2 by Bob"
     description: str
     rawPath: str
-    jsonPath: str
+    rawSize: Optional[int] = None  # Bytes of the raw upload
+    sha256: Optional[str] = None  # SHA-256 (hex) of the raw upload
+    jsonPath: Optional[str] = None  # Only set when the parser writes the full JSON export
     label: str  # ObjectId as string
     lastModifier: str
     chatConversationId: str = None  # ObjectId of chat conversation
@@ -90,6 +92,7 @@ class FolderModel(BaseModel):
 
 class LabelEvent(BaseModel):
     """Event in a label"""
+    id: Optional[str] = None  # Stable ID used by the per-event endpoints
     className: str
     color: str
     description: str
@@ -101,6 +104,7 @@ class LabelEvent(BaseModel):
 
 class LabelGuideline(BaseModel):
     """Guideline in a label"""
+    id: Optional[str] = None  # Stable ID used by the per-guideline endpoints
     yaxis: str
     y: str | int | float
     channelName: str
@@ -254,6 +258,18 @@ class UpdateLabelRequest(BaseModel):
     user: str
 
 
+class AddLabelItemRequest(BaseModel):
+    """Add one event or guideline to a label"""
+    item: dict
+    user: str
+
+
+class UpdateLabelItemRequest(BaseModel):
+    """Change fields of one event or guideline"""
+    changes: dict
+    user: str
+
+
 class UpdateUserRecentFilesRequest(BaseModel):
     """Update user's recent files"""
     folderId: str
@@ -275,6 +291,14 @@ class DownloadJsonFilesRequest(BaseModel):
     passwd: str
 
 
+class InitiateUploadRequest(BaseModel):
+    """Start a resumable upload of one file"""
+    folderId: str
+    user: str
+    name: str
+    size: int
+
+
 class ReparsingFilesRequest(BaseModel):
     """Trigger file reparsing"""
     folderId: str
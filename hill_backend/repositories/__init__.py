@@ -0,0 +1,53 @@
+"""
+Repositories
+Async, per-collection access to MongoDB
+"""
+
+from .base import Document, Repository, to_object_id
+from .files import FileRepository, folder_refs, count_events, format_event_counts, parse_event_counts
+from .labels import LabelRepository, assign_ids
+from .folders import FolderRepository
+from .projects import ProjectRepository
+from .templates import TemplateRepository
+from .users import UserRepository
+from .conversations import ChatConversationRepository, DetectionConversationRepository
+from .uploads import UploadRepository
+
+files_repo = FileRepository()
+labels_repo = LabelRepository()
+folders_repo = FolderRepository()
+projects_repo = ProjectRepository()
+templates_repo = TemplateRepository()
+users_repo = UserRepository()
+chat_conversations_repo = ChatConversationRepository()
+detection_conversations_repo = DetectionConversationRepository()
+uploads_repo = UploadRepository()
+
+__all__ = [
+    'Document',
+    'Repository',
+    'to_object_id',
+    'folder_refs',
+    'count_events',
+    'format_event_counts',
+    'parse_event_counts',
+    'assign_ids',
+    'FileRepository',
+    'LabelRepository',
+    'FolderRepository',
+    'ProjectRepository',
+    'TemplateRepository',
+    'UserRepository',
+    'ChatConversationRepository',
+    'DetectionConversationRepository',
+    'UploadRepository',
+    'files_repo',
+    'labels_repo',
+    'folders_repo',
+    'projects_repo',
+    'templates_repo',
+    'users_repo',
+    'chat_conversations_repo',
+    'detection_conversations_repo',
+    'uploads_repo',
+]
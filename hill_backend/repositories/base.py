@@ -0,0 +1,108 @@
+"""
+Repository Base
+Shared async access to one MongoDB collection
+"""
+from typing import Any, Iterable, Optional, Union
+
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import BulkWriteError
+
+from database import get_db
+
+# Documents are returned as plain dicts, as stored
+Document = dict[str, Any]
+Id = Union[str, ObjectId]
+
+# Operations sent per bulk_write call
+BULK_WRITE_BATCH = 1000
+
+
+def to_object_id(id: Id) -> ObjectId:
+    """Convert a string ID to an ObjectId (ObjectIds pass through)."""
+    return id if isinstance(id, ObjectId) else ObjectId(id)
+
+
+class Repository:
+    """
+    Async access to one collection.
+
+    Subclasses set `collection_name` and add the queries their routes need.
+    The collection is resolved on every access, so repositories can be
+    created at import time, before the database client exists.
+    """
+    collection_name: str = ''
+
+    @property
+    def collection(self) -> AsyncCollection:
+        """The underlying collection."""
+        return get_db()[self.collection_name]
+
+    async def get(self, id: Id, projection: Optional[dict[str, Any]] = None) -> Optional[Document]:
+        """Get a document by ID, or None."""
+        return await self.collection.find_one({'_id': to_object_id(id)}, projection)
+
+    async def get_many(self, ids: Iterable[Id], projection: Optional[dict[str, Any]] = None) -> list[Document]:
+        """Get the documents with the given IDs (missing IDs are skipped, order is not kept)."""
+        cursor = self.collection.find({'_id': {'$in': [to_object_id(id) for id in ids]}}, projection)
+        return await cursor.to_list()
+
+    async def insert(self, document: Document) -> ObjectId:
+        """Insert a document and return its ID."""
+        result = await self.collection.insert_one(document)
+        return result.inserted_id
+
+    async def update(self, id: Id, update: dict[str, Any]) -> int:
+        """Apply an update document to one document; returns the matched count."""
+        result = await self.collection.update_one({'_id': to_object_id(id)}, update)
+        return result.matched_count
+
+    def set_update(self, fields: dict[str, Any]) -> dict[str, Any]:
+        """Update document used by `set` and `bulk_set` (subclasses may add operators)."""
+        return {'$set': fields}
+
+    async def set(self, id: Id, fields: dict[str, Any]) -> int:
+        """Set fields of one document; returns the matched count."""
+        return await self.update(id, self.set_update(fields))
+
+    async def bulk_set(self, updates: list[tuple[Id, dict[str, Any]]]) -> list[Optional[str]]:
+        """
+        Set fields of many documents with ordered bulk writes.
+
+        Updates are sent in batches of `BULK_WRITE_BATCH`. An ordered batch
+        stops at its first failing write; that write is reported and the rest
+        of the batch is sent again, so one bad document does not drop others.
+
+        Args:
+            updates: (document ID, fields to set) pairs
+
+        Returns:
+            One entry per update: None if it was applied, else the error message
+        """
+        errors: list[Optional[str]] = [None] * len(updates)
+        for start in range(0, len(updates), BULK_WRITE_BATCH):
+            pending = list(range(start, min(start + BULK_WRITE_BATCH, len(updates))))
+            while pending:
+                operations = [
+                    UpdateOne({'_id': to_object_id(updates[i][0])}, self.set_update(updates[i][1]))
+                    for i in pending
+                ]
+                try:
+                    await self.collection.bulk_write(operations, ordered=True)
+                    pending = []
+                except BulkWriteError as e:
+                    write_error = e.details['writeErrors'][0]
+                    errors[pending[write_error['index']]] = write_error.get('errmsg', 'Write failed')
+                    pending = pending[write_error['index'] + 1:]
+        return errors
+
+    async def delete(self, id: Id) -> int:
+        """Delete a document; returns the deleted count."""
+        result = await self.collection.delete_one({'_id': to_object_id(id)})
+        return result.deleted_count
+
+    async def delete_many(self, ids: Iterable[Id]) -> int:
+        """Delete the documents with the given IDs; returns the deleted count."""
+        result = await self.collection.delete_many({'_id': {'$in': [to_object_id(id) for id in ids]}})
+        return result.deleted_count
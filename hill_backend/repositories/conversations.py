@@ -0,0 +1,99 @@
+"""
+Conversation Repositories
+Chat and auto-detection conversations, one document per file
+"""
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from .base import Document, Repository
+
+
+def _now() -> str:
+    return datetime.now(tz=timezone.utc).isoformat()
+
+
+class ConversationRepository(Repository):
+    """Access to a collection of per-file conversations, keyed by `fileId`"""
+
+    # Fields of a new conversation besides fileId, messages and timestamps
+    initial_fields: dict[str, Any] = {}
+
+    async def find_by_file(self, file_id: str) -> Optional[Document]:
+        """Get the conversation of a file."""
+        return await self.collection.find_one({'fileId': file_id})
+
+    async def create(self, file_id: str) -> Document:
+        """Insert an empty conversation for a file and return it (with `_id`)."""
+        conversation = {
+            'fileId': file_id,
+            'messages': [],
+            **self.initial_fields,
+            'createdAt': _now(),
+            'updatedAt': _now()
+        }
+        conversation['_id'] = await self.insert(conversation)
+        return conversation
+
+    async def get_or_create(self, file_id: str) -> Document:
+        """Get the conversation of a file, creating an empty one if needed."""
+        conversation = await self.find_by_file(file_id)
+        if conversation is None:
+            conversation = await self.create(file_id)
+        return conversation
+
+    async def delete_by_file(self, file_id: str) -> int:
+        """Delete the conversation of a file; returns the deleted count."""
+        result = await self.collection.delete_one({'fileId': file_id})
+        return result.deleted_count
+
+    async def push_message(self, file_id: str, message: dict[str, Any], fields: Optional[dict[str, Any]] = None) -> int:
+        """
+        Append a message and touch `updatedAt`.
+
+        Args:
+            file_id: File ID
+            message: Message to append
+            fields: Other fields to set in the same update
+
+        Returns:
+            Matched count
+        """
+        result = await self.collection.update_one(
+            {'fileId': file_id},
+            {'$push': {'messages': message}, '$set': {**(fields or {}), 'updatedAt': _now()}}
+        )
+        return result.matched_count
+
+    async def set_fields(self, file_id: str, fields: dict[str, Any], upsert: bool = False) -> int:
+        """Set fields and touch `updatedAt`; returns the matched count."""
+        result = await self.collection.update_one(
+            {'fileId': file_id},
+            {'$set': {**fields, 'updatedAt': _now()}},
+            upsert=upsert
+        )
+        return result.matched_count
+
+
+class ChatConversationRepository(ConversationRepository):
+    """Access to the `chat_conversations` collection"""
+    collection_name = 'chat_conversations'
+
+
+class DetectionConversationRepository(ConversationRepository):
+    """Access to the `auto_detection_conversations` collection"""
+    collection_name = 'auto_detection_conversations'
+    # idle, started, running, completed, failed, cancelled
+    initial_fields = {'status': 'idle'}
+
+    async def restart(self, file_id: str) -> Optional[Document]:
+        """Clear the messages of a file's conversation for a new run (creating it if needed) and return it."""
+        await self.set_fields(
+            file_id,
+            {'fileId': file_id, 'messages': [], 'status': 'started', 'createdAt': _now()},
+            upsert=True
+        )
+        return await self.find_by_file(file_id)
+
+    async def set_status(self, file_id: str, status: str) -> int:
+        """Set the run status; returns the matched count."""
+        return await self.set_fields(file_id, {'status': status})
@@ -0,0 +1,179 @@
+"""
+File Repository
+File documents: parsing status, data paths and label summary
+"""
+from datetime import datetime, timezone
+from typing import Any, Iterable, Mapping, Optional
+
+from .base import Document, Id, Repository, to_object_id
+
+# Attempts at a compare-and-set of `nbEvent` before falling back to a recount
+_EVENT_COUNT_RETRIES = 5
+
+# References to the folder, project and template a file belongs to
+REF_FIELDS = ('folderId', 'projectId', 'templateId')
+
+
+def folder_refs(folder: Document) -> Document:
+    """The `REF_FIELDS` of the files of a folder."""
+    return {
+        'folderId': str(folder['_id']),
+        'projectId': folder['project']['id'],
+        'templateId': folder['template']['id'],
+    }
+
+
+def count_events(events: Iterable[dict[str, Any]]) -> dict[str, int]:
+    """Number of events per labeler, in order of first appearance."""
+    counts: dict[str, int] = {}
+    for event in events:
+        counts[event['labeler']] = counts.get(event['labeler'], 0) + 1
+    return counts
+
+
+def format_event_counts(counts: Mapping[str, int]) -> str:
+    """`nbEvent` display of per-labeler counts, like '3 by Alice;2 by Bob' ('0' if empty)."""
+    parts = [f'{count} by {labeler}' for labeler, count in counts.items() if count > 0]
+    return ';'.join(parts) if parts else '0'
+
+
+def parse_event_counts(display: str) -> Optional[dict[str, int]]:
+    """Per-labeler counts of an `nbEvent` display, or None if it cannot be parsed."""
+    if display in ('unlabeled', '0', ''):
+        return {}
+    counts: dict[str, int] = {}
+    for part in display.split(';'):
+        count, sep, labeler = part.strip().partition(' by ')
+        if not sep or not count.isdigit():
+            return None
+        counts[labeler] = counts.get(labeler, 0) + int(count)
+    return counts
+
+
+class FileRepository(Repository):
+    """Access to the `files` collection"""
+    collection_name = 'files'
+
+    async def get_refs(self, file_doc: Document) -> Optional[Document]:
+        """
+        Folder, project and template IDs of a file.
+
+        Files uploaded before the references were stored on the file document
+        are resolved through their folder once and updated, so later calls
+        are direct; `tools.backfill_file_refs` in the workers updates them all.
+
+        Args:
+            file_doc: File document
+
+        Returns:
+            Dict with `REF_FIELDS`, or None if no folder lists the file
+        """
+        if all(field in file_doc for field in REF_FIELDS):
+            return {field: file_doc[field] for field in REF_FIELDS}
+        folder = await self.collection.database['folders'].find_one(
+            {'fileList': str(file_doc['_id'])},
+            {'project': 1, 'template': 1}
+        )
+        if folder is None:
+            return None
+        refs = folder_refs(folder)
+        await self.set(file_doc['_id'], refs)
+        return refs
+
+    async def find_by_label(self, label_id: str) -> Optional[Document]:
+        """Get the file that owns a label."""
+        return await self.collection.find_one({'label': label_id})
+
+    async def set_label_summary(self, label_id: str, nb_event: str, modifier: str) -> int:
+        """
+        Record a label change on the file that owns the label.
+
+        Args:
+            label_id: Label ID
+            nb_event: Event count display (see `calculate_event_display`)
+            modifier: Name of the user who changed the label
+
+        Returns:
+            Matched count
+        """
+        result = await self.collection.update_one(
+            {'label': label_id},
+            {'$set': {
+                'nbEvent': nb_event,
+                'lastModifier': modifier,
+                'lastUpdate': datetime.now(tz=timezone.utc)
+            }}
+        )
+        return result.matched_count
+
+    async def adjust_event_counts(
+        self,
+        label_id: str,
+        changes: Mapping[str, int],
+        modifier: str
+    ) -> Optional[tuple[Document, str, str]]:
+        """
+        Apply per-labeler event count changes to the `nbEvent` of a label's file.
+
+        The display is parsed, adjusted and written back only if it has not
+        changed in the meantime (retried a few times), so an edit costs two
+        small round trips instead of reading the whole label. A display that
+        cannot be parsed, or keeps changing, is recounted from the label,
+        which must already include the change.
+
+        Args:
+            label_id: Label ID
+            changes: Labeler -> added (positive) or removed (negative) events
+            modifier: Name of the user who changed the label
+
+        Returns:
+            (file document before the change, previous display, new display),
+            or None if no file owns the label
+        """
+        for _ in range(_EVENT_COUNT_RETRIES):
+            file_doc = await self.collection.find_one({'label': label_id}, {'nbEvent': 1, **dict.fromkeys(REF_FIELDS, 1)})
+            if file_doc is None:
+                return None
+            previous = file_doc.get('nbEvent', 'unlabeled')
+            counts = parse_event_counts(previous)
+            if counts is None:
+                break
+            for labeler, change in changes.items():
+                counts[labeler] = counts.get(labeler, 0) + change
+            display = format_event_counts(counts)
+            result = await self.collection.update_one(
+                {'_id': file_doc['_id'], 'nbEvent': previous},
+                {'$set': {'nbEvent': display, 'lastModifier': modifier, 'lastUpdate': datetime.now(tz=timezone.utc)}}
+            )
+            if result.matched_count:
+                return file_doc, previous, display
+
+        label = await self.collection.database['labels'].find_one({'_id': to_object_id(label_id)}, {'events.labeler': 1})
+        display = format_event_counts(count_events(label.get('events', []) if label else []))
+        file_doc = await self.collection.find_one_and_update(
+            {'label': label_id},
+            {'$set': {'nbEvent': display, 'lastModifier': modifier, 'lastUpdate': datetime.now(tz=timezone.utc)}},
+            {'nbEvent': 1, **dict.fromkeys(REF_FIELDS, 1)}
+        )
+        if file_doc is None:
+            return None
+        return file_doc, file_doc.get('nbEvent', 'unlabeled'), display
+
+    async def count_labeled(self, ids: Iterable[Id]) -> int:
+        """Count the files among `ids` that have been labeled."""
+        return await self.collection.count_documents({
+            '_id': {'$in': [to_object_id(id) for id in ids]},
+            'nbEvent': {'$ne': 'unlabeled'}
+        })
+
+    async def set_parsing(self, ids: Iterable[Id], status: str) -> int:
+        """Set the parsing status of several files; returns the matched count."""
+        result = await self.collection.update_many(
+            {'_id': {'$in': [to_object_id(id) for id in ids]}},
+            {'$set': {'parsing': status}}
+        )
+        return result.matched_count
+
+    async def unset(self, id: Id, field: str) -> int:
+        """Remove a field from a file; returns the matched count."""
+        return await self.update(id, {'$unset': {field: ''}})
@@ -0,0 +1,33 @@
+"""
+Folder Repository
+Folder documents: file lists and labeling counters
+"""
+from .base import Id, Repository
+
+
+class FolderRepository(Repository):
+    """Access to the `folders` collection"""
+    collection_name = 'folders'
+
+    async def add_file(self, id: Id, file_id: str) -> int:
+        """Append a file to a folder; returns the matched count."""
+        return await self.update(id, {'$push': {'fileList': file_id}, '$inc': {'nbTotalFiles': 1}})
+
+    async def remove_file(self, id: Id, file_id: str, labeled: bool) -> int:
+        """
+        Remove a file from a folder.
+
+        Args:
+            id: Folder ID
+            file_id: File ID
+            labeled: Whether the file counted towards `nbLabeledFiles`
+
+        Returns:
+            Matched count
+        """
+        inc = {'nbTotalFiles': -1, 'nbLabeledFiles': -1} if labeled else {'nbTotalFiles': -1}
+        return await self.update(id, {'$pull': {'fileList': file_id}, '$inc': inc})
+
+    async def count_labeled_file(self, id: Id) -> int:
+        """Count one more labeled file in a folder; returns the matched count."""
+        return await self.update(id, {'$inc': {'nbLabeledFiles': 1}})
@@ -0,0 +1,152 @@
+"""
+Label Repository
+Label documents: the events and guidelines of one file
+"""
+import copy
+from typing import Any, Iterable, Optional
+
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+
+from .base import Document, Id, Repository, to_object_id
+
+
+def assign_ids(items: Iterable[dict[str, Any]]) -> int:
+    """
+    Give every event or guideline without one a stable `id`.
+
+    Args:
+        items: Events or guidelines (updated in place)
+
+    Returns:
+        Number of IDs assigned
+    """
+    assigned = 0
+    for item in items:
+        if not item.get('id'):
+            item['id'] = str(ObjectId())
+            assigned += 1
+    return assigned
+
+
+class LabelRepository(Repository):
+    """
+    Access to the `labels` collection.
+
+    Every write that changes events increments the label's `eventsVersion`,
+    which keeps cached event indexes valid without reading the events.
+    """
+    collection_name = 'labels'
+
+    def set_update(self, fields: dict[str, Any]) -> dict[str, Any]:
+        """Set fields, bumping `eventsVersion` when the events are among them."""
+        fields = {key: value for key, value in fields.items() if key != 'eventsVersion'}
+        update: dict[str, Any] = {'$set': fields}
+        if 'events' in fields:
+            update['$inc'] = {'eventsVersion': 1}
+        return update
+
+    @staticmethod
+    def _versioned(field: str, update: dict[str, Any]) -> dict[str, Any]:
+        """Add the `eventsVersion` increment to an update of `field`."""
+        if field == 'events':
+            update['$inc'] = {'eventsVersion': 1}
+        return update
+
+    async def get_events_version(self, id: Id) -> Optional[int]:
+        """Current `eventsVersion` of a label (0 if never counted), or None if it does not exist."""
+        label = await self.collection.find_one({'_id': to_object_id(id)}, {'eventsVersion': 1})
+        return label.get('eventsVersion', 0) if label is not None else None
+
+    async def get_events(self, id: Id) -> Optional[Document]:
+        """Get only the events and `eventsVersion` of a label."""
+        return await self.collection.find_one({'_id': to_object_id(id)}, {'events': 1, 'eventsVersion': 1})
+
+    async def assign_missing_ids(self, label: Document, fields: Iterable[str] = ('events', 'guidelines')) -> bool:
+        """
+        Store an `id` on the events and guidelines of a label read without one.
+
+        The write only matches if the fields still hold what was read, so a
+        change made in between is never overwritten. `eventsVersion` is left
+        alone, since only IDs are added.
+
+        Args:
+            label: Label document as read (its items get their IDs in place)
+            fields: Fields of the label that were read ('events', 'guidelines')
+
+        Returns:
+            False if the label changed since it was read (read it again), else True
+        """
+        read = {field: copy.deepcopy(label.get(field)) for field in fields}
+        if not sum(assign_ids(label.setdefault(field, [])) for field in read):
+            return True
+        result = await self.collection.update_one(
+            {'_id': label['_id'], **read},
+            {'$set': {field: label[field] for field in read}}
+        )
+        return result.matched_count == 1
+
+    async def create_empty(self) -> ObjectId:
+        """Insert a label without events or guidelines and return its ID."""
+        return await self.insert({'events': [], 'guidelines': []})
+
+    async def push_items(self, id: Id, field: str, items: list[dict[str, Any]]) -> int:
+        """
+        Append events or guidelines to a label.
+
+        Args:
+            id: Label ID
+            field: 'events' or 'guidelines'
+            items: Items to append (given an `id` if they have none)
+
+        Returns:
+            Matched count
+        """
+        assign_ids(items)
+        return await self.update(id, self._versioned(field, {'$push': {field: {'$each': items}}}))
+
+    async def update_item(self, id: Id, field: str, item_id: str, changes: dict[str, Any]) -> Optional[Document]:
+        """
+        Set fields of one event or guideline, addressed by its `id`.
+
+        Args:
+            id: Label ID
+            field: 'events' or 'guidelines'
+            item_id: ID of the item
+            changes: Fields to set on the item
+
+        Returns:
+            The item before the change, or None if the label has no such item
+        """
+        label = await self.collection.find_one_and_update(
+            {'_id': to_object_id(id), f'{field}.id': item_id},
+            self._versioned(field, {'$set': {f'{field}.$.{key}': value for key, value in changes.items()}}),
+            projection={field: {'$elemMatch': {'id': item_id}}},
+            return_document=ReturnDocument.BEFORE
+        )
+        return label[field][0] if label and label.get(field) else None
+
+    async def pull_item(self, id: Id, field: str, item_id: str) -> list[Document]:
+        """
+        Remove an event or guideline, addressed by its `id`.
+
+        Every item with that `id` is removed, should there be several.
+
+        Args:
+            id: Label ID
+            field: 'events' or 'guidelines'
+            item_id: ID of the item
+
+        Returns:
+            The removed items (their `id` and `labeler` only), or an empty
+            list if the label has no such item
+        """
+        label = await self.collection.find_one_and_update(
+            {'_id': to_object_id(id), f'{field}.id': item_id},
+            self._versioned(field, {'$pull': {field: {'id': item_id}}}),
+            projection={f'{field}.id': 1, f'{field}.labeler': 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if label is None:
+            return []
+        return [item for item in label.get(field, []) if item.get('id') == item_id]
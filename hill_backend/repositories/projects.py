@@ -0,0 +1,55 @@
+"""
+Project Repository
+Project documents: event classes, templates and pattern descriptions
+"""
+from typing import Any
+
+from .base import Id, Repository, to_object_id
+
+
+class ProjectRepository(Repository):
+    """Access to the `projects` collection"""
+    collection_name = 'projects'
+
+    async def add_class(self, id: Id, name: str, color: str, description: str) -> int:
+        """Append an event class; returns the matched count."""
+        return await self.update(id, {'$push': {
+            'classes': {'name': name, 'color': color, 'description': description}
+        }})
+
+    async def replace_class(self, id: Id, class_name: str, name: str, color: str, description: str) -> int:
+        """Replace the event class named `class_name`; returns the matched count."""
+        result = await self.collection.update_one(
+            {'_id': to_object_id(id), 'classes.name': class_name},
+            {'$set': {'classes.$': {'name': name, 'color': color, 'description': description}}}
+        )
+        return result.matched_count
+
+    async def set_class_description(self, id: Id, class_name: str, description: str) -> int:
+        """Set the description of one event class; returns the matched count."""
+        result = await self.collection.update_one(
+            {'_id': to_object_id(id), 'classes.name': class_name},
+            {'$set': {'classes.$.description': description}}
+        )
+        return result.matched_count
+
+    async def delete_class(self, id: Id, class_name: str) -> int:
+        """Remove an event class; returns the matched count."""
+        return await self.update(id, {'$pull': {'classes': {'name': class_name}}})
+
+    async def add_template(self, id: Id, template: dict[str, Any]) -> int:
+        """Append a template reference ({id, name, fileType}); returns the matched count."""
+        return await self.update(id, {'$push': {'templates': template}})
+
+    async def set_template_file_type(self, id: Id, template_id: str, file_type: str) -> int:
+        """Update the file type of a template reference; returns the matched count."""
+        result = await self.collection.update_one(
+            {'_id': to_object_id(id)},
+            {'$set': {'templates.$[elem].fileType': file_type}},
+            array_filters=[{'elem.id': template_id}]
+        )
+        return result.matched_count
+
+    async def remove_template(self, id: Id, template_id: str) -> int:
+        """Remove a template reference; returns the matched count."""
+        return await self.update(id, {'$pull': {'templates': {'id': template_id}}})
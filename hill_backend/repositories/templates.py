@@ -0,0 +1,10 @@
+"""
+Template Repository
+Template documents: how raw files are parsed
+"""
+from .base import Repository
+
+
+class TemplateRepository(Repository):
+    """Access to the `templates` collection"""
+    collection_name = 'templates'
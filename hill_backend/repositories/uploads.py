@@ -0,0 +1,106 @@
+"""
+Upload Repository
+Resumable upload sessions: the file being sent and the chunks received so far
+"""
+from datetime import datetime
+from typing import Any, Optional
+
+from pymongo import ReturnDocument
+
+from .base import Document, Id, Repository, to_object_id
+
+
+class UploadRepository(Repository):
+    """
+    Access to the `uploads` collection.
+
+    A session moves from 'open' (accepting chunks) to 'finalizing' (one
+    finalize request is storing the file, under a lease until `leaseUntil`)
+    to 'done', when it keeps the ID of the file it became so that a repeated
+    finalize gets the same answer. Each chunk write is listed in `writers`
+    while it runs (under its own lease, in case the request dies), and a
+    session is only finalized once none is left. Every session has an
+    `expiresAt`, pushed back by each chunk, after which it is swept.
+    """
+    collection_name = 'uploads'
+
+    async def begin_chunk(self, id: Id, writer_id: str, lease_until: datetime, expires_at: datetime) -> int:
+        """Register a chunk write on an open session and extend its expiry; returns the matched count."""
+        result = await self.collection.update_one(
+            {'_id': to_object_id(id), 'state': 'open'},
+            {
+                '$push': {'writers': {'id': writer_id, 'until': lease_until}},
+                '$set': {'expiresAt': expires_at},
+            }
+        )
+        return result.matched_count
+
+    async def end_chunk(self, id: Id, writer_id: str, index: Optional[int]) -> int:
+        """Unregister a chunk write, recording `index` as received unless it is None; returns the matched count."""
+        update: dict[str, Any] = {'$pull': {'writers': {'id': writer_id}}}
+        if index is not None:
+            update['$addToSet'] = {'received': index}
+        result = await self.collection.update_one({'_id': to_object_id(id), 'state': 'open'}, update)
+        return result.matched_count
+
+    async def claim_finalize(
+        self,
+        id: Id,
+        file_id: str,
+        now: datetime,
+        lease_until: datetime,
+        expires_at: datetime
+    ) -> Optional[Document]:
+        """
+        Move an open session with no chunk being written, or one whose
+        finalize lease has run out, to 'finalizing'.
+
+        Args:
+            id: Session ID
+            file_id: ID of the file the session becomes
+            now: Current time
+            lease_until: End of the new finalize lease
+            expires_at: New expiry of the session
+
+        Returns:
+            The session before the change (with the `fileId` of a finalize
+            that died, if any), or None if it is still being written to or
+            finalized
+        """
+        return await self.collection.find_one_and_update(
+            {
+                '_id': to_object_id(id),
+                '$or': [
+                    {'state': 'open', 'writers': {'$not': {'$elemMatch': {'until': {'$gt': now}}}}},
+                    {'state': 'finalizing', 'leaseUntil': {'$lt': now}},
+                ],
+            },
+            {'$set': {'state': 'finalizing', 'fileId': file_id, 'leaseUntil': lease_until, 'expiresAt': expires_at}},
+            return_document=ReturnDocument.BEFORE
+        )
+
+    async def end_finalize(self, id: Id, file_id: str, to_state: str, fields: dict[str, Any]) -> int:
+        """Move a session out of the finalize that stores `file_id` (a later claim wins); returns the matched count."""
+        result = await self.collection.update_one(
+            {'_id': to_object_id(id), 'state': 'finalizing', 'fileId': file_id},
+            {'$set': {'state': to_state, **fields}}
+        )
+        return result.matched_count
+
+    async def reserved_bytes(self) -> int:
+        """Total size of the sessions not done yet."""
+        cursor = await self.collection.aggregate([
+            {'$match': {'state': {'$ne': 'done'}}},
+            {'$group': {'_id': None, 'size': {'$sum': '$size'}}},
+        ])
+        result = await cursor.to_list(1)
+        return result[0]['size'] if result else 0
+
+    async def find_expired(self, now: datetime) -> list[Document]:
+        """Sessions past their expiry."""
+        return await self.collection.find({'expiresAt': {'$lt': now}}).to_list()
+
+    async def delete_expired(self, id: Id, now: datetime) -> int:
+        """Delete a session if it is still past its expiry; returns the deleted count."""
+        result = await self.collection.delete_one({'_id': to_object_id(id), 'expiresAt': {'$lt': now}})
+        return result.deleted_count
@@ -0,0 +1,42 @@
+"""
+User Repository
+User documents: shared projects and folders, messages and recent files
+"""
+from typing import Any, Optional
+
+from .base import Document, Id, Repository
+
+
+class UserRepository(Repository):
+    """Access to the `users` collection"""
+    collection_name = 'users'
+
+    async def find_by_mail(self, mail: str) -> Optional[Document]:
+        """Get a user by e-mail address."""
+        return await self.collection.find_one({'mail': mail})
+
+    async def list_all(self) -> list[Document]:
+        """Get all users."""
+        return await self.collection.find({}).to_list()
+
+    async def add_project(self, id: Id, project_id: str, message: Optional[dict[str, Any]] = None) -> int:
+        """Give a user access to a project, optionally with a message; returns the matched count."""
+        push: dict[str, Any] = {'projectList': project_id}
+        if message is not None:
+            push['message'] = message
+        return await self.update(id, {'$push': push})
+
+    async def add_folder(self, id: Id, folder_id: str, message: Optional[dict[str, Any]] = None) -> int:
+        """Give a user access to a folder, optionally with a message; returns the matched count."""
+        push: dict[str, Any] = {'folderList': folder_id}
+        if message is not None:
+            push['message'] = message
+        return await self.update(id, {'$push': push})
+
+    async def remove_folder_from_all(self, folder_id: str) -> int:
+        """Remove a folder from every user's folder list; returns the matched count."""
+        result = await self.collection.update_many(
+            {'folderList': folder_id},
+            {'$pull': {'folderList': folder_id}}
+        )
+        return result.matched_count
@@ -3,11 +3,9 @@ Chat Conversation Routes
 Manages conversational UI interactions for file labeling
 """
 from fastapi import APIRouter
-from datetime import datetime, timezone
-from bson.objectid import ObjectId
 from bson.json_util import dumps
 
-from database import get_db
+from repositories import chat_conversations_repo, files_repo
 
 router = APIRouter(prefix="/conversations/chat", tags=["chat-conversations"])
 
@@ -19,19 +17,7 @@ async def get_chat_conversation(file_id: str):
     
     Returns conversation history or creates new empty conversation
     """
-    db = get_db()
-    conversation = db['chat_conversations'].find_one({'fileId': file_id})
-    
-    if not conversation:
-        # Create new conversation
-        conversation = {
-            'fileId': file_id,
-            'messages': [],
-            'createdAt': datetime.now(tz=timezone.utc).isoformat(),
-            'updatedAt': datetime.now(tz=timezone.utc).isoformat()
-        }
-        result = db['chat_conversations'].insert_one(conversation)
-        conversation['_id'] = result.inserted_id
+    conversation = await chat_conversations_repo.get_or_create(file_id)
     
     return dumps(conversation)
 
@@ -41,19 +27,13 @@ async def clear_chat_conversation(file_id: str):
     """
     Delete chat conversation and remove reference from file
     """
-    db = get_db()
-    
     # Delete the conversation document
-    result = db['chat_conversations'].delete_one({'fileId': file_id})
+    deleted_count = await chat_conversations_repo.delete_by_file(file_id)
     
     # Remove conversation ID from file
-    from bson import ObjectId
-    db['files'].update_one(
-        {'_id': ObjectId(file_id)},
-        {'$unset': {'chatConversationId': ''}}
-    )
+    await files_repo.unset(file_id, 'chatConversationId')
     
-    if result.deleted_count == 0:
+    if deleted_count == 0:
         return {'status': 'not_found', 'message': 'No conversation found for this file'}
     
     return {'status': 'deleted', 'fileId': file_id}
@@ -66,8 +46,7 @@ async def get_recent_chat_messages(file_id: str, limit: int = 50):
     
     Returns last N messages
     """
-    db = get_db()
-    conversation = db['chat_conversations'].find_one({'fileId': file_id})
+    conversation = await chat_conversations_repo.find_by_file(file_id)
     
     if not conversation:
         return {'messages': [], 'total': 0}
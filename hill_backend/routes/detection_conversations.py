@@ -3,11 +3,9 @@ Auto-Detection Conversation Routes
 Manages auto-detection workflow progress and results
 """
 from fastapi import APIRouter
-from datetime import datetime, timezone
-from bson.objectid import ObjectId
 from bson.json_util import dumps
 
-from database import get_db
+from repositories import detection_conversations_repo, files_repo
 
 router = APIRouter(prefix="/conversations/detection", tags=["detection-conversations"])
 
@@ -19,20 +17,7 @@ async def get_detection_conversation(file_id: str):
     
     Returns detection progress/history or creates new empty conversation
     """
-    db = get_db()
-    conversation = db['auto_detection_conversations'].find_one({'fileId': file_id})
-    
-    if not conversation:
-        # Create new conversation
-        conversation = {
-            'fileId': file_id,
-            'messages': [],
-            'status': 'idle',  # idle, running, completed, failed
-            'createdAt': datetime.now(tz=timezone.utc).isoformat(),
-            'updatedAt': datetime.now(tz=timezone.utc).isoformat()
-        }
-        result = db['auto_detection_conversations'].insert_one(conversation)
-        conversation['_id'] = result.inserted_id
+    conversation = await detection_conversations_repo.get_or_create(file_id)
     
     return dumps(conversation)
 
@@ -42,19 +27,13 @@ async def clear_detection_conversation(file_id: str):
     """
     Delete auto-detection conversation and remove reference from file
     """
-    db = get_db()
-    
     # Delete the conversation document
-    result = db['auto_detection_conversations'].delete_one({'fileId': file_id})
+    deleted_count = await detection_conversations_repo.delete_by_file(file_id)
     
     # Remove conversation ID from file
-    from bson import ObjectId
-    db['files'].update_one(
-        {'_id': ObjectId(file_id)},
-        {'$unset': {'autoDetectionConversationId': ''}}
-    )
+    await files_repo.unset(file_id, 'autoDetectionConversationId')
     
-    if result.deleted_count == 0:
+    if deleted_count == 0:
         return {'status': 'not_found', 'message': 'No conversation found for this file'}
     
     return {'status': 'deleted', 'fileId': file_id}
@@ -67,8 +46,7 @@ async def get_latest_detection_run(file_id: str):
     
     Returns the most recent successful detection with results
     """
-    db = get_db()
-    conversation = db['auto_detection_conversations'].find_one({'fileId': file_id})
+    conversation = await detection_conversations_repo.find_by_file(file_id)
     
     if not conversation:
         return {'status': 'not_found', 'message': 'No detection history for this file'}
@@ -99,8 +77,7 @@ async def get_detection_history(file_id: str):
     
     Returns summary of all detection attempts
     """
-    db = get_db()
-    conversation = db['auto_detection_conversations'].find_one({'fileId': file_id})
+    conversation = await detection_conversations_repo.find_by_file(file_id)
     
     if not conversation:
         return {'runs': [], 'total': 0}
@@ -1,99 +1,388 @@
 """File Routes"""
-from fastapi import APIRouter, UploadFile, Form, Query
-from fastapi.responses import Response
-from typing import Annotated, Optional
-from bson.objectid import ObjectId
+from fastapi import APIRouter, UploadFile, Form, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import Annotated, Callable, Iterator, Literal, Optional
 from bson.json_util import dumps
-from datetime import datetime, timezone
+from bson.objectid import ObjectId
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import simplejson as json
+import os
 import shutil
 import logging
 import numpy as np
 
-from database import get_db, get_data_folder_path
-from models import UpdateDescriptionRequest, ReparsingFilesRequest, DownloadJsonFilesRequest
+from database import get_data_folder_path
+from repositories import files_repo, labels_repo, folders_repo, uploads_repo, folder_refs
+from models import UpdateDescriptionRequest, ReparsingFilesRequest, DownloadJsonFilesRequest, InitiateUploadRequest
 from config import settings
 from redis_client import get_redis_client
-from services import get_data_reader, ResamplerService
+from services import (
+    get_data_reader,
+    evict_readers,
+    get_reader_cache_stats,
+    get_event_index_cache_stats,
+    ResamplerService,
+    TileGrid,
+    tile_etag,
+    TILE_CACHE_IMMUTABLE,
+    TILE_CACHE_REVALIDATE,
+    get_viewport_cache,
+    quantize_range,
+    encode_columns,
+    frame_initial_load,
+    iter_json_file,
+    iter_json_export,
+    load_overview_text,
+    load_binary_overview_text,
+    load_overview_columns,
+    run_io,
+    run_cpu,
+    run_process,
+    get_executor_stats,
+    StoredUpload,
+    iter_upload_chunks,
+    write_upload,
+    create_chunked_upload,
+    write_chunk,
+    store_chunked_upload,
+    get_upload_stats,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/files", tags=["files"])
 
+# A finalize holding an upload session longer than this is taken to have died
+UPLOAD_FINALIZE_LEASE = timedelta(minutes=10)
+# Likewise for a chunk write keeping the session from being finalized
+UPLOAD_CHUNK_LEASE = timedelta(minutes=10)
+
 
 @router.post("")
 async def upload_files(data: Annotated[str, Form()], user: Annotated[str, Form()], files: list[UploadFile]):
     """Upload files to folder"""
-    db = get_db()
     data_folder_path = get_data_folder_path()
     folderId = data
     userName = user
     
+    folder = await folders_repo.get(folderId)
+    if folder is None:
+        return {'error': 'Folder not found'}
+    
     for file in files:
-        # Add new label
-        labelInfo = {
-            'events': [],
-            'guidelines': [],
-        }
-        result = db['labels'].insert_one(labelInfo)
-        newLabelId = result.inserted_id
-        
-        # Add new file
-        fileInfo = {
-            'name': file.filename,
-            'parsing': 'uploading',
-            'nbEvent': 'unlabeled',
-            'description': '',
-            'rawPath': '',
-            'jsonPath': '',
-            'lastModifier': userName,
-            'lastUpdate': datetime.now(tz=timezone.utc),
-            'label': str(newLabelId),
-        }
-        result = db['files'].insert_one(fileInfo)
-        newFileId = result.inserted_id
-        
-        # Save file with fileID
-        Path(f'{data_folder_path}/{folderId}/{str(newFileId)}').mkdir(exist_ok=True, parents=True)
-        with open(f'{data_folder_path}/{folderId}/{str(newFileId)}/{file.filename}', 'wb') as f:
-            content = file.file.read()
-            f.write(content)
-        
-        # Update file 
-        fileInfo['rawPath'] = f'{folderId}/{str(newFileId)}/{file.filename}'
-        fileInfo['parsing'] = 'queued'  # Changed from 'parsing start'
-        db['files'].update_one({'_id': newFileId}, {'$set': fileInfo})
-        db['folders'].update_one(
-            {'_id': ObjectId(folderId)}, 
-            {'$push': {'fileList': str(newFileId)}, '$inc': {'nbTotalFiles': 1}}
-        )
-        
-        # Add to Redis queue for processing
+        # Stream the file to disk under its ID, hashing it on the way; its
+        # documents are only created once the content is stored
+        newFileId = ObjectId()
+        file_dir = f'{data_folder_path}/{folderId}/{str(newFileId)}'
         try:
-            redis = get_redis_client()
-            redis.add_file_to_queue(
-                file_id=str(newFileId),
-                metadata={'filename': file.filename, 'folder_id': folderId}
-            )
-            # Update status to queued
-            db['files'].update_one({'_id': newFileId}, {'$set': {'parsing': 'queued'}})
-            logger.info(f"File {newFileId} added to parsing queue")
-        except Exception as e:
-            logger.error(f"Failed to add file {newFileId} to Redis queue: {e}")
-            # Fall back to old method if Redis fails
-            db['files'].update_one({'_id': newFileId}, {'$set': {'parsing': 'parsing start'}})
+            stored = await write_upload(iter_upload_chunks(file), f'{file_dir}/{file.filename}')
+            fileInfo = await _create_file(folder, file.filename, userName, newFileId)
+            await _add_uploaded_file(folderId, newFileId, fileInfo, stored)
+        except Exception:
+            await _discard_file(folderId, newFileId)
+            await run_io(shutil.rmtree, file_dir, ignore_errors=True)
+            raise
     
     return 'done'
 
 
+async def _create_file(folder: dict, name: str, userName: str, newFileId: ObjectId) -> dict:
+    """Helper: Insert the label and the document of an uploaded file"""
+    # Add new label
+    newLabelId = await labels_repo.create_empty()
+    
+    # Add new file
+    fileInfo = {
+        '_id': newFileId,
+        'name': name,
+        'parsing': 'uploading',
+        'nbEvent': 'unlabeled',
+        'description': '',
+        'rawPath': '',
+        'jsonPath': '',
+        'lastModifier': userName,
+        'lastUpdate': datetime.now(tz=timezone.utc),
+        'label': str(newLabelId),
+        **folder_refs(folder),
+    }
+    await files_repo.insert(fileInfo)
+    return fileInfo
+
+
+async def _add_uploaded_file(folderId: str, newFileId: ObjectId, fileInfo: dict, stored: StoredUpload):
+    """Helper: Record the stored content of an uploaded file, add it to its folder and queue it for parsing"""
+    # Update file 
+    fileInfo['rawPath'] = f'{folderId}/{str(newFileId)}/{fileInfo["name"]}'
+    fileInfo['rawSize'] = stored.size
+    fileInfo['sha256'] = stored.sha256
+    fileInfo['parsing'] = 'queued'  # Changed from 'parsing start'
+    await files_repo.set(newFileId, fileInfo)
+    await folders_repo.add_file(folderId, str(newFileId))
+    
+    # Add to Redis queue for processing
+    try:
+        redis = get_redis_client()
+        await run_io(
+            redis.add_file_to_queue,
+            file_id=str(newFileId),
+            metadata={'filename': fileInfo['name'], 'folder_id': folderId}
+        )
+        # Update status to queued
+        await files_repo.set(newFileId, {'parsing': 'queued'})
+        logger.info(f"File {newFileId} added to parsing queue")
+    except Exception as e:
+        logger.error(f"Failed to add file {newFileId} to Redis queue: {e}")
+        # Fall back to old method if Redis fails
+        await files_repo.set(newFileId, {'parsing': 'parsing start'})
+
+
+async def _discard_file(folderId: str, fileId: ObjectId):
+    """Helper: Delete the documents of an upload that could not be completed and take it out of its folder"""
+    file_doc = await files_repo.get(fileId)
+    if file_doc is None:
+        return
+    folder = await folders_repo.get(folderId)
+    if folder is not None and str(fileId) in folder.get('fileList', []):
+        await folders_repo.remove_file(folderId, str(fileId), labeled=False)
+    await labels_repo.delete(file_doc['label'])
+    await files_repo.delete(fileId)
+
+
+@router.post("/uploads")
+async def initiate_upload(request: InitiateUploadRequest):
+    """Start a resumable upload of one file.
+    
+    The client sends the file in `chunkSize` pieces with
+    PUT /uploads/{upload_id}/chunks/{index} (in any order and in parallel,
+    again after a failure), can ask GET /uploads/{upload_id} which chunks are
+    still missing, and stores the file with POST /uploads/{upload_id}/finalize,
+    which queues it for parsing. Chunks are written straight into one file at
+    their offsets, so finalizing only hashes and renames it.
+    """
+    folder = await folders_repo.get(request.folderId)
+    if folder is None:
+        return Response(content=b"Folder not found", status_code=404, media_type="text/plain")
+    if request.size < 0 or request.size > settings.MAX_UPLOAD_SIZE_BYTES:
+        return Response(content=b"File too large", status_code=413, media_type="text/plain")
+    if request.name in ('', '.', '..') or Path(request.name).name != request.name:
+        return Response(content=b"Invalid file name", status_code=400, media_type="text/plain")
+    if await uploads_repo.reserved_bytes() + request.size > settings.UPLOAD_MAX_OPEN_BYTES:
+        return Response(content=b"Too many unfinished uploads", status_code=507, media_type="text/plain")
+    
+    now = datetime.now(tz=timezone.utc)
+    chunk_size = settings.RESUMABLE_CHUNK_BYTES
+    upload = {
+        'folderId': request.folderId,
+        'user': request.user,
+        'name': request.name,
+        'size': request.size,
+        'chunkSize': chunk_size,
+        'totalChunks': -(-request.size // chunk_size),
+        'received': [],
+        'state': 'open',
+        'createdAt': now,
+        'expiresAt': _upload_expiry(now),
+    }
+    upload['_id'] = await uploads_repo.insert(upload)
+    await create_chunked_upload(_upload_part_path(upload), request.size)
+    
+    return _upload_status(upload)
+
+
+@router.get("/uploads/{upload_id}")
+async def get_upload(upload_id: str):
+    """Get the state of a resumable upload and the chunks still missing"""
+    upload = await uploads_repo.get(upload_id)
+    if upload is None:
+        return Response(content=b"Upload not found", status_code=404, media_type="text/plain")
+    return _upload_status(upload)
+
+
+@router.put("/uploads/{upload_id}/chunks/{index}")
+async def put_upload_chunk(upload_id: str, index: int, request: Request):
+    """Write one chunk of a resumable upload (the raw request body).
+    
+    Sending a chunk again overwrites it, so failed or uncertain chunks can
+    simply be retried.
+    """
+    upload = await uploads_repo.get(upload_id)
+    if upload is None:
+        return Response(content=b"Upload not found", status_code=404, media_type="text/plain")
+    if upload['state'] != 'open':
+        return Response(content=b"Upload is already finalized", status_code=409, media_type="text/plain")
+    if not 0 <= index < upload['totalChunks']:
+        return Response(content=f"Invalid chunk: {index}".encode(), status_code=400, media_type="text/plain")
+    
+    # The write is registered on the session so that finalize waits for it
+    now = datetime.now(tz=timezone.utc)
+    writerId = str(ObjectId())
+    if not await uploads_repo.begin_chunk(upload_id, writerId, now + UPLOAD_CHUNK_LEASE, _upload_expiry(now)):
+        return Response(content=b"Upload is already finalized", status_code=409, media_type="text/plain")
+    
+    offset = index * upload['chunkSize']
+    length = min(upload['chunkSize'], upload['size'] - offset)
+    written = None
+    try:
+        await write_chunk(request.stream(), _upload_part_path(upload), offset, length)
+        written = index
+    except ValueError as e:
+        return Response(content=str(e).encode(), status_code=400, media_type="text/plain")
+    except FileNotFoundError:
+        # Finalized or aborted once the write outlived its lease
+        return Response(content=b"Upload is already finalized", status_code=409, media_type="text/plain")
+    finally:
+        await uploads_repo.end_chunk(upload_id, writerId, written)
+    
+    return {'index': index, 'size': length}
+
+
+@router.post("/uploads/{upload_id}/finalize")
+async def finalize_upload(upload_id: str):
+    """Store a resumable upload once every chunk is received, and queue the file for parsing.
+    
+    Returns {"fileId": ...}; finalizing a session again returns the same file.
+    Missing chunks are listed in a 409 response.
+    """
+    data_folder_path = get_data_folder_path()
+    
+    upload = await uploads_repo.get(upload_id)
+    if upload is None:
+        return Response(content=b"Upload not found", status_code=404, media_type="text/plain")
+    if upload['state'] == 'done':
+        return {'fileId': upload['fileId']}
+    missing = _missing_chunks(upload)
+    if missing:
+        return JSONResponse(content={'error': 'Missing chunks', 'missing': missing}, status_code=409)
+    
+    folder = await folders_repo.get(upload['folderId'])
+    if folder is None:
+        return Response(content=b"Folder not found", status_code=404, media_type="text/plain")
+    
+    # Only one finalize request stores the file; one that died holding the
+    # session is undone once its lease runs out
+    now = datetime.now(tz=timezone.utc)
+    newFileId = ObjectId()
+    claimed = await uploads_repo.claim_finalize(
+        upload_id, str(newFileId), now, now + UPLOAD_FINALIZE_LEASE, _upload_expiry(now)
+    )
+    if claimed is None:
+        return Response(content=b"Upload is being written to or finalized", status_code=409, media_type="text/plain")
+    if claimed.get('fileId'):
+        await _rollback_finalize(claimed, claimed['fileId'])
+    
+    try:
+        stored = await store_chunked_upload(
+            _upload_part_path(upload),
+            f'{data_folder_path}/{upload["folderId"]}/{str(newFileId)}/{upload["name"]}'
+        )
+        fileInfo = await _create_file(folder, upload['name'], upload['user'], newFileId)
+        await _add_uploaded_file(upload['folderId'], newFileId, fileInfo, stored)
+    except Exception:
+        await _rollback_finalize(upload, str(newFileId))
+        await uploads_repo.end_finalize(upload_id, str(newFileId), 'open', {'fileId': None})
+        raise
+    
+    await uploads_repo.end_finalize(
+        upload_id, str(newFileId), 'done', {'expiresAt': _upload_expiry(datetime.now(tz=timezone.utc))}
+    )
+    
+    return {'fileId': str(newFileId)}
+
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload(upload_id: str):
+    """Abort a resumable upload and delete its chunks"""
+    upload = await uploads_repo.get(upload_id)
+    if upload is None:
+        return Response(content=b"Upload not found", status_code=404, media_type="text/plain")
+    if upload['state'] == 'finalizing':
+        # Stored times come back naive, in UTC
+        if upload['leaseUntil'].replace(tzinfo=timezone.utc) > datetime.now(tz=timezone.utc):
+            return Response(content=b"Upload is being finalized", status_code=409, media_type="text/plain")
+        await _rollback_finalize(upload, upload['fileId'])
+    
+    await uploads_repo.delete(upload_id)
+    part_path = _upload_part_path(upload)
+    await run_io(lambda: Path(part_path).unlink(missing_ok=True))
+    return 'done'
+
+
+async def sweep_expired_uploads() -> int:
+    """
+    Delete the resumable upload sessions past their expiry, with their partial files.
+    
+    The finalize of sessions left finalizing is rolled back. Run periodically by the app.
+    
+    Returns:
+        Number of sessions deleted
+    """
+    now = datetime.now(tz=timezone.utc)
+    swept = 0
+    for upload in await uploads_repo.find_expired(now):
+        # Deleting first leaves the session to one sweeper
+        if not await uploads_repo.delete_expired(upload['_id'], now):
+            continue
+        if upload['state'] == 'finalizing' and upload.get('fileId'):
+            await _rollback_finalize(upload, upload['fileId'])
+        part_path = _upload_part_path(upload)
+        await run_io(lambda: Path(part_path).unlink(missing_ok=True))
+        swept += 1
+    if swept:
+        logger.info(f"Deleted {swept} expired upload sessions")
+    return swept
+
+
+def _upload_part_path(upload: dict) -> str:
+    """Helper: Path of the file the chunks of a resumable upload are written into"""
+    return f'{get_data_folder_path()}/_uploads/{str(upload["_id"])}.part'
+
+
+def _upload_expiry(now: datetime) -> datetime:
+    """Helper: Expiry of an upload session last used at `now`"""
+    return now + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+
+
+async def _rollback_finalize(upload: dict, fileId: str):
+    """Helper: Undo the finalize of a resumable upload that stored `fileId`, putting its content back in the partial file"""
+    await _discard_file(upload['folderId'], ObjectId(fileId))
+    file_dir = Path(get_data_folder_path()) / upload['folderId'] / fileId
+    part_path = Path(_upload_part_path(upload))
+    
+    def restore():
+        stored_path = file_dir / upload['name']
+        if stored_path.exists() and not part_path.exists():
+            os.replace(stored_path, part_path)
+        shutil.rmtree(file_dir, ignore_errors=True)
+    
+    await run_io(restore)
+
+
+def _missing_chunks(upload: dict) -> list[int]:
+    """Helper: Indexes of the chunks of a resumable upload not received yet"""
+    received = set(upload['received'])
+    return [index for index in range(upload['totalChunks']) if index not in received]
+
+
+def _upload_status(upload: dict) -> dict:
+    """Helper: Public state of a resumable upload"""
+    return {
+        'uploadId': str(upload['_id']),
+        'name': upload['name'],
+        'size': upload['size'],
+        'chunkSize': upload['chunkSize'],
+        'totalChunks': upload['totalChunks'],
+        'state': upload['state'],
+        'missing': _missing_chunks(upload),
+        'fileId': upload.get('fileId') if upload['state'] == 'done' else None,
+    }
+
+
 @router.get("")
 async def get_files(filesId: str):
     """Get multiple files"""
-    db = get_db()
     filesId = json.loads(filesId)
-    result = db['files'].find({'_id': {'$in': [ObjectId(f) for f in filesId]}})
-    return dumps(result)
+    return dumps(await files_repo.get_many(filesId))
 
 
 @router.get("/{file_id}")
@@ -102,30 +391,28 @@ async def get_file(file_id: str):
     
     For large files (useBinaryFormat=True), returns overview data for initial display.
     For small files, returns full data.
+    
+    Kept for API clients; the labeling page loads files with /{file_id}/initial,
+    which does not encode the data as nested JSON strings.
     """
-    db = get_db()
     data_folder_path = get_data_folder_path()
     
-    result = db['files'].find_one({'_id': ObjectId(file_id)})
+    result = await files_repo.get(file_id)
     
     # Check if this is a large file using binary format
     use_binary = result.get('useBinaryFormat', False)
     
-    if use_binary and result.get('overviewPath'):
+    if result.get('overviewBinaryPath'):
+        # Binary overview (the full data of small files)
+        file_path = f'{data_folder_path}/{result["overviewBinaryPath"]}'
+        json_string = await run_process(load_binary_overview_text, file_path, result['columns'])
+    elif use_binary and result.get('overviewPath'):
         # Large file: return overview data for initial display
         overview_path = result['overviewPath']
         file_path = f'{data_folder_path}/{overview_path}'
         
-        with open(file_path, 'r') as f:
-            overview_content = json.load(f)
-        
-        # New format has { meta: {...}, data: [...] }
-        # Extract just the data array for backward compatibility
-        if isinstance(overview_content, dict) and 'data' in overview_content:
-            json_string = json.dumps(overview_content['data'])
-        else:
-            # Old format - direct array
-            json_string = json.dumps(overview_content)
+        # Decoding and re-encoding holds the GIL, so it runs in a worker process
+        json_string = await run_process(load_overview_text, file_path)
         
         logger.info(f"Returning overview data for large file: {file_id}")
     else:
@@ -133,198 +420,394 @@ async def get_file(file_id: str):
         json_path = result['jsonPath']
         file_path = f'{data_folder_path}/{json_path}'
         
-        with open(file_path, 'r') as f:
-            json_string = f.read()
+        json_string = await run_io(_read_text, file_path)
     
     response = {'fileInfo': dumps(result), 'data': json_string}
     return json.dumps(response)
 
 
+@router.get("/{file_id}/initial")
+async def get_initial_data(
+    file_id: str,
+    encoding: Literal['float64', 'float32'] = Query(default='float64', description="Value encoding of the overview"),
+    compression: Literal['none', 'deflate'] = Query(default='none', description="Compression of the overview"),
+):
+    """Get a file document and its data for the first paint.
+    
+    Files parsed with a binary overview (the downsampled data of large files,
+    the full data of small ones) get one binary response:
+        [uint32 little-endian: n][n bytes: file document as JSON][overview]
+    The overview uses the viewport layout, encodings and X- headers (see
+    /{file_id}/viewport); the document's `columns` give the names, units
+    and colors of its columns, x first. It is read as stored, not decoded.
+    
+    Files parsed before overviews were stored in binary get
+    {"fileInfo": {...}, "data": [...]} as one JSON document.
+    """
+    result = await files_repo.get(file_id)
+    if not result:
+        return Response(content=b"File not found", status_code=404, media_type="text/plain")
+    
+    data_folder_path = get_data_folder_path()
+    
+    if not result.get('overviewBinaryPath'):
+        # The stored JSON text is embedded as it is
+        if result.get('useBinaryFormat', False) and result.get('overviewPath'):
+            json_string = await run_process(load_overview_text, f'{data_folder_path}/{result["overviewPath"]}')
+        elif result.get('jsonPath'):
+            json_string = await run_io(_read_text, f'{data_folder_path}/{result["jsonPath"]}')
+        else:
+            return Response(content=b"File is not parsed", status_code=409, media_type="text/plain")
+        content = '{"fileInfo": ' + dumps(result) + ', "data": ' + json_string + '}'
+        return Response(content=content, media_type="application/json")
+    
+    columns = result['columns']
+    x_out, channels_out = await run_io(
+        load_overview_columns, f'{data_folder_path}/{result["overviewBinaryPath"]}', len(columns)
+    )
+    total_points = result.get('totalPoints', len(x_out))
+    x_headers = {"X-X-Type": result.get('xType', 'numeric'), "X-X-Format": result.get('xFormat') or ""}
+    content, headers = await run_cpu(
+        _pack_data,
+        x_out, channels_out, [column['name'] for column in columns[1:]],
+        total_points, len(x_out) == total_points, result.get('xMin', 0.0), result.get('xMax', 0.0),
+        headers=x_headers, encoding=encoding, compression=compression
+    )
+    return _data_response(frame_initial_load(dumps(result).encode(), content), headers)
+
+
+def _read_text(file_path: str) -> str:
+    """Read a text file."""
+    with open(file_path, 'r') as f:
+        return f.read()
+
+
+def _select_channels(channel_names: list[str], channels: Optional[str]) -> list[int]:
+    """
+    Resolve the `channels` query parameter to channel positions.
+
+    Args:
+        channel_names: Names of the file's channels, in column order
+        channels: Comma-separated channel names, or None for all channels
+
+    Returns:
+        Positions of the selected channels in column order
+
+    Raises:
+        ValueError: If a requested name is not a channel of the file
+    """
+    if not channels:
+        return list(range(len(channel_names)))
+    requested = {name.strip() for name in channels.split(',') if name.strip()}
+    unknown = requested.difference(channel_names)
+    if unknown:
+        raise ValueError(f"Unknown channel(s): {', '.join(sorted(unknown))}")
+    return [i for i, name in enumerate(channel_names) if name in requested]
+
+
+def _read_binary_range(
+    reader,
+    x_min: float,
+    x_max: float,
+    max_points: int,
+    selected: list[int],
+    include_end: bool = True
+) -> tuple[np.ndarray, list[np.ndarray], int, bool]:
+    """
+    Read and resample a range of a binary file.
+
+    Args:
+        reader: MemoryMappedDataReader of the file
+        x_min: Start of range (in x-axis units)
+        x_max: End of range (in x-axis units)
+        max_points: Target points per channel
+        selected: Positions of the channels to read
+        include_end: Whether rows at x_max are included (False for all tiles but the last of a level)
+
+    Returns:
+        Tuple of (x, channel arrays, points in range, full resolution flag)
+    """
+    # Column views of the memory-mapped file (from the LOD pyramid when zoomed out),
+    # for the selected channels only; nothing is read yet
+    columns, original_count, bucket_size = reader.get_lod_columns(x_min, x_max, max_points, selected, include_end)
+    
+    if len(columns[0]) == 0:
+        return np.array([], dtype=np.float64), [np.array([], dtype=np.float64) for _ in selected], 0, True
+    
+    # Resample if needed, streaming ranges that do not fit the memory budget
+    resampler = ResamplerService(max_points)
+    x_out, channels_out, is_full = resampler.resample_bounded(
+        columns[0], columns[1:], settings.VIEWPORT_MEMORY_BUDGET_BYTES
+    )
+    return x_out, channels_out, original_count, is_full and bucket_size == 1
+
+
+def _pack_data(
+    x_out: np.ndarray,
+    channels_out: list[np.ndarray],
+    channel_names: list[str],
+    original_count: int,
+    is_full: bool,
+    x_min: float,
+    x_max: float,
+    reader=None,
+    headers: Optional[dict[str, str]] = None,
+    encoding: str = 'float64',
+    compression: str = 'none'
+) -> tuple[bytes, dict[str, str]]:
+    """
+    Pack resampled columns into the binary viewport response body and headers.
+
+    Args:
+        x_out: X values
+        channels_out: Channel arrays, same length as x_out
+        channel_names: Names of the returned channels
+        original_count: Points in the requested range before resampling
+        is_full: Whether no resampling was applied
+        x_min: Requested range start (reported when no points are returned)
+        x_max: Requested range end (reported when no points are returned)
+        reader: MemoryMappedDataReader, adds the x-axis type/format headers
+        headers: Additional response headers
+        encoding: Value encoding of the body (see `encode_columns`)
+        compression: Compression of the body (see `encode_columns`)
+
+    Returns:
+        Tuple of (encoded [x_values][ch1_values][ch2_values]..., headers)
+    """
+    # Layout: x, ch1, ch2, ... (each contiguous)
+    content = encode_columns(x_out, channels_out, encoding, compression)
+    
+    response_headers = {
+        "X-Total-Points": str(original_count),
+        "X-Returned-Points": str(len(x_out)),
+        "X-Full-Resolution": str(is_full).lower(),
+        "X-Num-Columns": str(1 + len(channel_names)),
+        "X-X-Min": str(float(x_out[0]) if len(x_out) > 0 else x_min),
+        "X-X-Max": str(float(x_out[-1]) if len(x_out) > 0 else x_max),
+        "X-Channel-Names": ",".join(channel_names),
+        "X-Encoding": encoding,
+        "X-Compression": compression,
+    }
+    if reader is not None:
+        response_headers["X-X-Type"] = reader.x_type
+        response_headers["X-X-Format"] = reader.x_format or ""
+    if headers:
+        response_headers.update(headers)
+    
+    logger.debug(f"Data response: {len(x_out)} points, {len(channels_out)} channels, {len(content)} bytes ({encoding}, {compression})")
+    
+    return content, response_headers
+
+
+def _data_response(content: bytes, headers: dict[str, str]) -> Response:
+    """Binary response from packed data."""
+    return Response(content=content, media_type="application/octet-stream", headers=headers)
+
+
 @router.get("/{file_id}/viewport")
 async def get_viewport(
     file_id: str,
     x_min: float = Query(..., description="Start of range (in x-axis units)"),
     x_max: float = Query(..., description="End of range (in x-axis units)"),
     max_points: int = Query(default=20000, description="Target points per channel"),
+    channels: Optional[str] = Query(default=None, description="Comma-separated channel names to return (default: all)"),
+    encoding: Literal['float64', 'float32'] = Query(default='float64', description="Value encoding of the response body"),
+    compression: Literal['none', 'deflate'] = Query(default='none', description="Compression of the response body"),
 ):
     """Get viewport data for a specific range.
     
     Returns binary data optimized for the requested viewport.
     Used for progressive loading when user zooms/pans on large files.
+    With `channels`, only the selected channels are read, resampled and
+    returned (in file column order); unknown names give a 400.
     
     Response Headers:
         X-Total-Points: Original points in requested range
         X-Returned-Points: Points after resampling
         X-Full-Resolution: "true" if no resampling was applied
-        X-Num-Columns: Number of columns (1 + num_channels)
+        X-Num-Columns: Number of columns (1 + number of returned channels)
         X-X-Min: Actual range start
         X-X-Max: Actual range end
-        X-Channel-Names: Comma-separated channel names
+        X-Channel-Names: Comma-separated names of the returned channels
+        X-Encoding, X-Compression: Body encoding, as requested
     
     Response Body:
         Binary ArrayBuffer containing float64 values.
         Layout: [x_values][ch1_values][ch2_values]...
         Each array has length = X-Returned-Points
+        With encoding=float32: [x_0 as float64][x - x_0][ch1_values]... as float32.
+        With compression=deflate: zlib stream of the byte-shuffled body
+        (see `services.wire_encoding.encode_columns`).
     """
     try:
-        db = get_db()
-        data_folder_path = get_data_folder_path()
-        
-        result = db['files'].find_one({'_id': ObjectId(file_id)})
+        reader = await _get_binary_reader(file_id)
+        if isinstance(reader, Response):
+            return reader
         
-        if not result:
-            return Response(
-                content=b"File not found",
-                status_code=404,
-                media_type="text/plain"
-            )
+        all_names = [ch['name'] for ch in reader.channels]
+        try:
+            selected = _select_channels(all_names, channels)
+        except ValueError as e:
+            return Response(content=str(e).encode(), status_code=400, media_type="text/plain")
+        channel_names = [all_names[i] for i in selected]
         
-        use_binary = result.get('useBinaryFormat', False)
+        # Nearby requests share a grid-aligned range, so their results can be cached and coalesced
+        q_min, q_max = quantize_range(x_min, x_max)
         
-        if not use_binary:
-            # Small file: load from JSON and return all data in range
-            json_path = result['jsonPath']
-            file_path = f'{data_folder_path}/{json_path}'
-            
-            with open(file_path, 'r') as f:
-                json_data = json.load(f)
-            
-            # Convert to numpy arrays
-            x_trace = next(d for d in json_data if d['x'])
-            channels = [d for d in json_data if not d['x']]
-            
-            x_data = x_trace['data']
-            x_is_time = isinstance(x_data[0], str) if x_data else False
-            
-            if x_is_time:
-                x_numeric = np.arange(len(x_data), dtype=np.float64)
-            else:
-                x_numeric = np.array(x_data, dtype=np.float64)
-            
-            # Find range
-            start_idx = int(np.searchsorted(x_numeric, x_min, side='left'))
-            end_idx = int(np.searchsorted(x_numeric, x_max, side='right'))
-            
-            start_idx = max(0, start_idx)
-            end_idx = min(len(x_numeric), end_idx)
-            
-            original_count = end_idx - start_idx
-            
-            # Handle empty range
-            if original_count == 0:
-                return Response(
-                    content=np.array([], dtype=np.float64).tobytes(),
-                    media_type="application/octet-stream",
-                    headers={
-                        "X-Total-Points": "0",
-                        "X-Returned-Points": "0",
-                        "X-Full-Resolution": "true",
-                        "X-Num-Columns": str(1 + len(channels)),
-                        "X-X-Min": str(x_min),
-                        "X-X-Max": str(x_max),
-                        "X-Channel-Names": ",".join(ch['name'] for ch in channels),
-                    }
-                )
-            
-            # Extract data
-            x_slice = x_numeric[start_idx:end_idx]
-            channel_slices = [
-                np.array(ch['data'], dtype=np.float64)[start_idx:end_idx] 
-                for ch in channels
-            ]
-            channel_names = [ch['name'] for ch in channels]
-            
-            # Resample if needed
-            resampler = ResamplerService(max_points)
-            x_out, channels_out, is_full = resampler.resample(x_slice, channel_slices)
-            
-            # Pack into binary
-            # Layout: x, ch1, ch2, ... (each contiguous)
-            result_data = np.concatenate([x_out] + channels_out)
-            
-            logger.debug(f"Viewport response: {len(x_out)} points, {len(channels_out)} channels, {result_data.nbytes} bytes")
-            
-            return Response(
-                content=result_data.tobytes(),
-                media_type="application/octet-stream",
-                headers={
-                    "X-Total-Points": str(original_count),
-                    "X-Returned-Points": str(len(x_out)),
-                    "X-Full-Resolution": str(is_full).lower(),
-                    "X-Num-Columns": str(1 + len(channels_out)),
-                    "X-X-Min": str(float(x_out[0]) if len(x_out) > 0 else x_min),
-                    "X-X-Max": str(float(x_out[-1]) if len(x_out) > 0 else x_max),
-                    "X-Channel-Names": ",".join(channel_names),
-                }
+        def compute():
+            x_out, channels_out, original_count, is_full = _read_binary_range(reader, q_min, q_max, max_points, selected)
+            return _pack_data(
+                x_out, channels_out, channel_names, original_count, is_full, q_min, q_max, reader,
+                encoding=encoding, compression=compression
             )
         
-        # Large file: use memory-mapped reader
-        binary_path = f'{data_folder_path}/{result["binaryPath"]}'
-        meta_path = f'{data_folder_path}/{result["metaPath"]}'
-        
-        reader = get_data_reader(binary_path, meta_path)
+        key = ('viewport', file_id, reader.artifact_version, q_min, q_max, max_points, tuple(channel_names),
+               encoding, compression)
+        return _data_response(*await get_viewport_cache().get_or_compute(key, compute))
         
-        # Get slice from memory-mapped file
-        data, original_count = reader.get_slice(x_min, x_max)
+    except Exception as e:
+        logger.error(f"Viewport error: {e}", exc_info=True)
+        return Response(
+            content=f"Viewport error: {str(e)}".encode(),
+            status_code=500,
+            media_type="text/plain"
+        )
+
+
+async def _get_binary_reader(file_id: str):
+    """
+    Open the binary store reader of a file.
+
+    Args:
+        file_id: File ID
+
+    Returns:
+        MemoryMappedDataReader, or a text/plain error Response
+    """
+    result = await files_repo.get(file_id)
+    if not result:
+        return Response(content=b"File not found", status_code=404, media_type="text/plain")
+    if not result.get('binaryPath'):
+        # Parsed before every file was stored in binary (see tools.backfill_binary_store in the worker)
+        return Response(content=b"File has no binary store; reparse it", status_code=409, media_type="text/plain")
+    
+    data_folder_path = get_data_folder_path()
+    return await run_io(
+        get_data_reader,
+        f'{data_folder_path}/{result["binaryPath"]}',
+        f'{data_folder_path}/{result["metaPath"]}'
+    )
+
+
+@router.get("/{file_id}/tiles")
+async def get_tileset(file_id: str):
+    """Get the tile grid of a binary file.
+    
+    Returns the artifact version, x range, points per tile and deepest level.
+    Clients pass `version` as `v` when requesting tiles so that the tile
+    URLs change when the file is reparsed.
+    """
+    reader = await _get_binary_reader(file_id)
+    if isinstance(reader, Response):
+        return reader
+    
+    grid = TileGrid(reader.x_min, reader.x_max, reader.total_points, settings.TILE_POINTS)
+    return grid.to_dict(reader.artifact_version, [ch['name'] for ch in reader.channels])
+
+
+@router.get("/{file_id}/tiles/{level}/{index}")
+async def get_tile(
+    request: Request,
+    file_id: str,
+    level: int,
+    index: int,
+    channels: Optional[str] = Query(default=None, description="Comma-separated channel names to return (default: all)"),
+    encoding: Literal['float64', 'float32'] = Query(default='float64', description="Value encoding of the response body"),
+    compression: Literal['none', 'deflate'] = Query(default='none', description="Compression of the response body"),
+    v: Optional[str] = Query(default=None, description="Artifact version from the tileset; makes the response immutable"),
+):
+    """Get one tile of a binary file.
+    
+    Tile `index` of `level` covers the fixed x range given by the file's
+    tile grid, resampled to TILE_POINTS points per channel. The body and
+    headers are those of the viewport endpoint, plus:
+    
+    Response Headers:
+        ETag: Depends on the artifact version, tile and channels; a matching
+            If-None-Match gives 304 without reading data
+        Cache-Control: immutable when `v` is the current artifact version,
+            otherwise revalidate on every use
+        X-Tile-Level, X-Tile-Index: The tile served
+    """
+    try:
+        reader = await _get_binary_reader(file_id)
+        if isinstance(reader, Response):
+            return reader
         
-        if len(data) == 0:
+        grid = TileGrid(reader.x_min, reader.x_max, reader.total_points, settings.TILE_POINTS)
+        if not 0 <= level <= grid.max_level or not 0 <= index < grid.tile_count(level):
             return Response(
-                content=np.array([], dtype=np.float64).tobytes(),
-                media_type="application/octet-stream",
-                headers={
-                    "X-Total-Points": "0",
-                    "X-Returned-Points": "0",
-                    "X-Full-Resolution": "true",
-                    "X-Num-Columns": str(reader.num_columns),
-                    "X-X-Min": str(x_min),
-                    "X-X-Max": str(x_max),
-                    "X-Channel-Names": ",".join(ch['name'] for ch in reader.channels),
-                }
+                content=f"Tile {level}/{index} out of range (max level {grid.max_level})".encode(),
+                status_code=404,
+                media_type="text/plain"
             )
         
-        # Extract x and channels
-        x = data[:, 0]
-        channel_arrays = [data[:, i + 1] for i in range(len(reader.channels))]
-        channel_names = [ch['name'] for ch in reader.channels]
+        all_names = [ch['name'] for ch in reader.channels]
+        try:
+            selected = _select_channels(all_names, channels)
+        except ValueError as e:
+            return Response(content=str(e).encode(), status_code=400, media_type="text/plain")
+        channel_names = [all_names[i] for i in selected]
         
-        # Resample if needed
-        resampler = ResamplerService(max_points)
-        x_out, channels_out, is_full = resampler.resample(x, channel_arrays)
+        version = reader.artifact_version
+        cache_headers = {
+            "ETag": tile_etag(version, level, index, grid.tile_points, channel_names, f"{encoding}/{compression}"),
+            "Cache-Control": TILE_CACHE_IMMUTABLE if v == version else TILE_CACHE_REVALIDATE,
+            "X-Tile-Level": str(level),
+            "X-Tile-Index": str(index),
+        }
+        if request.headers.get("if-none-match") == cache_headers["ETag"]:
+            return Response(status_code=304, headers=cache_headers)
         
-        # Pack into binary (row-major: concatenate arrays)
-        result_data = np.concatenate([x_out] + channels_out)
+        tile_min, tile_max = grid.tile_range(level, index)
         
-        logger.debug(f"Viewport response (binary): {len(x_out)} points, {len(channels_out)} channels, {result_data.nbytes} bytes")
+        def compute():
+            x_out, channels_out, original_count, is_full = _read_binary_range(
+                reader, tile_min, tile_max, grid.tile_points, selected, grid.includes_end(level, index)
+            )
+            return _pack_data(
+                x_out, channels_out, channel_names, original_count, is_full, tile_min, tile_max, reader,
+                encoding=encoding, compression=compression
+            )
         
-        return Response(
-            content=result_data.tobytes(),
-            media_type="application/octet-stream",
-            headers={
-                "X-Total-Points": str(original_count),
-                "X-Returned-Points": str(len(x_out)),
-                "X-Full-Resolution": str(is_full).lower(),
-                "X-Num-Columns": str(1 + len(channels_out)),
-                "X-X-Min": str(float(x_out[0])),
-                "X-X-Max": str(float(x_out[-1])),
-                "X-Channel-Names": ",".join(channel_names),
-                "X-X-Type": reader.x_type,
-                "X-X-Format": reader.x_format or "",
-            }
-        )
+        key = ('tile', file_id, version, level, index, grid.tile_points, tuple(channel_names), encoding, compression)
+        content, headers = await get_viewport_cache().get_or_compute(key, compute)
+        return _data_response(content, {**headers, **cache_headers})
         
     except Exception as e:
-        logger.error(f"Viewport error: {e}", exc_info=True)
+        logger.error(f"Tile error: {e}", exc_info=True)
         return Response(
-            content=f"Viewport error: {str(e)}".encode(),
+            content=f"Tile error: {str(e)}".encode(),
             status_code=500,
             media_type="text/plain"
         )
 
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss/eviction counters of the backend data caches, the load of the executor pools and upload throughput"""
+    return {
+        'readers': get_reader_cache_stats(),
+        'viewports': get_viewport_cache().stats(),
+        'eventIndex': get_event_index_cache_stats(),
+        'executors': get_executor_stats(),
+        'uploads': get_upload_stats(),
+    }
+
+
 @router.delete("")
 async def delete_file(file: str):
     """Delete a file"""
-    db = get_db()
     data_folder_path = get_data_folder_path()
     
     file = json.loads(file)
@@ -332,35 +815,28 @@ async def delete_file(file: str):
     file_id = file['_id']['$oid']
     
     # Get folder info before deletion
-    result = db['folders'].find_one({'fileList': file_id})
-    folder_id = str(result['_id']) if result else None
+    file_doc = await files_repo.get(file_id)
+    refs = await files_repo.get_refs(file_doc) if file_doc else None
+    folder_id = refs['folderId'] if refs else None
     
     # Delete database records first (always succeeds)
     # Delete label
-    db['labels'].delete_one({'_id': ObjectId(label_id)})
+    await labels_repo.delete(label_id)
     
     # Update folder
-    if file['nbEvent'] == 'unlabeled':
-        update_dict = {
-            '$pull': {'fileList': file_id}, 
-            '$inc': {'nbTotalFiles': -1}
-        }
-    else:
-        update_dict = {
-            '$pull': {'fileList': file_id}, 
-            '$inc': {'nbTotalFiles': -1, 'nbLabeledFiles': -1}
-        }
-    db['folders'].update_many({'fileList': file_id}, update_dict)
+    if folder_id:
+        await folders_repo.remove_file(folder_id, file_id, labeled=file['nbEvent'] != 'unlabeled')
     
     # Delete file document
-    db['files'].delete_one({'_id': ObjectId(file_id)})
+    await files_repo.delete(file_id)
     
     # Try to delete file directory (don't fail if directory doesn't exist)
     try:
         if folder_id:
             file_path = Path(data_folder_path) / folder_id / file_id
+            evict_readers(str(file_path))
             if file_path.exists():
-                shutil.rmtree(file_path, ignore_errors=True)
+                await run_io(shutil.rmtree, file_path, ignore_errors=True)
                 logger.info(f"Deleted file directory: {file_path}")
             else:
                 logger.warning(f"File directory not found (already deleted?): {file_path}")
@@ -374,32 +850,31 @@ async def delete_file(file: str):
 @router.put("/descriptions")
 async def update_file_description(request: UpdateDescriptionRequest):
     """Update file description"""
-    db = get_db()
-    db['files'].update_one(
-        {'_id': ObjectId(request.file_id)}, 
-        {'$set': {'description': request.description}}
-    )
+    await files_repo.set(request.file_id, {'description': request.description})
     return 'done'
 
 
 @router.put("/reparse")
 async def reparse_files(request: ReparsingFilesRequest):
     """Trigger reparsing of files"""
-    db = get_db()
-    result = db['folders'].find_one({'_id': ObjectId(request.folderId)})
+    result = await folders_repo.get(request.folderId)
     files_id = result['fileList']
     
+    # Drop cached readers of the files about to be rewritten
+    data_folder_path = get_data_folder_path()
+    for file_doc in await files_repo.get_many(files_id, {'binaryPath': 1}):
+        if file_doc.get('binaryPath'):
+            evict_readers(f'{data_folder_path}/{file_doc["binaryPath"]}')
+    
     # Update status to queued
-    db['files'].update_many(
-        {'_id': {'$in': [ObjectId(id) for id in files_id]}}, 
-        {'$set': {'parsing': 'queued'}}
-    )
+    await files_repo.set_parsing(files_id, 'queued')
     
     # Add all files to Redis queue
     try:
         redis = get_redis_client()
         for file_id in files_id:
-            redis.add_file_to_queue(
+            await run_io(
+                redis.add_file_to_queue,
                 file_id=file_id,
                 metadata={'reparse': True, 'folder_id': request.folderId}
             )
@@ -407,68 +882,89 @@ async def reparse_files(request: ReparsingFilesRequest):
     except Exception as e:
         logger.error(f"Failed to add files to Redis queue for reparsing: {e}")
         # Fall back to old method if Redis fails
-        db['files'].update_many(
-            {'_id': {'$in': [ObjectId(id) for id in files_id]}}, 
-            {'$set': {'parsing': 'parsing start'}}
-        )
+        await files_repo.set_parsing(files_id, 'parsing start')
     
     return 'done'
 
 
 @router.get("/data/{folder_id}")
 async def get_files_data(folder_id: str):
-    """Get all file data in folder"""
-    db = get_db()
-    data_folder_path = get_data_folder_path()
+    """Get all file data in folder.
     
-    result = db['folders'].find_one({'_id': ObjectId(folder_id)})
+    Streams [{"file_name": ..., "data": [...]}, ...], each file's data being
+    exported from its binary store while it is sent.
+    """
+    result = await folders_repo.get(folder_id)
     files_id = result['fileList']
-    result = db['files'].find({'_id': {'$in': [ObjectId(id) for id in files_id]}})
     
-    json_path = []
-    file_names = []
-    for file in result:
+    exports = []
+    for file in await files_repo.get_many(files_id):
         if file['parsing'] == 'parsed':
-            json_path.append(file['jsonPath'])
-            file_names.append(file['name'])
+            exports.append((file['name'], _json_export(file)))
     
-    response = []
-    for idx, path in enumerate(json_path):
-        local_json_path = f'{data_folder_path}/{path}'
-        with open(local_json_path, 'r') as f:
-            data = json.load(f)
-        response.append({'file_name': file_names[idx], 'data': data})
+    def body():
+        yield '['
+        for idx, (file_name, export) in enumerate(exports):
+            yield (', ' if idx else '') + '{"file_name": ' + json.dumps(file_name) + ', "data": '
+            yield from export() if export is not None else ['"none"']
+            yield '}'
+        yield ']'
     
-    return dumps(response)
+    return StreamingResponse(body(), media_type="application/json")
+
+
+def _json_export(file_doc: dict) -> Optional[Callable[[], Iterator[str]]]:
+    """
+    Full data of a file as JSON text, piece by piece.
+    
+    Exported from the binary store; files parsed before every file had one
+    fall back to the JSON file written at the time. Nothing is opened until
+    the export is started, so a download only holds the file it is sending.
+    
+    Args:
+        file_doc: File document
+    
+    Returns:
+        Function starting the export: an iterator of JSON text pieces (to
+        call and iterate in a thread), or None if the file has no data
+    """
+    data_folder_path = get_data_folder_path()
+    if file_doc.get('binaryPath'):
+        binary_path = f'{data_folder_path}/{file_doc["binaryPath"]}'
+        meta_path = f'{data_folder_path}/{file_doc["metaPath"]}'
+        return lambda: iter_json_export(get_data_reader(binary_path, meta_path))
+    if file_doc.get('jsonPath'):
+        json_path = f'{data_folder_path}/{file_doc["jsonPath"]}'
+        return lambda: iter_json_file(json_path)
+    return None
 
 
 @router.get("/events/{folder_id}")
 async def get_files_events(folder_id: str):
     """Get all file events in folder"""
-    db = get_db()
-    result = db['folders'].find_one({'_id': ObjectId(folder_id)})
+    result = await folders_repo.get(folder_id)
     files_id = result['fileList']
-    result = db['files'].find({'_id': {'$in': [ObjectId(id) for id in files_id]}})
     
-    labels_id = []
-    file_names = []
-    for file in result:
+    # File name of each label
+    file_names = {}
+    for file in await files_repo.get_many(files_id, {'parsing': 1, 'label': 1, 'name': 1}):
         if file['parsing'] == 'parsed':
-            labels_id.append(file['label'])
-            file_names.append(file['name'])
+            file_names[file['label']] = file['name']
     
-    result = db['labels'].find({'_id': {'$in': [ObjectId(id) for id in labels_id]}})
     response = []
-    for idx, label in enumerate(result):
-        response.append({'file_name': file_names[idx], 'events': label['events']})
+    for label in await labels_repo.get_many(file_names, {'events': 1}):
+        response.append({'file_name': file_names[str(label['_id'])], 'events': label['events']})
     
     return dumps(response)
 
 
 @router.post("/jsonfiles")
 async def download_project_files(request: DownloadJsonFilesRequest):
-    """Bulk download all files in project (password protected)"""
-    db = get_db()
+    """Bulk download all files in project (password protected).
+    
+    Streams {file_id: {"name", "data", "label"}}, each file's data being
+    exported from its binary store while it is sent.
+    """
     data_folder_path = get_data_folder_path()
     
     project_id = request.projectId
@@ -478,29 +974,32 @@ async def download_project_files(request: DownloadJsonFilesRequest):
         return {'error': 'incorrect password'}
     
     data_folder_path = Path(data_folder_path)
-    file_ids = [f.name for f in (data_folder_path / project_id).iterdir()]
-    json_response = {}
+    file_ids = await run_io(lambda: [f.name for f in (data_folder_path / project_id).iterdir()])
+    
+    # Two batched lookups instead of a file and a label lookup per file
+    files_by_id = {str(f['_id']): f for f in await files_repo.get_many(file_ids)}
+    labels_by_id = {
+        str(l['_id']): l
+        for l in await labels_repo.get_many([f['label'] for f in files_by_id.values() if 'label' in f])
+    }
     
+    entries = []
     for file_id in file_ids:
-        file_db = db['files'].find_one({'_id': ObjectId(file_id)})
-        if file_db is not None and 'jsonPath' in file_db:
-            filename = file_db['name']
-            json_path = file_db['jsonPath']
-            with open(data_folder_path / json_path) as f:
-                data = json.load(f)
-        else:
-            data = 'none'
+        file_db = files_by_id.get(file_id)
+        if file_db is None:
+            continue
         
-        if 'label' in file_db:
-            label = db['labels'].find_one({'_id': ObjectId(file_db['label'])})
-            if label is not None:
-                label = json.loads(dumps(label))
-            else:
-                label = 'none'
-        else:
-            label = 'none'
+        label = labels_by_id.get(file_db['label']) if 'label' in file_db else None
+        label = json.loads(dumps(label)) if label is not None else 'none'
         
-        json_response[file_id] = {'name': filename, 'data': data, 'label': dumps(label)}
+        entries.append((file_id, file_db['name'], _json_export(file_db), dumps(label)))
     
-    return json_response
-
+    def body():
+        yield '{'
+        for idx, (file_id, filename, export, label) in enumerate(entries):
+            yield (', ' if idx else '') + json.dumps(file_id) + ': {"name": ' + json.dumps(filename) + ', "data": '
+            yield from export() if export is not None else ['"none"']
+            yield ', "label": ' + json.dumps(label) + '}'
+        yield '}'
+    
+    return StreamingResponse(body(), media_type="application/json")
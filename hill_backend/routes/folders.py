@@ -1,14 +1,15 @@
 """Folder Routes"""
 from fastapi import APIRouter
-from bson.objectid import ObjectId
 from bson.json_util import dumps
 import simplejson as json
 from pathlib import Path
 import shutil
 import logging
 
-from database import get_db, get_data_folder_path
+from database import get_data_folder_path
 from models import NewFolderRequest
+from repositories import folders_repo, files_repo, labels_repo, users_repo
+from services import run_io, evict_readers
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +19,6 @@ router = APIRouter(prefix="/folders", tags=["folders"])
 @router.post("")
 async def create_folder(folder: NewFolderRequest):
     """Create new folder"""
-    db = get_db()
-    
     # Add new folder
     newFolder = {
         'name': folder.newFolderName,
@@ -35,14 +34,10 @@ async def create_folder(folder: NewFolderRequest):
         'nbLabeledFiles': 0,
         'nbTotalFiles': 0,
     }
-    result = db['folders'].insert_one(newFolder)
-    newFolderId = result.inserted_id
+    newFolderId = await folders_repo.insert(newFolder)
     
     # Update user
-    db['users'].update_one(
-        {'_id': ObjectId(folder.userId)}, 
-        {'$push': {'folderList': str(newFolderId)}}
-    )
+    await users_repo.add_folder(folder.userId, str(newFolderId))
     
     return 'done'
 
@@ -50,24 +45,20 @@ async def create_folder(folder: NewFolderRequest):
 @router.get("")
 async def get_folders(folders: str):
     """Get multiple folders"""
-    db = get_db()
     folders = json.loads(folders)
-    result = db['folders'].find({'_id': {'$in': [ObjectId(f) for f in folders]}})
-    return dumps(result)
+    return dumps(await folders_repo.get_many(folders))
 
 
 @router.get("/{folder_id}")
 async def get_folder(folder_id: str):
     """Get single folder"""
-    db = get_db()
-    result = db['folders'].find_one({'_id': ObjectId(folder_id)})
+    result = await folders_repo.get(folder_id)
     return dumps(result)
 
 
 @router.delete("")
 async def delete_folder(folder: str):
     """Delete folder and all files"""
-    db = get_db()
     data_folder_path = get_data_folder_path()
     
     folder = json.loads(folder)
@@ -75,28 +66,26 @@ async def delete_folder(folder: str):
     folder_id = folder['_id']['$oid']
     
     # Delete labels
-    files = db['files'].find({'_id': {'$in': [ObjectId(f) for f in files_id]}})
+    files = await files_repo.get_many(files_id, {'label': 1})
     labels = [file.get('label') for file in files if file.get('label')]
     if labels:
-        db['labels'].delete_many({'_id': {'$in': [ObjectId(l) for l in labels]}})
+        await labels_repo.delete_many(labels)
     
     # Delete files
-    db['files'].delete_many({'_id': {'$in': [ObjectId(f) for f in files_id]}})
+    await files_repo.delete_many(files_id)
     
     # Remove folder from users
-    db['users'].update_many(
-        {'folderList': folder_id}, 
-        {'$pull': {'folderList': folder_id}}
-    )
+    await users_repo.remove_folder_from_all(folder_id)
     
     # Delete folder document
-    db['folders'].delete_one({'_id': ObjectId(folder_id)})
+    await folders_repo.delete(folder_id)
     
     # Try to delete folder directory (don't fail if directory doesn't exist)
     try:
         folder_path = Path(data_folder_path) / folder_id
+        evict_readers(str(folder_path))
         if folder_path.exists():
-            shutil.rmtree(folder_path, ignore_errors=True)
+            await run_io(shutil.rmtree, folder_path, ignore_errors=True)
             logger.info(f"Deleted folder directory: {folder_path}")
         else:
             logger.warning(f"Folder directory not found (already deleted?): {folder_path}")
@@ -1,67 +1,104 @@
 """Label and Event Routes"""
-from fastapi import APIRouter, UploadFile, Form
-from typing import Annotated
-from bson.objectid import ObjectId
-from bson.json_util import dumps
+from fastapi import APIRouter, UploadFile, Form, Response
+from typing import Annotated, Optional
 from datetime import datetime, timezone
+from bson.json_util import dumps
 import simplejson as json
 
-from database import get_db
-from models import UpdateLabelRequest, NewClassRequest, UpdateClassRequest
+from repositories import (
+    labels_repo, files_repo, folders_repo, projects_repo,
+    assign_ids, count_events, format_event_counts
+)
+from services import EventIndex, event_position, class_counts, get_event_index_cache, run_cpu
+from models import (
+    UpdateLabelRequest, AddLabelItemRequest, UpdateLabelItemRequest,
+    NewClassRequest, UpdateClassRequest
+)
 
 router = APIRouter(prefix="/labels", tags=["labels"])
 
+# Reads of a label that keeps changing before its missing item IDs can be stored
+ASSIGN_IDS_ATTEMPTS = 3
+
 
 def calculate_event_display(events: list[dict]) -> str:
-    """Helper: Calculate event count display like '3 by Alice; 2 by Bob'"""
-    if len(events) == 0:
-        return '0'
+    """Helper: Calculate event count display like '3 by Alice;2 by Bob'"""
+    return format_event_counts(count_events(events))
+
+
+async def _record_label_change(label_id: str, events: list[dict], user: str):
+    """Helper: Update the event count of the label's file and count the file as labeled on its first label"""
+    file_doc = await files_repo.find_by_label(label_id)
+    previous_nbEvents = file_doc['nbEvent']
+    new_nbEvents = calculate_event_display(events)
+    
+    await files_repo.set_label_summary(label_id, new_nbEvents, user)
+    
+    if previous_nbEvents == 'unlabeled':
+        refs = await files_repo.get_refs(file_doc)
+        if refs:
+            await folders_repo.count_labeled_file(refs['folderId'])
+
+
+async def _record_event_count_change(label_id: str, changes: dict[str, int], user: str) -> Optional[str]:
+    """Helper: Adjust the event count of the label's file by labeler and count the file as labeled on its first label"""
+    result = await files_repo.adjust_event_counts(label_id, changes, user)
+    if result is None:
+        return None
+    file_doc, previous_nbEvents, new_nbEvents = result
     
-    labelers = list(set([e['labeler'] for e in events]))
-    parts = []
-    for labeler in labelers:
-        count = len([e for e in events if e['labeler'] == labeler])
-        parts.append(f'{count} by {labeler}')
+    if previous_nbEvents == 'unlabeled':
+        refs = await files_repo.get_refs(file_doc)
+        if refs:
+            await folders_repo.count_labeled_file(refs['folderId'])
     
-    return ';'.join(parts)
+    return new_nbEvents
+
+
+def _not_found(what: str) -> Response:
+    """Helper: 404 response for a missing label, event or guideline"""
+    return Response(content=f"{what} not found".encode(), status_code=404, media_type="text/plain")
+
+
+async def _read_with_ids(read, label_id: str, fields: tuple[str, ...]) -> Optional[dict]:
+    """Helper: Read a label, storing IDs on events and guidelines saved before they had one"""
+    for _ in range(ASSIGN_IDS_ATTEMPTS):
+        label = await read(label_id)
+        if label is None or await labels_repo.assign_missing_ids(label, fields):
+            return label
+    # Still changing: return it as stored, the next read assigns the IDs
+    return await read(label_id)
+
+
+def _item_changes(changes: dict) -> tuple[dict, Optional[Response]]:
+    """Helper: Fields to set on an event or guideline, or a 400 response for an invalid field name"""
+    for key in changes:
+        if not key or '.' in key or key.startswith('$'):
+            return {}, Response(content=f"Invalid field: {key!r}".encode(), status_code=400, media_type="text/plain")
+    changes = {key: value for key, value in changes.items() if key != 'id'}
+    if not changes:
+        return {}, Response(content=b"No changes", status_code=400, media_type="text/plain")
+    return changes, None
 
 
 @router.get("/{label_id}")
 async def get_label(label_id: str):
     """Get label by ID"""
-    db = get_db()
-    result = db['labels'].find_one({'_id': ObjectId(label_id)})
+    result = await _read_with_ids(labels_repo.get, label_id, ('events', 'guidelines'))
     return dumps(result)
 
 
 @router.put("")
 async def update_label(request: UpdateLabelRequest):
     """Update label"""
-    db = get_db()
     label_info = request.label
     label_id = label_info['_id']['$oid']
     del label_info['_id']
+    assign_ids(label_info.get('events', []))
+    assign_ids(label_info.get('guidelines', []))
     
-    db['labels'].update_one({'_id': ObjectId(label_id)}, {'$set': label_info})
-    
-    file = db['files'].find_one({'label': label_id})
-    previous_nbEvents = file['nbEvent']
-    new_nbEvents = calculate_event_display(label_info['events'])
-    
-    db['files'].update_one(
-        {'label': label_id}, 
-        {'$set': {
-            'nbEvent': new_nbEvents, 
-            'lastModifier': request.user, 
-            'lastUpdate': datetime.now(tz=timezone.utc)
-        }}
-    )
-    
-    if previous_nbEvents == 'unlabeled':
-        db['folders'].update_one(
-            {'fileList': str(file['_id'])}, 
-            {'$inc': {'nbLabeledFiles': 1}}
-        )
+    await labels_repo.set(label_id, label_info)
+    await _record_label_change(label_id, label_info['events'], request.user)
     
     return 'done'
 
@@ -69,8 +106,7 @@ async def update_label(request: UpdateLabelRequest):
 @router.post("/event")
 async def add_event(data: Annotated[str, Form()], user: Annotated[str, Form()], file: UploadFile):
     """Add single event (can include both events and guidelines)"""
-    db = get_db()
-    import_data = file.file.read()
+    import_data = await file.read()
     import_data = json.loads(import_data)
     label_id = data
     user_name = user
@@ -91,106 +127,223 @@ async def add_event(data: Annotated[str, Form()], user: Annotated[str, Form()],
             update_dict['guidelines'] = import_data['guidelines']
     
     if update_dict:
-        db['labels'].update_one({'_id': ObjectId(label_id)}, {'$set': update_dict})
+        for items in update_dict.values():
+            assign_ids(items)
+        await labels_repo.set(label_id, update_dict)
     
-    file_doc = db['files'].find_one({'label': label_id})
-    previous_nbEvents = file_doc['nbEvent']
-    new_nbEvents = calculate_event_display(events_list)
-    
-    db['files'].update_one(
-        {'label': label_id}, 
-        {'$set': {
-            'nbEvent': new_nbEvents, 
-            'lastModifier': user_name, 
-            'lastUpdate': datetime.now(tz=timezone.utc)
-        }}
-    )
-    
-    if previous_nbEvents == 'unlabeled':
-        db['folders'].update_one(
-            {'fileList': str(file_doc['_id'])}, 
-            {'$inc': {'nbLabeledFiles': 1}}
-        )
+    await _record_label_change(label_id, events_list, user_name)
     
     return 'done'
 
 
+def _valid_events(events) -> bool:
+    """Helper: Whether an imported event list can be stored (every event names its labeler)"""
+    return isinstance(events, list) and all(isinstance(e, dict) and 'labeler' in e for e in events)
+
+
 @router.post("/events")
 async def add_events_bulk(data: Annotated[str, Form()], user: Annotated[str, Form()], file: UploadFile):
-    """Add multiple events"""
-    db = get_db()
-    event_info_list = file.file.read()
+    """
+    Replace the events of many files of a folder
+    
+    The import file is a list of {file_name, events}. Files and labels are
+    read with one query each, label and file updates are applied with ordered
+    bulk writes, and the folder's labeled-file count is recomputed once.
+    The response reports the outcome of every entry.
+    """
+    event_info_list = await file.read()
     event_info_list = json.loads(event_info_list)
     folder_id = data
     
-    result = db['folders'].find_one({'_id': ObjectId(folder_id)})
+    result = await folders_repo.get(folder_id)
     files_list = result['fileList']
-    result = db['files'].find({'_id': {'$in': [ObjectId(id) for id in files_list]}})
     
-    file_name_dict = {}
-    for file_doc in result:
-        file_name_dict[file_doc['name']] = file_doc['label']
+    file_by_name = {}
+    for file_doc in await files_repo.get_many(files_list, {'name': 1, 'label': 1}):
+        file_by_name[file_doc['name']] = file_doc
+    existing_labels = {
+        str(label['_id'])
+        for label in await labels_repo.get_many([f['label'] for f in file_by_name.values()], {'_id': 1})
+    }
     
+    # One entry per imported file; the last entry for a file wins, as before
+    results = []
+    imports = {}
     for event in event_info_list:
-        if event['file_name'] in file_name_dict:
-            label_id = file_name_dict[event['file_name']]
-            db['labels'].update_one(
-                {'_id': ObjectId(label_id)}, 
-                {'$set': {'events': event['events']}}
-            )
-            
-            file_doc = db['files'].find_one({'label': label_id})
-            previous_nbEvents = file_doc['nbEvent']
-            new_nbEvents = calculate_event_display(event['events'])
-            
-            db['files'].update_one(
-                {'label': label_id}, 
-                {'$set': {
-                    'nbEvent': new_nbEvents, 
-                    'lastModifier': user, 
-                    'lastUpdate': datetime.now(tz=timezone.utc)
-                }}
-            )
-            
-            if previous_nbEvents == 'unlabeled':
-                db['folders'].update_one(
-                    {'fileList': str(file_doc['_id'])}, 
-                    {'$inc': {'nbLabeledFiles': 1}}
-                )
+        file_name = event.get('file_name') if isinstance(event, dict) else None
+        file_doc = file_by_name.get(file_name)
+        if file_doc is None:
+            results.append({'fileName': file_name, 'success': False, 'error': 'File not found in folder'})
+        elif file_doc['label'] not in existing_labels:
+            results.append({'fileName': file_name, 'success': False, 'error': 'Label not found'})
+        elif not _valid_events(event.get('events')):
+            results.append({'fileName': file_name, 'success': False, 'error': 'Events must be a list of events with a labeler'})
+        else:
+            results.append({'fileName': file_name, 'success': True})
+            assign_ids(event['events'])
+            imports[file_name] = (file_doc, event['events'])
     
-    return 'done'
+    now = datetime.now(tz=timezone.utc)
+    entries = list(imports.values())
+    label_errors = await labels_repo.bulk_set([
+        (file_doc['label'], {'events': events}) for file_doc, events in entries
+    ])
+    labeled = [entry for entry, error in zip(entries, label_errors) if error is None]
+    file_errors = await files_repo.bulk_set([
+        (file_doc['_id'], {'nbEvent': calculate_event_display(events), 'lastModifier': user, 'lastUpdate': now})
+        for file_doc, events in labeled
+    ])
+    
+    failed = {file_doc['name']: error for (file_doc, _), error in zip(entries, label_errors) if error is not None}
+    failed.update({file_doc['name']: error for (file_doc, _), error in zip(labeled, file_errors) if error is not None})
+    for entry in results:
+        if entry['success'] and entry['fileName'] in failed:
+            entry.update(success=False, error=failed[entry['fileName']])
+    
+    await folders_repo.set(folder_id, {'nbLabeledFiles': await files_repo.count_labeled(files_list)})
+    
+    nb_imported = sum(1 for entry in results if entry['success'])
+    return {'imported': nb_imported, 'failed': len(results) - nb_imported, 'files': results}
+
+
+@router.post("/{label_id}/events")
+async def add_label_event(label_id: str, request: AddLabelItemRequest):
+    """
+    Append one event to a label
+    
+    Only the new event is sent and written; the file's event count is
+    adjusted for its labeler (the requesting user if the event has none).
+    """
+    event = dict(request.item)
+    event.setdefault('labeler', request.user)
+    if not await labels_repo.push_items(label_id, 'events', [event]):
+        return _not_found('Label')
+    
+    nb_event = await _record_event_count_change(label_id, {event['labeler']: 1}, request.user)
+    return {'id': event['id'], 'nbEvent': nb_event}
+
+
+@router.get("/{label_id}/events")
+async def get_label_events(label_id: str, start: Optional[str] = None, end: Optional[str] = None):
+    """
+    Get the events of a label overlapping a viewport
+    
+    Bounds are x values as the chart sends them (numbers or date strings);
+    a missing bound leaves that side open. The label's interval index is
+    cached until its events change, so a pan or zoom reads one small
+    version field instead of every event.
+    """
+    bounds = []
+    for value, default in ((start, float('-inf')), (end, float('inf'))):
+        position = default if value is None else event_position(value)
+        if position is None:
+            return Response(content=f"Invalid bound: {value}".encode(), status_code=400, media_type="text/plain")
+        bounds.append(position)
+    
+    version = await labels_repo.get_events_version(label_id)
+    if version is None:
+        return _not_found('Label')
+    
+    cache = get_event_index_cache()
+    index = cache.get(label_id, version)
+    if index is None:
+        label = await _read_with_ids(labels_repo.get_events, label_id, ('events',))
+        if label is None:
+            return _not_found('Label')
+        index = await run_cpu(EventIndex.build, label.get('eventsVersion', 0), label.get('events', []))
+        cache.put(label_id, index)
+    
+    events = index.overlapping(min(bounds), max(bounds))
+    return {
+        'labelId': label_id,
+        'total': len(index),
+        'count': len(events),
+        'classCounts': class_counts(events),
+        'events': events,
+    }
+
+
+@router.patch("/{label_id}/events/{event_id}")
+async def update_label_event(label_id: str, event_id: str, request: UpdateLabelItemRequest):
+    """Change fields of one event (its `id` cannot change)"""
+    changes, error = _item_changes(request.changes)
+    if error is not None:
+        return error
+    
+    previous = await labels_repo.update_item(label_id, 'events', event_id, changes)
+    if previous is None:
+        return _not_found('Event')
+    
+    count_changes = {}
+    if 'labeler' in changes and changes['labeler'] != previous.get('labeler'):
+        count_changes = {previous.get('labeler'): -1, changes['labeler']: 1}
+    nb_event = await _record_event_count_change(label_id, count_changes, request.user)
+    return {'id': event_id, 'nbEvent': nb_event}
+
+
+@router.delete("/{label_id}/events/{event_id}")
+async def delete_label_event(label_id: str, event_id: str, user: str):
+    """Remove one event"""
+    removed = await labels_repo.pull_item(label_id, 'events', event_id)
+    if not removed:
+        return _not_found('Event')
+    
+    # Events stored twice under one ID are all removed, and counted as such
+    changes: dict[str, int] = {}
+    for event in removed:
+        changes[event.get('labeler')] = changes.get(event.get('labeler'), 0) - 1
+    nb_event = await _record_event_count_change(label_id, changes, user)
+    return {'id': event_id, 'nbEvent': nb_event}
+
+
+@router.post("/{label_id}/guidelines")
+async def add_label_guideline(label_id: str, request: AddLabelItemRequest):
+    """Append one guideline to a label"""
+    guideline = dict(request.item)
+    if not await labels_repo.push_items(label_id, 'guidelines', [guideline]):
+        return _not_found('Label')
+    
+    await _record_event_count_change(label_id, {}, request.user)
+    return {'id': guideline['id']}
+
+
+@router.patch("/{label_id}/guidelines/{guideline_id}")
+async def update_label_guideline(label_id: str, guideline_id: str, request: UpdateLabelItemRequest):
+    """Change fields of one guideline (its `id` cannot change)"""
+    changes, error = _item_changes(request.changes)
+    if error is not None:
+        return error
+    
+    if await labels_repo.update_item(label_id, 'guidelines', guideline_id, changes) is None:
+        return _not_found('Guideline')
+    
+    await _record_event_count_change(label_id, {}, request.user)
+    return {'id': guideline_id}
+
+
+@router.delete("/{label_id}/guidelines/{guideline_id}")
+async def delete_label_guideline(label_id: str, guideline_id: str, user: str):
+    """Remove one guideline"""
+    if not await labels_repo.pull_item(label_id, 'guidelines', guideline_id):
+        return _not_found('Guideline')
+    
+    await _record_event_count_change(label_id, {}, user)
+    return {'id': guideline_id}
 
 
 @router.post("/classes")
 async def add_class(class_: NewClassRequest):
     """Add new class to project"""
-    db = get_db()
-    db['projects'].update_one(
-        {'_id': ObjectId(class_.projectId)}, 
-        {'$push': {
-            'classes': {
-                'name': class_.newClassName, 
-                'color': class_.newClassColor, 
-                'description': class_.description
-            }
-        }}
-    )
+    await projects_repo.add_class(class_.projectId, class_.newClassName, class_.newClassColor, class_.description)
     return 'done'
 
 
 @router.put("/classes")
 async def update_class(newClass: UpdateClassRequest):
     """Update existing class"""
-    db = get_db()
-    db['projects'].update_one(
-        {'_id': ObjectId(newClass.projectId), 'classes.name': newClass.updatingClassName}, 
-        {'$set': {
-            'classes.$': {
-                'name': newClass.newClassName, 
-                'color': newClass.newClassColor, 
-                'description': newClass.description
-            }
-        }}
+    await projects_repo.replace_class(
+        newClass.projectId, newClass.updatingClassName,
+        newClass.newClassName, newClass.newClassColor, newClass.description
     )
     return 'done'
 
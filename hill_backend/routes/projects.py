@@ -1,10 +1,9 @@
 """Project Routes"""
 from fastapi import APIRouter
-from bson.objectid import ObjectId
 from bson.json_util import dumps
 import simplejson as json
 
-from database import get_db
+from repositories import projects_repo, users_repo
 from models import NewProjectRequest, UpdateProjectDescriptionsRequest, NewClassRequest, UpdateClassRequest
 
 router = APIRouter(prefix="/projects", tags=["projects"])
@@ -13,21 +12,16 @@ router = APIRouter(prefix="/projects", tags=["projects"])
 @router.post("")
 async def create_project(project: NewProjectRequest):
     """Create a new project"""
-    db = get_db()
     new_project = {
         'projectName': project.projectName,
         'templates': [],
         'classes': [],
         'general_pattern_description': '',
     }
-    result = db['projects'].insert_one(new_project)
-    new_project['_id'] = result.inserted_id
+    new_project['_id'] = await projects_repo.insert(new_project)
     
     # Add project to user's list
-    db['users'].update_one(
-        {'_id': ObjectId(project.userId)}, 
-        {'$push': {'projectList': str(result.inserted_id)}}
-    )
+    await users_repo.add_project(project.userId, str(new_project['_id']))
     
     return dumps(new_project)
 
@@ -35,37 +29,21 @@ async def create_project(project: NewProjectRequest):
 @router.get("")
 async def get_projects(projects: str):
     """Get multiple projects"""
-    db = get_db()
     projects = json.loads(projects)
-    result = db['projects'].find({'_id': {'$in': [ObjectId(f) for f in projects]}})
-    return dumps(result)
+    return dumps(await projects_repo.get_many(projects))
 
 
 @router.put("/descriptions")
 async def update_project_descriptions(request: UpdateProjectDescriptionsRequest):
     """Update project descriptions"""
-    db = get_db()
-    project_id = ObjectId(request.projectId)
+    project_id = request.projectId
     
     # Update general description
-    db['projects'].update_one(
-        {'_id': project_id}, 
-        {'$set': {'general_pattern_description': request.generalDescription}}
-    )
+    await projects_repo.set(project_id, {'general_pattern_description': request.generalDescription})
     
     # Update class descriptions
     for class_desc in request.classDescriptions:
-        db['projects'].update_one(
-            {
-                '_id': project_id,
-                'classes.name': class_desc['name']
-            }, 
-            {
-                '$set': {
-                    'classes.$.description': class_desc['description']
-                }
-            }
-        )
+        await projects_repo.set_class_description(project_id, class_desc['name'], class_desc['description'])
     
     return 'done'
 
@@ -73,33 +51,16 @@ async def update_project_descriptions(request: UpdateProjectDescriptionsRequest)
 @router.post("/classes")
 async def add_class(class_: NewClassRequest):
     """Add new class to project"""
-    db = get_db()
-    db['projects'].update_one(
-        {'_id': ObjectId(class_.projectId)}, 
-        {'$push': {
-            'classes': {
-                'name': class_.newClassName, 
-                'color': class_.newClassColor, 
-                'description': class_.description
-            }
-        }}
-    )
+    await projects_repo.add_class(class_.projectId, class_.newClassName, class_.newClassColor, class_.description)
     return 'done'
 
 
 @router.put("/classes")
 async def update_class(newClass: UpdateClassRequest):
     """Update existing class"""
-    db = get_db()
-    db['projects'].update_one(
-        {'_id': ObjectId(newClass.projectId), 'classes.name': newClass.updatingClassName}, 
-        {'$set': {
-            'classes.$': {
-                'name': newClass.newClassName, 
-                'color': newClass.newClassColor, 
-                'description': newClass.description
-            }
-        }}
+    await projects_repo.replace_class(
+        newClass.projectId, newClass.updatingClassName,
+        newClass.newClassName, newClass.newClassColor, newClass.description
     )
     return 'done'
 
@@ -107,9 +68,5 @@ async def update_class(newClass: UpdateClassRequest):
 @router.delete("/classes")
 async def delete_class(projectId: str, className: str):
     """Delete class from project"""
-    db = get_db()
-    db['projects'].update_one(
-        {'_id': ObjectId(projectId)},
-        {'$pull': {'classes': {'name': className}}}
-    )
+    await projects_repo.delete_class(projectId, className)
     return 'done'
@@ -1,13 +1,13 @@
 """Template Routes"""
 from fastapi import APIRouter, UploadFile, Form
 from typing import Annotated
-from bson.objectid import ObjectId
 from bson.json_util import dumps
 import tempfile
 import pandas as pd
 import os
 
-from database import get_db
+from repositories import templates_repo, projects_repo
+from services import run_io
 from models import NewTemplateRequest, UpdateTemplateRequest, CloneTemplateRequest
 
 router = APIRouter(prefix="/templates", tags=["templates"])
@@ -16,9 +16,6 @@ router = APIRouter(prefix="/templates", tags=["templates"])
 @router.post("")
 async def create_template(request: NewTemplateRequest):
     """Create new template"""
-    db = get_db()
-    projectId = ObjectId(request.projectId)
-    
     # Add new template with complete default structure
     new_template = {
         'templateName': request.templateName,
@@ -35,19 +32,15 @@ async def create_template(request: NewTemplateRequest):
         'skipRow': 0,
         'sheetName': 0
     }
-    result = db['templates'].insert_one(new_template)
-    new_template_id = result.inserted_id
+    new_template_id = await templates_repo.insert(new_template)
     new_template['_id'] = new_template_id
     
     # Add template to project
-    db['projects'].update_one(
-        {'_id': projectId}, 
-        {'$push': {'templates': {
-            'id': str(new_template_id), 
-            'name': request.templateName, 
-            'fileType': request.fileType
-        }}}
-    )
+    await projects_repo.add_template(request.projectId, {
+        'id': str(new_template_id), 
+        'name': request.templateName, 
+        'fileType': request.fileType
+    })
     
     return str(new_template_id)
 
@@ -55,29 +48,23 @@ async def create_template(request: NewTemplateRequest):
 @router.get("/{template_id}")
 async def get_template(template_id: str):
     """Get template by ID"""
-    db = get_db()
-    templateInfo = db['templates'].find_one({'_id': ObjectId(template_id)})
+    templateInfo = await templates_repo.get(template_id)
     return dumps(templateInfo)
 
 
 @router.put("")
 async def update_template(request: UpdateTemplateRequest):
     """Update template"""
-    db = get_db()
     template = request.request
     project_id = request.projectId
-    template_id = ObjectId(template['_id']['$oid'])
+    template_id = template['_id']['$oid']
     
     del template['_id']
     template['headRow'] = int(template['headRow'])
     template['skipRow'] = int(template['skipRow'])
     
-    db['templates'].update_one({'_id': template_id}, {'$set': template})
-    db['projects'].update_one(
-        {'_id': ObjectId(project_id)}, 
-        {'$set': {'templates.$[elem].fileType': template['fileType']}}, 
-        array_filters=[{'elem.id': str(template_id)}]
-    )
+    await templates_repo.set(template_id, template)
+    await projects_repo.set_template_file_type(project_id, template_id, template['fileType'])
     
     return 'done'
 
@@ -85,23 +72,18 @@ async def update_template(request: UpdateTemplateRequest):
 @router.put("/clone")
 async def clone_template(request: CloneTemplateRequest):
     """Clone existing template"""
-    db = get_db()
-    result = db['templates'].find_one({'_id': ObjectId(request.templateId)})
+    result = await templates_repo.get(request.templateId)
     fileType = result['fileType']
     result['templateName'] = request.newTemplateName
     del result['_id']
     
-    result = db['templates'].insert_one(result)
-    new_template_id = result.inserted_id
+    new_template_id = await templates_repo.insert(result)
     
-    db['projects'].update_one(
-        {'_id': ObjectId(request.projectId)}, 
-        {'$push': {'templates': {
-            'id': str(new_template_id), 
-            'name': request.newTemplateName, 
-            'fileType': fileType
-        }}}
-    )
+    await projects_repo.add_template(request.projectId, {
+        'id': str(new_template_id), 
+        'name': request.newTemplateName, 
+        'fileType': fileType
+    })
     
     return str(new_template_id)
 
@@ -109,10 +91,9 @@ async def clone_template(request: CloneTemplateRequest):
 @router.post("/extract-columns")
 async def extract_columns(file: UploadFile, templateId: Annotated[str, Form()]):
     """Extract columns from uploaded file"""
-    db = get_db()
     try:
         # Get template information
-        template = db['templates'].find_one({'_id': ObjectId(templateId)})
+        template = await templates_repo.get(templateId)
         if not template:
             return {'error': 'Template not found'}
         
@@ -124,55 +105,8 @@ async def extract_columns(file: UploadFile, templateId: Annotated[str, Form()]):
             tmp_file_path = tmp_file.name
         
         try:
-            # Read file based on file type
-            file_type = template.get('fileType', '.xlsx')
-            
-            if file_type == '.xlsx':
-                sheet_name = template.get('sheetName', 0)
-                try:
-                    sheet_name = int(sheet_name)
-                except:
-                    pass
-                df = pd.read_excel(
-                    tmp_file_path, 
-                    sheet_name=sheet_name, 
-                    engine='openpyxl', 
-                    header=template.get('headRow', 0)
-                )
-            elif file_type == '.xls':
-                sheet_name = template.get('sheetName', 0)
-                try:
-                    sheet_name = int(sheet_name)
-                except:
-                    pass
-                df = pd.read_excel(
-                    tmp_file_path, 
-                    sheet_name=sheet_name, 
-                    engine='xlrd', 
-                    header=template.get('headRow', 0)
-                )
-            elif file_type == '.csv':
-                df = pd.read_csv(tmp_file_path, header=template.get('headRow', 0))
-            else:
-                return {'error': 'Unsupported file type'}
-            
-            # Extract column information
-            columns = []
-            for i, column_name in enumerate(df.columns):
-                # Get first non-null value as sample data
-                sample_data = ""
-                for value in df[column_name].dropna():
-                    if pd.notna(value):
-                        sample_data = str(value)
-                        break
-                
-                columns.append({
-                    'name': str(column_name),
-                    'index': i,
-                    'sampleData': sample_data
-                })
-            
-            return {'columns': columns}
+            # Parsing the sample runs pandas, so it stays off the event loop
+            return await run_io(_extract_columns, tmp_file_path, template)
             
         finally:
             # Clean up temporary file
@@ -182,18 +116,66 @@ async def extract_columns(file: UploadFile, templateId: Annotated[str, Form()]):
         return {'error': f'Failed to process file: {str(e)}'}
 
 
+def _extract_columns(tmp_file_path: str, template: dict) -> dict:
+    """Read an uploaded sample file with a template's settings and describe its columns"""
+    # Read file based on file type
+    file_type = template.get('fileType', '.xlsx')
+    
+    if file_type == '.xlsx':
+        sheet_name = template.get('sheetName', 0)
+        try:
+            sheet_name = int(sheet_name)
+        except:
+            pass
+        df = pd.read_excel(
+            tmp_file_path, 
+            sheet_name=sheet_name, 
+            engine='openpyxl', 
+            header=template.get('headRow', 0)
+        )
+    elif file_type == '.xls':
+        sheet_name = template.get('sheetName', 0)
+        try:
+            sheet_name = int(sheet_name)
+        except:
+            pass
+        df = pd.read_excel(
+            tmp_file_path, 
+            sheet_name=sheet_name, 
+            engine='xlrd', 
+            header=template.get('headRow', 0)
+        )
+    elif file_type == '.csv':
+        df = pd.read_csv(tmp_file_path, header=template.get('headRow', 0))
+    else:
+        return {'error': 'Unsupported file type'}
+    
+    # Extract column information
+    columns = []
+    for i, column_name in enumerate(df.columns):
+        # Get first non-null value as sample data
+        sample_data = ""
+        for value in df[column_name].dropna():
+            if pd.notna(value):
+                sample_data = str(value)
+                break
+    
+        columns.append({
+            'name': str(column_name),
+            'index': i,
+            'sampleData': sample_data
+        })
+    
+    return {'columns': columns}
+
+
 @router.delete("")
 async def delete_template(templateId: str, projectId: str):
     """Delete template"""
-    db = get_db()
-    
     # Delete template document
-    db['templates'].delete_one({'_id': ObjectId(templateId)})
+    await templates_repo.delete(templateId)
     
     # Remove template from project
-    db['projects'].update_one(
-        {'_id': ObjectId(projectId)},
-        {'$pull': {'templates': {'id': templateId}}}
-    )
+    await projects_repo.remove_template(projectId, templateId)
     
     return 'done'
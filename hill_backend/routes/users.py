@@ -1,10 +1,9 @@
 """User Routes"""
 from fastapi import APIRouter
-from bson.objectid import ObjectId
 from bson.json_util import dumps
 from datetime import datetime, timezone
 
-from database import get_db
+from repositories import users_repo
 from models import (
     UpdateUserSharedFolderRequest,
     UpdateUserShareProjectRequest,
@@ -17,8 +16,7 @@ router = APIRouter(prefix="/users", tags=["users"])
 @router.get("/info")
 async def get_user_info():
     """Get or create default user"""
-    db = get_db()
-    userInfo = db['users'].find_one({'mail': 'default@default.com'})
+    userInfo = await users_repo.find_by_mail('default@default.com')
     
     if userInfo is None:
         userInfo = {
@@ -34,8 +32,7 @@ async def get_user_info():
             'badge': 'Iron',
             'rank': 100
         }
-        result = db['users'].insert_one(userInfo)
-        userInfo['_id'] = result.inserted_id
+        userInfo['_id'] = await users_repo.insert(userInfo)
     
     return dumps(userInfo)
 
@@ -43,15 +40,13 @@ async def get_user_info():
 @router.get("")
 async def get_users():
     """Get all users"""
-    db = get_db()
-    usersList = dumps(list(db['users'].find({})))
+    usersList = dumps(await users_repo.list_all())
     return usersList
 
 
 @router.put("/shared-folders")
 async def share_folder_with_user(request: UpdateUserSharedFolderRequest):
     """Share folder with user"""
-    db = get_db()
     folder = request.folder
     user = request.user
     userName = request.userName
@@ -59,23 +54,14 @@ async def share_folder_with_user(request: UpdateUserSharedFolderRequest):
     
     user_folder = user['folderList']
     if folder['_id']['$oid'] not in user_folder:
-        db['users'].update_one(
-            {'_id': ObjectId(user['_id']['$oid'])}, 
-            {'$push': {
-                'folderList': folder['_id']['$oid'], 
-                'message': {
-                    'folder': folder['_id']['$oid'],
-                    'displayText': f'From {userName}: Folder {folder["name"]} is shared to you. {message}'
-                }
-            }}
-        )
+        await users_repo.add_folder(user['_id']['$oid'], folder['_id']['$oid'], {
+            'folder': folder['_id']['$oid'],
+            'displayText': f'From {userName}: Folder {folder["name"]} is shared to you. {message}'
+        })
     
     project_id = folder['project']['id']
     if project_id not in user['projectList']:
-        db['users'].update_one(
-            {'_id': ObjectId(user['_id']['$oid'])}, 
-            {'$push': {'projectList': project_id}}
-        )
+        await users_repo.add_project(user['_id']['$oid'], project_id)
     
     return 'done'
 
@@ -83,7 +69,6 @@ async def share_folder_with_user(request: UpdateUserSharedFolderRequest):
 @router.put("/shared-files")
 async def share_files_with_user(request: UpdateUserSharedFolderRequest):
     """Share files with user (same as folder sharing)"""
-    db = get_db()
     folder = request.folder
     user = request.user
     userName = request.userName
@@ -91,23 +76,14 @@ async def share_files_with_user(request: UpdateUserSharedFolderRequest):
     
     user_folder = user['folderList']
     if folder['_id']['$oid'] not in user_folder:
-        db['users'].update_one(
-            {'_id': ObjectId(user['_id']['$oid'])}, 
-            {'$push': {
-                'folderList': folder['_id']['$oid'], 
-                'message': {
-                    'folder': folder['_id']['$oid'],
-                    'displayText': f'From {userName}: Folder {folder["name"]} is shared to you. {message}'
-                }
-            }}
-        )
+        await users_repo.add_folder(user['_id']['$oid'], folder['_id']['$oid'], {
+            'folder': folder['_id']['$oid'],
+            'displayText': f'From {userName}: Folder {folder["name"]} is shared to you. {message}'
+        })
     
     project_id = folder['project']['id']
     if project_id not in user['projectList']:
-        db['users'].update_one(
-            {'_id': ObjectId(user['_id']['$oid'])}, 
-            {'$push': {'projectList': project_id}}
-        )
+        await users_repo.add_project(user['_id']['$oid'], project_id)
     
     return 'done'
 
@@ -115,7 +91,6 @@ async def share_files_with_user(request: UpdateUserSharedFolderRequest):
 @router.put("/shared-projects")
 async def share_project_with_user(request: UpdateUserShareProjectRequest):
     """Share project with user"""
-    db = get_db()
     project = request.project
     user = request.user
     userName = request.userName
@@ -123,16 +98,10 @@ async def share_project_with_user(request: UpdateUserShareProjectRequest):
     
     user_project = user['projectList']
     if project['_id']['$oid'] not in user_project:
-        db['users'].update_one(
-            {'_id': ObjectId(user['_id']['$oid'])}, 
-            {'$push': {
-                'projectList': project['_id']['$oid'], 
-                'message': {
-                    'project': project['_id']['$oid'],
-                    'displayText': f'From {userName}: Project {project["projectName"]} is shared to you. {message}'
-                }
-            }}
-        )
+        await users_repo.add_project(user['_id']['$oid'], project['_id']['$oid'], {
+            'project': project['_id']['$oid'],
+            'displayText': f'From {userName}: Project {project["projectName"]} is shared to you. {message}'
+        })
     
     return 'done'
 
@@ -140,8 +109,7 @@ async def share_project_with_user(request: UpdateUserShareProjectRequest):
 @router.put("/recent-files")
 async def update_recent_files(request: UpdateUserRecentFilesRequest):
     """Update user's recent files"""
-    db = get_db()
-    result = db['users'].find_one({'_id': ObjectId(request.userInfo['_id']['$oid'])})
+    result = await users_repo.get(request.userInfo['_id']['$oid'])
     recent_files = result['recent']
     
     # Check if already exists
@@ -156,10 +124,7 @@ async def update_recent_files(request: UpdateUserRecentFilesRequest):
     })
     recent_files = recent_files[-5:]
     
-    db['users'].update_one(
-        {'_id': ObjectId(request.userInfo['_id']['$oid'])}, 
-        {'$set': {'recent': recent_files}}
-    )
+    await users_repo.set(request.userInfo['_id']['$oid'], {'recent': recent_files})
     
     return 'done'
 
@@ -4,10 +4,65 @@ Contains business logic services for data processing
 """
 
 from .resampler import ResamplerService
-from .data_reader import MemoryMappedDataReader, get_data_reader
+from .data_reader import (
+    MemoryMappedDataReader,
+    get_data_reader,
+    evict_readers,
+    get_reader_cache_stats,
+    load_overview_columns,
+)
+from .json_files import iter_json_file, load_overview_text, load_binary_overview_text
+from .json_export import iter_json_export
+from .tiles import TileGrid, tile_etag, TILE_CACHE_IMMUTABLE, TILE_CACHE_REVALIDATE
+from .viewport_cache import ViewportCache, get_viewport_cache, quantize_range
+from .wire_encoding import encode_columns, frame_initial_load
+from .event_index import EventIndex, event_position, class_counts, get_event_index_cache, get_event_index_cache_stats
+from .uploads import (
+    StoredUpload,
+    iter_upload_chunks,
+    write_upload,
+    create_chunked_upload,
+    write_chunk,
+    store_chunked_upload,
+    get_upload_stats,
+)
+from .executors import run_io, run_cpu, run_process, get_executor_stats, shutdown_executors
 
 __all__ = [
     'ResamplerService',
     'MemoryMappedDataReader',
     'get_data_reader',
+    'evict_readers',
+    'get_reader_cache_stats',
+    'load_overview_columns',
+    'iter_json_file',
+    'load_overview_text',
+    'load_binary_overview_text',
+    'iter_json_export',
+    'TileGrid',
+    'tile_etag',
+    'TILE_CACHE_IMMUTABLE',
+    'TILE_CACHE_REVALIDATE',
+    'ViewportCache',
+    'get_viewport_cache',
+    'quantize_range',
+    'encode_columns',
+    'frame_initial_load',
+    'EventIndex',
+    'event_position',
+    'class_counts',
+    'get_event_index_cache',
+    'get_event_index_cache_stats',
+    'StoredUpload',
+    'iter_upload_chunks',
+    'write_upload',
+    'create_chunked_upload',
+    'write_chunk',
+    'store_chunked_upload',
+    'get_upload_stats',
+    'run_io',
+    'run_cpu',
+    'run_process',
+    'get_executor_stats',
+    'shutdown_executors',
 ]
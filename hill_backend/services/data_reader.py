@@ -4,11 +4,17 @@ Provides memory-mapped file reading for efficient access to large binary time se
 """
 
 import numpy as np
+import hashlib
 import json
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 import logging
 
+from config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,10 +22,12 @@ class MemoryMappedDataReader:
     """
     Efficiently read slices from large binary time series files using memory mapping.
     
-    The binary file format is a flat array of float64 values arranged as:
-    [x_values][ch1_values][ch2_values]...
+    Version 3 files are column-major: a flat array of float64 values arranged as
+    [x_values][ch1_values][ch2_values]..., each contiguous with length = total_points,
+    so reading a subset of channels only touches those channels' bytes.
+    Version 1/2 files are row-major: total_points rows of [x, ch1, ch2, ...].
     
-    Each array is contiguous with length = total_points.
+    Slices are always returned as 2D (rows, columns) arrays with x in column 0.
     """
     
     def __init__(self, binary_path: str, meta_path: str):
@@ -29,9 +37,15 @@ class MemoryMappedDataReader:
         Args:
             binary_path: Path to the .bin file
             meta_path: Path to the _meta.json file
+        
+        Raises:
+            ValueError: If the binary file or LOD pyramid does not match the
+                metadata (the file is being parsed again)
         """
         self.binary_path = Path(binary_path)
         self.meta_path = Path(meta_path)
+        # Taken before reading, so a concurrent rewrite makes it stale rather than too new
+        self.signature = _file_signature(binary_path, meta_path)
         
         # Load metadata
         with open(self.meta_path, 'r') as f:
@@ -42,15 +56,62 @@ class MemoryMappedDataReader:
         self.dtype = np.dtype(self.meta.get('dtype', 'float64'))
         
         # Memory-map the binary file
-        # Shape is (total_points, num_columns) for row-major access
-        self._mmap = np.memmap(
-            self.binary_path,
-            dtype=self.dtype,
-            mode='r',
-            shape=(self.total_points, self.num_columns)
-        )
+        # Shape is (num_columns, total_points) for column-major files (version 3),
+        # (total_points, num_columns) for row-major files
+        self.column_major = self.version >= 3
+        shape = (self.num_columns, self.total_points) if self.column_major else (self.total_points, self.num_columns)
+        with open(self.binary_path, 'rb') as f:
+            # The parser replaces the metadata first, so a size that does not
+            # match means the binary file is the previous one, not yet replaced
+            _check_size(f, self.total_points * self.num_columns * self.dtype.itemsize)
+            if self.total_points == 0:
+                # A file with headers and no rows has an empty .bin, which cannot be mapped
+                self._mmap = np.empty(shape, dtype=self.dtype)
+            else:
+                self._mmap = np.memmap(f, dtype=self.dtype, mode='r', shape=shape)
+        self._x = self._mmap[0] if self.column_major else self._mmap[:, 0]
         
         logger.debug(f"Opened memory-mapped file: {self.binary_path}, shape: {self._mmap.shape}")
+        
+        # LOD pyramid: (bucket_size, rows) per level, finest first
+        self._lod_levels: list[tuple[int, np.ndarray]] = []
+        self.lod_rows_per_bucket = 0
+        lod = self.meta.get('lod')
+        if lod:
+            lod_path = self.binary_path.parent / lod['path']
+            if lod_path.exists():
+                total_rows = sum(level['rows'] for level in lod['levels'])
+                row_bytes = self.num_columns * self.dtype.itemsize
+                with open(lod_path, 'rb') as f:
+                    _check_size(f, total_rows * row_bytes)
+                    self._lod_mmap = np.memmap(
+                        f,
+                        dtype=self.dtype,
+                        mode='r',
+                        shape=(total_rows, self.num_columns)
+                    )
+                for level in lod['levels']:
+                    start = level['offset'] // row_bytes
+                    self._lod_levels.append(
+                        (level['bucketSize'], self._lod_mmap[start:start + level['rows']])
+                    )
+                self.lod_rows_per_bucket = lod['rowsPerBucket']
+                logger.debug(f"Opened LOD pyramid: {lod_path}, {len(self._lod_levels)} levels")
+            else:
+                logger.warning(f"LOD pyramid listed in metadata but missing: {lod_path}")
+    
+    @property
+    def mapped_bytes(self) -> int:
+        """Size of the files mapped by this reader (binary store and LOD pyramid)."""
+        size = self._mmap.nbytes
+        if hasattr(self, '_lod_mmap'):
+            size += self._lod_mmap.nbytes
+        return size
+    
+    @property
+    def artifact_version(self) -> str:
+        """Short hash identifying the version of the store this reader maps."""
+        return hashlib.sha1(repr(self.signature).encode()).hexdigest()[:16]
     
     @property
     def x_min(self) -> float:
@@ -90,7 +151,8 @@ class MemoryMappedDataReader:
     def get_slice(
         self, 
         x_min: float, 
-        x_max: float
+        x_max: float,
+        channel_indices: list[int] | None = None
     ) -> tuple[np.ndarray, int]:
         """
         Get a slice of data for the specified x range.
@@ -98,58 +160,336 @@ class MemoryMappedDataReader:
         Args:
             x_min: Start of range (in x-axis units)
             x_max: End of range (in x-axis units)
+            channel_indices: Channels to read (positions in `channels`), None for all
         
         Returns:
             Tuple of:
-                - data: 2D array of shape (slice_length, num_columns)
+                - data: 2D array of shape (slice_length, 1 + num_selected_channels)
                 - original_count: Number of points in the original range
         """
-        # Get x column (column 0)
-        x_col = self._mmap[:, 0]
-        
-        # Binary search for range indices
-        start_idx = int(np.searchsorted(x_col, x_min, side='left'))
-        end_idx = int(np.searchsorted(x_col, x_max, side='right'))
-        
-        # Clamp to valid range
-        start_idx = max(0, start_idx)
-        end_idx = min(self.total_points, end_idx)
-        
+        start_idx, end_idx = self._find_range(x_min, x_max)
         original_count = end_idx - start_idx
         
         # Read the slice (this actually loads data from disk)
-        data = np.array(self._mmap[start_idx:end_idx, :])
+        data = self._read_rows(start_idx, end_idx, self._columns(channel_indices))
         
         logger.debug(f"Read slice [{start_idx}:{end_idx}] = {original_count} points")
         
         return data, original_count
     
-    def get_full_data(self) -> tuple[np.ndarray, int]:
+    def get_lod_slice(
+        self,
+        x_min: float,
+        x_max: float,
+        max_points: int,
+        channel_indices: list[int] | None = None
+    ) -> tuple[np.ndarray, int, int]:
+        """
+        Get data for the specified x range from the coarsest LOD level that still
+        has at least `max_points` rows in the range, or raw rows if none does.
+        
+        Args:
+            x_min: Start of range (in x-axis units)
+            x_max: End of range (in x-axis units)
+            max_points: Target points per channel
+            channel_indices: Channels to read (positions in `channels`), None for all
+        
+        Returns:
+            Tuple of:
+                - data: 2D array of shape (rows, 1 + num_selected_channels)
+                - original_count: Number of raw points in the range
+                - bucket_size: Raw rows per bucket of the level used (1 for raw data)
+        """
+        columns, original_count, bucket_size = self.get_lod_columns(x_min, x_max, max_points, channel_indices)
+        data = np.empty((len(columns[0]), len(columns)), dtype=self.dtype)
+        for j, column in enumerate(columns):
+            data[:, j] = column
+        return data, original_count, bucket_size
+    
+    def get_lod_columns(
+        self,
+        x_min: float,
+        x_max: float,
+        max_points: int,
+        channel_indices: list[int] | None = None,
+        include_end: bool = True
+    ) -> tuple[list[np.ndarray], int, int]:
+        """
+        Like `get_lod_slice`, but return memory-mapped column views instead of a copy.
+        
+        Nothing is read from disk until the views are accessed, so callers can
+        process wide ranges block by block with bounded memory.
+        
+        Args:
+            x_min: Start of range (in x-axis units)
+            x_max: End of range (in x-axis units)
+            max_points: Target points per channel
+            channel_indices: Channels to read (positions in `channels`), None for all
+            include_end: Whether rows at x_max are included ([x_min, x_max] or [x_min, x_max))
+        
+        Returns:
+            Tuple of:
+                - columns: 1D views, x first, then the selected channels
+                - original_count: Number of raw points in the range
+                - bucket_size: Raw rows per bucket of the level used (1 for raw data)
+        """
+        start_idx, end_idx = self._find_range(x_min, x_max, include_end)
+        original_count = end_idx - start_idx
+        columns = self._columns(channel_indices)
+        
+        for bucket_size, rows in reversed(self._lod_levels):
+            n_buckets = -(-original_count // bucket_size)
+            if n_buckets * self.lod_rows_per_bucket < max_points:
+                continue
+            
+            # Buckets overlapping the range, then trim edge rows outside it
+            rpb = self.lod_rows_per_bucket
+            level_slice = rows[(start_idx // bucket_size) * rpb:-(-end_idx // bucket_size) * rpb]
+            lo = int(np.searchsorted(level_slice[:, 0], x_min, side='left'))
+            hi = int(np.searchsorted(level_slice[:, 0], x_max, side='right' if include_end else 'left'))
+            
+            logger.debug(f"LOD slice ({bucket_size} rows/bucket): {hi - lo} rows for {original_count} points")
+            return [level_slice[lo:hi, col] for col in columns], original_count, bucket_size
+        
+        logger.debug(f"Raw slice [{start_idx}:{end_idx}] = {original_count} points")
+        if self.column_major:
+            return [self._mmap[col, start_idx:end_idx] for col in columns], original_count, 1
+        return [self._mmap[start_idx:end_idx, col] for col in columns], original_count, 1
+    
+    def _columns(self, channel_indices: list[int] | None) -> list[int]:
+        """File columns to read: x (0) followed by the selected channels."""
+        if channel_indices is None:
+            return list(range(self.num_columns))
+        return [0] + [i + 1 for i in channel_indices]
+    
+    def _read_rows(self, start_idx: int, end_idx: int, columns: list[int]) -> np.ndarray:
+        """Copy rows [start_idx, end_idx) of the given columns into a (rows, columns) array."""
+        if not self.column_major:
+            if len(columns) == self.num_columns:
+                return np.array(self._mmap[start_idx:end_idx, :])
+            return self._mmap[start_idx:end_idx, columns]
+        
+        # Column-major: each column is one contiguous read
+        data = np.empty((end_idx - start_idx, len(columns)), dtype=self.dtype)
+        for j, col in enumerate(columns):
+            data[:, j] = self._mmap[col, start_idx:end_idx]
+        return data
+    
+    def _find_range(self, x_min: float, x_max: float, include_end: bool = True) -> tuple[int, int]:
+        """Binary search the x column (column 0) for the row range [start, end) of [x_min, x_max] (or [x_min, x_max))."""
+        start_idx = int(np.searchsorted(self._x, x_min, side='left'))
+        end_idx = int(np.searchsorted(self._x, x_max, side='right' if include_end else 'left'))
+        
+        # Clamp to valid range
+        return max(0, start_idx), min(self.total_points, end_idx)
+    
+    def get_full_data(self, channel_indices: list[int] | None = None) -> tuple[np.ndarray, int]:
         """
         Get all data from the file.
         
+        Args:
+            channel_indices: Channels to read (positions in `channels`), None for all
+        
         Returns:
             Tuple of:
-                - data: 2D array of shape (total_points, num_columns)
+                - data: 2D array of shape (total_points, 1 + num_selected_channels)
                 - original_count: Total number of points
         """
-        return np.array(self._mmap[:, :]), self.total_points
+        return self._read_rows(0, self.total_points, self._columns(channel_indices)), self.total_points
+    
+    def read_column(self, column: int, start_idx: int, end_idx: int) -> np.ndarray:
+        """
+        Copy rows [start_idx, end_idx) of one file column.
+        
+        Args:
+            column: File column (0 for x, i + 1 for channel i)
+            start_idx: First row
+            end_idx: Row after the last one (clamped to the number of rows)
+        
+        Returns:
+            1D array of the column's values
+        """
+        if self.column_major:
+            return np.array(self._mmap[column, start_idx:end_idx])
+        return np.array(self._mmap[start_idx:end_idx, column])
     
     def close(self):
         """Close the memory-mapped file."""
         if hasattr(self, '_mmap'):
+            del self._x
             del self._mmap
+        if hasattr(self, '_lod_mmap'):
+            self._lod_levels = []
+            del self._lod_mmap
+
+
+class ReaderCache:
+    """
+    Bounded LRU cache of open readers.
+    
+    Each reader holds memory mappings (and their file descriptors) of the
+    binary store and its LOD pyramid. The cache keeps at most `max_readers`
+    readers and `max_mapped_bytes` mapped bytes, evicting the least recently
+    used first. Entries are validated on every lookup against the inode, size
+    and mtime of the `.bin` and `_meta.json` files, so a reparse that rewrites
+    the store is picked up on the next request.
+    
+    Evicted readers are only dropped from the cache, not closed: their
+    mappings are released once no request is using them any more.
+    """
+    
+    def __init__(self, max_readers: int, max_mapped_bytes: int):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_readers: Maximum number of cached readers
+            max_mapped_bytes: Maximum total size of the files mapped by cached readers
+        """
+        self.max_readers = max_readers
+        self.max_mapped_bytes = max_mapped_bytes
+        self._entries: OrderedDict[str, MemoryMappedDataReader] = OrderedDict()
+        self._mapped_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, binary_path: str, meta_path: str) -> MemoryMappedDataReader:
+        """
+        Get a valid reader for the file, opening it on a miss.
+        
+        Args:
+            binary_path: Path to the .bin file
+            meta_path: Path to the _meta.json file
+        
+        Returns:
+            MemoryMappedDataReader instance
+        
+        Raises:
+            FileNotFoundError: If the file is gone (its cached reader is dropped)
+        """
+        try:
+            signature = _file_signature(binary_path, meta_path)
+        except FileNotFoundError:
+            with self._lock:
+                if binary_path in self._entries:
+                    self._remove(binary_path)
+                    self.invalidations += 1
+            raise
+        with self._lock:
+            cached = self._entries.get(binary_path)
+            if cached is not None:
+                if cached.signature == signature:
+                    self._entries.move_to_end(binary_path)
+                    self.hits += 1
+                    return cached
+                self._remove(binary_path)
+                self.invalidations += 1
+                logger.debug(f"Reader cache entry is stale, reopening: {binary_path}")
+            self.misses += 1
+        
+        # Open outside the lock; a concurrent miss on the same file just opens it twice
+        reader = MemoryMappedDataReader(binary_path, meta_path)
+        logger.debug(f"Created new data reader for: {binary_path}")
+        
+        with self._lock:
+            if binary_path in self._entries:
+                self._remove(binary_path)
+            self._entries[binary_path] = reader
+            self._mapped_bytes += reader.mapped_bytes
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_readers or self._mapped_bytes > self.max_mapped_bytes
+            ):
+                evicted = next(iter(self._entries))
+                self._remove(evicted)
+                self.evictions += 1
+                logger.debug(f"Evicted data reader: {evicted}")
+        return reader
+    
+    def evict(self, path_prefix: str) -> int:
+        """
+        Drop readers of files under a path (a `.bin` path or a file's directory).
+        
+        Args:
+            path_prefix: Binary path or directory to evict
+        
+        Returns:
+            Number of readers evicted
+        """
+        with self._lock:
+            matches = [path for path in self._entries if _is_under(path, path_prefix)]
+            for path in matches:
+                self._remove(path)
+            self.evictions += len(matches)
+        if matches:
+            logger.debug(f"Evicted {len(matches)} data reader(s) under: {path_prefix}")
+        return len(matches)
+    
+    def clear(self):
+        """Close and drop all cached readers."""
+        with self._lock:
+            for reader in self._entries.values():
+                reader.close()
+            self._entries.clear()
+            self._mapped_bytes = 0
+    
+    def stats(self) -> dict[str, Any]:
+        """Cache counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'readers': len(self._entries),
+                'maxReaders': self.max_readers,
+                'mappedBytes': self._mapped_bytes,
+                'maxMappedBytes': self.max_mapped_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRatio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+    
+    def _remove(self, binary_path: str):
+        reader = self._entries.pop(binary_path)
+        self._mapped_bytes -= reader.mapped_bytes
+
+
+def _file_signature(binary_path: str, meta_path: str) -> tuple:
+    """(inode, size, mtime) of the binary and metadata files; changes whenever either is rewritten."""
+    signature = ()
+    for path in (binary_path, meta_path):
+        st = os.stat(path)
+        signature += (st.st_ino, st.st_size, st.st_mtime_ns)
+    return signature
+
+
+def _check_size(f, expected: int):
+    """Raise ValueError if the open file `f` is not `expected` bytes long."""
+    size = os.fstat(f.fileno()).st_size
+    if size != expected:
+        raise ValueError(f"{f.name} is {size} bytes, its metadata describes {expected}")
 
 
-# Cache of open readers to avoid reopening files
-_reader_cache: dict[str, MemoryMappedDataReader] = {}
+def _is_under(path: str, prefix: str) -> bool:
+    """Whether `path` is `prefix` itself or inside directory `prefix`."""
+    path = os.path.normpath(path)
+    prefix = os.path.normpath(prefix)
+    return path == prefix or path.startswith(prefix + os.sep)
+
+
+_reader_cache = ReaderCache(
+    max_readers=settings.READER_CACHE_MAX_FILES,
+    max_mapped_bytes=settings.READER_CACHE_MAX_MAPPED_MB * 1024 * 1024,
+)
 
 
 def get_data_reader(binary_path: str, meta_path: str) -> MemoryMappedDataReader:
     """
     Get or create a data reader for the specified file.
     
-    Readers are cached to avoid reopening files on every request.
+    Readers are cached (see `ReaderCache`) to avoid reopening files on every request.
     
     Args:
         binary_path: Path to the .bin file
@@ -158,19 +498,49 @@ def get_data_reader(binary_path: str, meta_path: str) -> MemoryMappedDataReader:
     Returns:
         MemoryMappedDataReader instance
     """
-    cache_key = binary_path
+    return _reader_cache.get(binary_path, meta_path)
+
+
+def evict_readers(path_prefix: str) -> int:
+    """
+    Drop cached readers of files that were deleted or are about to be rewritten.
     
-    if cache_key not in _reader_cache:
-        _reader_cache[cache_key] = MemoryMappedDataReader(binary_path, meta_path)
-        logger.debug(f"Created new data reader for: {binary_path}")
+    Args:
+        path_prefix: Binary path or directory to evict
     
-    return _reader_cache[cache_key]
+    Returns:
+        Number of readers evicted
+    """
+    return _reader_cache.evict(path_prefix)
+
+
+def get_reader_cache_stats() -> dict[str, Any]:
+    """Get reader cache counters (hits, misses, evictions, size)."""
+    return _reader_cache.stats()
 
 
 def clear_reader_cache():
     """Clear the reader cache, closing all open files."""
-    global _reader_cache
-    for reader in _reader_cache.values():
-        reader.close()
-    _reader_cache = {}
+    _reader_cache.clear()
     logger.debug("Cleared data reader cache")
+
+
+def load_overview_columns(file_path: str, num_columns: int) -> tuple[np.ndarray, list[np.ndarray]]:
+    """
+    Read a binary overview written by the parser ([x][ch1][ch2]... as float64).
+
+    Args:
+        file_path: Path to the overview file
+        num_columns: Number of columns (1 + number of channels)
+
+    Returns:
+        Tuple of (x, channel arrays)
+
+    Raises:
+        ValueError: If the file size does not match the number of columns
+    """
+    values = np.fromfile(file_path, dtype=np.float64)
+    if num_columns < 1 or len(values) % num_columns:
+        raise ValueError(f"Overview {file_path} does not hold {num_columns} columns")
+    columns = values.reshape(num_columns, -1)
+    return columns[0], list(columns[1:])
@@ -0,0 +1,246 @@
+"""
+Event Interval Index
+In-memory interval index of label events for viewport-scoped event queries
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Events longer than this quantile of durations are kept aside and always checked
+_LONG_EVENT_QUANTILE = 0.99
+
+
+def event_position(value: Any) -> Optional[float]:
+    """
+    Position of an event bound or query bound on the x axis.
+
+    Numbers (or numeric strings) are used as they are; date strings, as
+    Plotly sends them for time axes, become POSIX seconds (naive times are
+    read as UTC). Event bounds and query bounds go through the same
+    conversion, so they compare consistently.
+
+    Args:
+        value: Number or string
+
+    Returns:
+        Position, or None if the value is neither
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            parsed = datetime.fromisoformat(value.strip().replace(' ', 'T', 1))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return None
+
+
+@dataclass
+class EventIndex:
+    """
+    Events of one label, sorted by start for overlap queries.
+
+    Overlapping events have `start <= end_q` and `end >= start_q`. Sorting by
+    start bounds the first condition with a binary search; events no longer
+    than `window` can only overlap if they start after `start_q - window`, so
+    the second condition is checked on that slice only. The few events longer
+    than `window` are checked separately, as are events whose bounds could
+    not be read (those are always returned).
+    """
+    version: int
+    events: list[dict[str, Any]]
+    starts: np.ndarray      # Sorted starts of regular events
+    ends: np.ndarray        # Ends, in the same order
+    order: np.ndarray       # Positions in `events`, in the same order
+    window: float           # Longest duration of a regular event
+    long_starts: np.ndarray
+    long_ends: np.ndarray
+    long_order: np.ndarray
+    unindexed: np.ndarray   # Positions of events without readable bounds
+
+    @classmethod
+    def build(cls, version: int, events: list[dict[str, Any]]) -> 'EventIndex':
+        """
+        Index the events of a label.
+
+        Args:
+            version: `eventsVersion` of the label the events were read from
+            events: Events of the label
+
+        Returns:
+            EventIndex
+        """
+        starts, ends, positions, unindexed = [], [], [], []
+        for i, event in enumerate(events):
+            start = event_position(event.get('start'))
+            end = event_position(event.get('end'))
+            if start is None or end is None:
+                unindexed.append(i)
+                continue
+            starts.append(min(start, end))
+            ends.append(max(start, end))
+            positions.append(i)
+
+        starts = np.array(starts, dtype=np.float64)
+        ends = np.array(ends, dtype=np.float64)
+        positions = np.array(positions, dtype=np.int64)
+        durations = ends - starts
+        window = float(np.quantile(durations, _LONG_EVENT_QUANTILE)) if len(durations) else 0.0
+        long = durations > window
+
+        regular_order = np.argsort(starts[~long], kind='stable')
+        return cls(
+            version=version,
+            events=events,
+            starts=starts[~long][regular_order],
+            ends=ends[~long][regular_order],
+            order=positions[~long][regular_order],
+            window=window,
+            long_starts=starts[long],
+            long_ends=ends[long],
+            long_order=positions[long],
+            unindexed=np.array(unindexed, dtype=np.int64),
+        )
+
+    def overlapping(self, start: float, end: float) -> list[dict[str, Any]]:
+        """
+        Events overlapping [start, end], in label order.
+
+        Args:
+            start: Start of the range
+            end: End of the range
+
+        Returns:
+            The overlapping events (shared; do not modify)
+        """
+        lo = int(np.searchsorted(self.starts, start - self.window, side='left'))
+        hi = int(np.searchsorted(self.starts, end, side='right'))
+        regular = self.order[lo:hi][self.ends[lo:hi] >= start]
+        long = self.long_order[(self.long_starts <= end) & (self.long_ends >= start)]
+        positions = np.sort(np.concatenate([regular, long, self.unindexed]))
+        return [self.events[i] for i in positions]
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+
+def class_counts(events: list[dict[str, Any]]) -> dict[str, int]:
+    """Number of events per class name."""
+    counts: dict[str, int] = {}
+    for event in events:
+        name = event.get('className', '')
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+class EventIndexCache:
+    """
+    LRU cache of event indexes, bounded by the total number of events.
+
+    Entries are keyed by label ID and validated against the label's
+    `eventsVersion`, which every events write increments, so a lookup costs
+    one small projection query and a rebuild only follows a change.
+    """
+
+    def __init__(self, max_events: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_events: Maximum total number of cached events
+        """
+        self.max_events = max_events
+        self._entries: OrderedDict[str, EventIndex] = OrderedDict()
+        self._events = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, label_id: str, version: int) -> Optional[EventIndex]:
+        """
+        Get the index of a label if it is cached at this version.
+
+        Args:
+            label_id: Label ID
+            version: Current `eventsVersion` of the label
+
+        Returns:
+            EventIndex, or None on a miss
+        """
+        with self._lock:
+            index = self._entries.get(label_id)
+            if index is not None and index.version == version:
+                self._entries.move_to_end(label_id)
+                self.hits += 1
+                return index
+            self.misses += 1
+            return None
+
+    def put(self, label_id: str, index: EventIndex):
+        """
+        Cache the index of a label (indexes larger than the budget are not kept).
+
+        Args:
+            label_id: Label ID
+            index: Index to cache
+        """
+        with self._lock:
+            if label_id in self._entries:
+                self._remove(label_id)
+            if len(index) <= self.max_events:
+                self._entries[label_id] = index
+                self._events += len(index)
+                while self._events > self.max_events:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Cache counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'labels': len(self._entries),
+                'events': self._events,
+                'maxEvents': self.max_events,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRatio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+    def _remove(self, label_id: str):
+        index = self._entries.pop(label_id)
+        self._events -= len(index)
+
+
+_event_index_cache = EventIndexCache(settings.EVENT_INDEX_CACHE_MAX_EVENTS)
+
+
+def get_event_index_cache() -> EventIndexCache:
+    """Get the process-wide event index cache."""
+    return _event_index_cache
+
+
+def get_event_index_cache_stats() -> dict[str, Any]:
+    """Get event index cache counters."""
+    return _event_index_cache.stats()
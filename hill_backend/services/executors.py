@@ -0,0 +1,131 @@
+"""
+Executors
+Sized pools for the blocking and CPU-bound work of async routes
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class BoundedExecutor:
+    """
+    An executor plus a limit on the calls admitted to it.
+
+    Calls beyond `max_concurrency` wait on the event loop rather than in the
+    executor's queue, so a request whose client disconnects while waiting is
+    cancelled before its work starts, and one kind of work (e.g. wide
+    viewports) cannot occupy the threads every other request needs.
+    """
+
+    def __init__(self, name: str, executor: Executor, max_concurrency: int):
+        """
+        Initialize the executor.
+
+        Args:
+            name: Name used in stats and logs
+            executor: Thread or process pool running the calls
+            max_concurrency: Maximum calls submitted to the pool at once
+        """
+        self.name = name
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking function in the pool.
+
+        Args:
+            func: Function to call (must be picklable for process pools)
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The function's return value
+        """
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Current load of the pool."""
+        return {
+            'maxConcurrency': self.max_concurrency,
+            'running': self.running,
+            'waiting': self.waiting,
+            'completed': self.completed,
+        }
+
+
+# Blocking I/O: database driver calls, file reads/writes, directory removal
+_io_executor = BoundedExecutor(
+    'io',
+    ThreadPoolExecutor(settings.IO_THREADS, thread_name_prefix='hill-io'),
+    settings.IO_THREADS
+)
+
+# CPU-bound work that releases the GIL: memmap slicing, NumPy, tsdownsample, zlib
+_cpu_executor = BoundedExecutor(
+    'cpu',
+    ThreadPoolExecutor(settings.CPU_THREADS, thread_name_prefix='hill-cpu'),
+    settings.CPU_THREADS
+)
+
+# CPU-bound pure-Python work that holds the GIL (JSON decoding of large files).
+# Workers are spawned rather than forked, so they don't inherit the event
+# loop, the database client or the locks of the server's threads
+_process_executor = BoundedExecutor(
+    'process',
+    ProcessPoolExecutor(settings.JSON_PROCESSES, mp_context=multiprocessing.get_context('spawn')),
+    settings.JSON_PROCESSES
+)
+
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking I/O (database, files) in the I/O thread pool."""
+    return await _io_executor.run(func, *args, **kwargs)
+
+
+async def run_cpu(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run GIL-releasing CPU work (NumPy, resampling, compression) in the CPU thread pool."""
+    return await _cpu_executor.run(func, *args, **kwargs)
+
+
+async def run_process(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run GIL-holding CPU work in the process pool; `func` and its arguments must be picklable."""
+    return await _process_executor.run(func, *args, **kwargs)
+
+
+def get_executor_stats() -> dict[str, Any]:
+    """Get running/waiting/completed counts of the pools."""
+    return {executor.name: executor.stats() for executor in (_io_executor, _cpu_executor, _process_executor)}
+
+
+def shutdown_executors():
+    """Stop the pools (on application shutdown)."""
+    for executor in (_io_executor, _cpu_executor, _process_executor):
+        executor.executor.shutdown(wait=False, cancel_futures=True)
+    logger.info("Executors shut down")
@@ -0,0 +1,79 @@
+"""
+JSON Export
+Streams binary stores as JSON in the list-of-channels format of the parser's JSON export
+"""
+
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import simplejson as json
+from dateutil.tz import tzlocal
+
+from .data_reader import MemoryMappedDataReader
+
+# Rows converted per block when exporting a column
+JSON_EXPORT_BLOCK_ROWS = 100_000
+
+
+def _format_timestamps(timestamps: np.ndarray, fmt: str) -> list:
+    """
+    Format Unix timestamps as local time strings, as the parser does.
+
+    Args:
+        timestamps: float64 array of seconds since epoch
+        fmt: strftime format string
+
+    Returns:
+        List of formatted strings (None for NaN)
+    """
+    micros = np.round(np.asarray(timestamps, dtype=np.float64) * 1e6)
+    dt = pd.Series(pd.to_datetime(micros, unit='us', utc=True))
+    strings = dt.dt.tz_convert(tzlocal()).dt.strftime(fmt)
+    return strings.where(dt.notna(), None).tolist()
+
+
+def iter_json_export(reader: MemoryMappedDataReader, block_rows: int = JSON_EXPORT_BLOCK_ROWS) -> Iterator[str]:
+    """
+    Export a binary store as JSON text, piece by piece.
+
+    The text is the document the parser used to write next to every file:
+    [{"x": true, "name", "unit", "data"}, {"x": false, "name", "unit", "color", "data"}, ...],
+    with timestamp x values formatted with the file's x format and NaN
+    values as null. Columns are read from the memory map `block_rows` rows
+    at a time and each block is serialized as it is yielded, so memory stays
+    bounded whatever the size of the file. Iterating reads from disk, so it
+    belongs in a thread (StreamingResponse iterates plain generators in one).
+
+    Args:
+        reader: Reader of the binary store
+        block_rows: Rows read and serialized at a time
+
+    Yields:
+        Pieces of JSON text
+    """
+    x_info = reader.x_column_info
+    x_format = reader.x_format if reader.x_type == 'timestamp' else None
+
+    headers = [{'x': True, 'name': x_info['name'], 'unit': x_info.get('unit', '')}]
+    for ch in reader.channels:
+        headers.append({
+            'x': False,
+            'name': ch['name'],
+            'unit': ch.get('unit', ''),
+            'color': ch.get('color', '#000000'),
+        })
+
+    yield '['
+    for column, header in enumerate(headers):
+        # Open the trace object and leave its data list open for the blocks
+        yield (', ' if column else '') + json.dumps(header)[:-1] + ', "data": ['
+        for start in range(0, reader.total_points, block_rows):
+            block = reader.read_column(column, start, start + block_rows)
+            if column == 0 and x_format:
+                values = _format_timestamps(block, x_format)
+            else:
+                values = block.tolist()
+            yield (', ' if start else '') + json.dumps(values, ignore_nan=True)[1:-1]
+        yield ']}'
+    yield ']'
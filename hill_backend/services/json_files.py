@@ -0,0 +1,71 @@
+"""
+JSON Files
+Reads JSON data files and serializes overviews for the JSON endpoints
+"""
+
+import json
+from typing import Any, Iterator
+
+import numpy as np
+
+from .data_reader import load_overview_columns
+
+
+def iter_json_file(file_path: str, chunk_chars: int = 1 << 20) -> Iterator[str]:
+    """
+    Read a JSON file as text, chunk by chunk, without decoding it.
+
+    Args:
+        file_path: Path to the JSON file
+        chunk_chars: Characters read at a time
+
+    Yields:
+        Pieces of the file's text
+    """
+    with open(file_path, 'r') as f:
+        while chunk := f.read(chunk_chars):
+            yield chunk
+
+
+def load_overview_text(file_path: str) -> str:
+    """
+    Read an overview file and serialize its data array.
+
+    Overviews written as { meta: {...}, data: [...] } return just the data
+    array, for backward compatibility with the old direct-array format.
+    Module-level so it can run in the process pool.
+
+    Args:
+        file_path: Path to the overview JSON file
+
+    Returns:
+        JSON text of the data array
+    """
+    with open(file_path, 'r') as f:
+        overview_content = json.load(f)
+    
+    if isinstance(overview_content, dict) and 'data' in overview_content:
+        return json.dumps(overview_content['data'])
+    return json.dumps(overview_content)
+
+
+def load_binary_overview_text(file_path: str, columns: list[dict[str, Any]]) -> str:
+    """
+    Read a binary overview and serialize it in the list-of-channels format.
+
+    Module-level so it can run in the process pool.
+
+    Args:
+        file_path: Path to the binary overview file
+        columns: Column headers of the file document, x first
+
+    Returns:
+        JSON text of the data array (NaN values as null)
+    """
+    x, channels = load_overview_columns(file_path, len(columns))
+    traces = []
+    for header, values in zip(columns, [x] + channels):
+        data = values.astype(object)
+        data[np.isnan(values)] = None
+        traces.append({**header, 'data': data.tolist()})
+    return json.dumps(traces)
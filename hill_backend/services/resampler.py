@@ -4,11 +4,18 @@ Downsamples multi-channel time series data using MinMaxLTTB with union of indice
 """
 
 import numpy as np
-from tsdownsample import MinMaxLTTBDownsampler, NaNMinMaxLTTBDownsampler
+from tsdownsample import MinMaxLTTBDownsampler, NaNMinMaxLTTBDownsampler, LTTBDownsampler
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Min/max preselection buckets per target point in the streaming path (as MinMaxLTTB's minmax_ratio=4)
+STREAMING_BUCKETS_PER_POINT = 2
+# Scratch bytes per row of a block: x copy, bucket ids, and one channel with its masked/broadcast copies
+STREAMING_BYTES_PER_ROW = 64
+# Lower bound on block size, so tiny budgets still make progress
+STREAMING_MIN_BLOCK_ROWS = 4096
+
 
 class ResamplerService:
     """
@@ -28,6 +35,7 @@ class ResamplerService:
         """
         self.target_points = target_points_per_channel
         self.downsampler = NaNMinMaxLTTBDownsampler()
+        self.lttb = LTTBDownsampler()
     
     def resample(
         self, 
@@ -93,6 +101,113 @@ class ResamplerService:
         
         return x_out, channels_out, False
     
+    def resample_bounded(
+        self,
+        x: np.ndarray,
+        channels: list[np.ndarray],
+        memory_budget: int
+    ) -> tuple[np.ndarray, list[np.ndarray], bool]:
+        """
+        Resample array views (e.g. memory-mapped columns) within a memory budget.
+        
+        Ranges whose columns fit in `memory_budget` bytes are copied and passed to
+        `resample`. Wider ranges are streamed: the views are read in fixed-size
+        blocks, each block updates per-bucket min/max candidates, and LTTB then
+        runs on the candidates only, so peak memory depends on the budget and
+        the target, not on the range width.
+        
+        Args:
+            x: X-axis values, shape (N,), sorted
+            channels: List of y-value arrays, each shape (N,)
+            memory_budget: Bytes the in-memory path may copy
+        
+        Returns:
+            Same as `resample`
+        """
+        n_points = len(x)
+        if n_points <= self.target_points or n_points * (1 + len(channels)) * 8 <= memory_budget:
+            return self.resample(
+                np.ascontiguousarray(x, dtype=np.float64),
+                [np.ascontiguousarray(ch, dtype=np.float64) for ch in channels]
+            )
+        
+        block_rows = max(STREAMING_MIN_BLOCK_ROWS, memory_budget // STREAMING_BYTES_PER_ROW)
+        return self._resample_streaming(x, channels, block_rows)
+    
+    def _resample_streaming(
+        self,
+        x: np.ndarray,
+        channels: list[np.ndarray],
+        block_rows: int
+    ) -> tuple[np.ndarray, list[np.ndarray], bool]:
+        """
+        MinMaxLTTB over views read in blocks of `block_rows` rows.
+        
+        Equal-width x buckets are shared by all blocks; a bucket cut by a block
+        boundary keeps the better of its partial min/max. Only the selected rows
+        are gathered from the views at the end.
+        """
+        n_points = len(x)
+        n_buckets = self.target_points * STREAMING_BUCKETS_PER_POINT
+        x_first = float(x[0])
+        span = float(x[n_points - 1]) - x_first
+        scale = n_buckets / span if span > 0 else 0.0
+        
+        min_val = np.full((len(channels), n_buckets), np.inf)
+        max_val = np.full((len(channels), n_buckets), -np.inf)
+        min_idx = np.zeros((len(channels), n_buckets), dtype=np.int64)
+        max_idx = np.zeros((len(channels), n_buckets), dtype=np.int64)
+        
+        logger.debug(f"Streaming resample of {n_points} points with {len(channels)} channels in blocks of {block_rows} rows")
+        
+        for block_start in range(0, n_points, block_rows):
+            block_end = min(n_points, block_start + block_rows)
+            xb = np.ascontiguousarray(x[block_start:block_end], dtype=np.float64)
+            buckets = np.clip(((xb - x_first) * scale).astype(np.int64), 0, n_buckets - 1)
+            # x is sorted, so each bucket is one run of rows within the block
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+            lengths = np.diff(np.append(starts, len(xb)))
+            run_buckets = buckets[starts]
+            del xb, buckets
+            
+            for k, ch in enumerate(channels):
+                yb = np.asarray(ch[block_start:block_end], dtype=np.float64)
+                nan = np.isnan(yb)
+                for values, best_val, best_idx, ufunc, better in (
+                    (np.where(nan, np.inf, yb), min_val[k], min_idx[k], np.minimum, np.less),
+                    (np.where(nan, -np.inf, yb), max_val[k], max_idx[k], np.maximum, np.greater),
+                ):
+                    run_best = ufunc.reduceat(values, starts)
+                    # First row of each run holding the run's extreme value
+                    hits = np.flatnonzero(values == np.repeat(run_best, lengths))
+                    run_pos = hits[np.searchsorted(hits, starts)]
+                    improved = better(run_best, best_val[run_buckets])
+                    best_val[run_buckets[improved]] = run_best[improved]
+                    best_idx[run_buckets[improved]] = block_start + run_pos[improved]
+        
+        # LTTB on each channel's min/max candidates, always keeping the end points
+        all_indices = [np.array([0, n_points - 1], dtype=np.int64)]
+        for k, ch in enumerate(channels):
+            candidates = np.unique(np.concatenate((
+                [0, n_points - 1],
+                min_idx[k][np.isfinite(min_val[k])],
+                max_idx[k][np.isfinite(max_val[k])],
+            )))
+            xc = np.ascontiguousarray(x[candidates], dtype=np.float64)
+            yc = np.ascontiguousarray(ch[candidates], dtype=np.float64)
+            valid = ~np.isnan(yc)
+            candidates, xc, yc = candidates[valid], xc[valid], yc[valid]
+            if len(candidates) > self.target_points:
+                candidates = candidates[self.lttb.downsample(xc, yc, n_out=max(3, self.target_points))]
+            all_indices.append(candidates)
+        
+        selected_indices = np.unique(np.concatenate(all_indices))
+        logger.debug(f"Streaming union produced {len(selected_indices)} points from {n_points} original")
+        
+        x_out = np.asarray(x[selected_indices], dtype=np.float64)
+        channels_out = [np.asarray(ch[selected_indices], dtype=np.float64) for ch in channels]
+        return x_out, channels_out, False
+    
     def resample_array(
         self, 
         data: np.ndarray,
@@ -0,0 +1,102 @@
+"""
+Tile Grid
+Fixed, power-of-two aligned x ranges that make viewport data cacheable
+"""
+
+import hashlib
+import math
+from dataclasses import dataclass
+from typing import Any
+
+# Cache-Control for tiles requested with the current artifact version (the URL changes on reparse)
+TILE_CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+# Cache-Control for unversioned tile URLs: caches must revalidate with the ETag
+TILE_CACHE_REVALIDATE = "public, no-cache"
+
+
+@dataclass
+class TileGrid:
+    """
+    Tile layout of one file.
+
+    Level 0 is a single tile covering [x_min, x_max]; level L splits the range
+    into 2**L tiles of equal width. Tiles are half-open, [start, end), except
+    the last one of a level, which includes x_max, so adjacent tiles never
+    share a row. Every tile is resampled to `tile_points` points per channel,
+    so the level a client picks sets the resolution.
+    """
+    x_min: float
+    x_max: float
+    total_points: int
+    tile_points: int
+
+    @property
+    def max_level(self) -> int:
+        """Deepest useful level: tiles there hold about `tile_points` raw rows or fewer."""
+        if self.total_points <= self.tile_points:
+            return 0
+        return math.ceil(math.log2(self.total_points / self.tile_points))
+
+    def tile_count(self, level: int) -> int:
+        """Number of tiles at a level."""
+        return 2 ** level
+
+    def tile_range(self, level: int, index: int) -> tuple[float, float]:
+        """
+        X range of a tile.
+
+        Args:
+            level: Zoom level (0 = whole file)
+            index: Tile position within the level
+
+        Returns:
+            Tuple of (start, end) in x-axis units; `end` belongs to the next
+            tile unless `includes_end` is True
+        """
+        width = (self.x_max - self.x_min) / self.tile_count(level)
+        # Computed like the next tile's start, so that the two bounds are equal
+        start = self.x_min + index * width
+        end = self.x_max if self.includes_end(level, index) else self.x_min + (index + 1) * width
+        return start, end
+
+    def includes_end(self, level: int, index: int) -> bool:
+        """Whether a tile includes its end (only the last tile of a level does)."""
+        return index == self.tile_count(level) - 1
+
+    def to_dict(self, version: str, channel_names: list[str]) -> dict[str, Any]:
+        """Tileset description returned to clients."""
+        return {
+            'version': version,
+            'xMin': self.x_min,
+            'xMax': self.x_max,
+            'totalPoints': self.total_points,
+            'tilePoints': self.tile_points,
+            'maxLevel': self.max_level,
+            'channels': channel_names,
+        }
+
+
+def tile_etag(
+    version: str,
+    level: int,
+    index: int,
+    tile_points: int,
+    channel_names: list[str],
+    body_format: str = ''
+) -> str:
+    """
+    Strong ETag of a tile.
+
+    Args:
+        version: Artifact version of the file
+        level: Zoom level
+        index: Tile position within the level
+        tile_points: Points per channel of the tile
+        channel_names: Channels included in the tile
+        body_format: Encoding/compression of the body
+
+    Returns:
+        Quoted ETag value
+    """
+    key = f"{version}:{level}:{index}:{tile_points}:{','.join(channel_names)}:{body_format}"
+    return '"' + hashlib.sha1(key.encode()).hexdigest()[:24] + '"'
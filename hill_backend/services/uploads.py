@@ -0,0 +1,239 @@
+"""
+Uploads
+Streams uploaded files to disk in fixed-size chunks, hashing them on the way
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from config import settings
+from .executors import run_cpu
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredUpload:
+    """Size, SHA-256 and write time of an upload written to disk."""
+    size: int
+    sha256: str
+    seconds: float
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Throughput of the write (bytes received, hashed and written per second)."""
+        return self.size / self.seconds if self.seconds > 0 else 0.0
+
+
+class UploadStats:
+    """Counters of the upload writes (whole files or chunks) and files stored by this process."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self._lock = threading.Lock()
+        self.active = 0
+        self.writes = 0
+        self.failed = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.files = 0
+
+    def started(self):
+        """Record the start of a write."""
+        with self._lock:
+            self.active += 1
+
+    def finished(self, size: int | None, seconds: float = 0.0):
+        """Record the end of a write (size None if it failed)."""
+        with self._lock:
+            self.active -= 1
+            if size is None:
+                self.failed += 1
+                return
+            self.writes += 1
+            self.bytes += size
+            self.seconds += seconds
+
+    def file_stored(self):
+        """Record a file stored under its final name."""
+        with self._lock:
+            self.files += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Upload counters and average write throughput."""
+        with self._lock:
+            return {
+                'active': self.active,
+                'writes': self.writes,
+                'failed': self.failed,
+                'bytes': self.bytes,
+                'bytesPerSecond': self.bytes / self.seconds if self.seconds > 0 else 0.0,
+                'files': self.files,
+            }
+
+
+_upload_stats = UploadStats()
+
+
+async def iter_upload_chunks(file: UploadFile, chunk_bytes: int = settings.UPLOAD_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """
+    Read an uploaded file in chunks.
+
+    Args:
+        file: Uploaded file
+        chunk_bytes: Maximum size of a chunk
+
+    Yields:
+        Chunks of the file's content
+    """
+    while chunk := await file.read(chunk_bytes):
+        yield chunk
+
+
+async def write_upload(chunks: AsyncIterator[bytes], path: str) -> StoredUpload:
+    """
+    Write an upload to disk chunk by chunk, hashing it as it is written.
+
+    Only one chunk is held at a time, so memory stays flat whatever the
+    size and number of concurrent uploads. Each chunk is hashed in the CPU
+    pool while aiofiles writes it. The content goes to `{path}.part` and
+    replaces `path` once complete, so a failed upload never leaves a
+    truncated file under the final name.
+
+    Args:
+        chunks: Content of the upload
+        path: Destination path (its directory is created)
+
+    Returns:
+        StoredUpload with the size, SHA-256 (hex) and write time
+    """
+    await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.part'
+    digest = hashlib.sha256()
+    size = 0
+    started = time.perf_counter()
+    _upload_stats.started()
+    stored = None
+    try:
+        async with aiofiles.open(temp_path, 'wb') as f:
+            async for chunk in chunks:
+                await asyncio.gather(run_cpu(digest.update, chunk), f.write(chunk))
+                size += len(chunk)
+        await aiofiles.os.replace(temp_path, path)
+        stored = StoredUpload(size=size, sha256=digest.hexdigest(), seconds=time.perf_counter() - started)
+    finally:
+        _upload_stats.finished(stored.size if stored else None, stored.seconds if stored else 0.0)
+        if stored is None and await aiofiles.os.path.exists(temp_path):
+            await aiofiles.os.remove(temp_path)
+    _upload_stats.file_stored()
+
+    logger.info(
+        f"Stored upload {path}: {stored.size} bytes in {stored.seconds:.2f}s "
+        f"({stored.bytes_per_second / 1e6:.1f} MB/s), sha256 {stored.sha256}"
+    )
+    return stored
+
+
+async def create_chunked_upload(path: str, size: int):
+    """
+    Create the file the chunks of a resumable upload are written into.
+
+    The file gets its full size up front, so chunks can be written at their
+    offsets in any order.
+
+    Args:
+        path: Path of the partial file (its directory is created)
+        size: Size of the upload in bytes
+    """
+    await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+    async with aiofiles.open(path, 'wb') as f:
+        await f.truncate(size)
+
+
+async def write_chunk(chunks: AsyncIterator[bytes], path: str, offset: int, length: int) -> int:
+    """
+    Write one chunk of a resumable upload at its offset.
+
+    Args:
+        chunks: Content of the chunk, as received
+        path: Path of the partial file
+        offset: Byte offset of the chunk in the file
+        length: Expected size of the chunk
+
+    Returns:
+        Bytes written
+
+    Raises:
+        ValueError: If the content is not `length` bytes long (the chunk
+            must be sent again; nothing past its range is written)
+        FileNotFoundError: If the partial file is gone (the upload was
+            finalized or aborted)
+    """
+    written = 0
+    started = time.perf_counter()
+    _upload_stats.started()
+    try:
+        async with aiofiles.open(path, 'r+b') as f:
+            await f.seek(offset)
+            async for chunk in chunks:
+                if written + len(chunk) > length:
+                    raise ValueError(f"Chunk is larger than {length} bytes")
+                await f.write(chunk)
+                written += len(chunk)
+        if written != length:
+            raise ValueError(f"Chunk has {written} bytes, expected {length}")
+    except BaseException:
+        _upload_stats.finished(None)
+        raise
+    _upload_stats.finished(written, time.perf_counter() - started)
+    return written
+
+
+async def store_chunked_upload(part_path: str, path: str) -> StoredUpload:
+    """
+    Hash the assembled file of a resumable upload and move it under its final name.
+
+    Reading the next block overlaps with hashing the current one, and the
+    file is renamed, not copied, so the data is read once and never rewritten.
+
+    Args:
+        part_path: Path of the partial file, with every chunk written
+        path: Destination path (its directory is created)
+
+    Returns:
+        StoredUpload with the size, SHA-256 (hex) and time spent hashing
+    """
+    digest = hashlib.sha256()
+    size = 0
+    started = time.perf_counter()
+    async with aiofiles.open(part_path, 'rb') as f:
+        block = await f.read(settings.UPLOAD_CHUNK_BYTES)
+        while block:
+            _, next_block = await asyncio.gather(
+                run_cpu(digest.update, block), f.read(settings.UPLOAD_CHUNK_BYTES)
+            )
+            size += len(block)
+            block = next_block
+
+    await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+    await aiofiles.os.replace(part_path, path)
+    _upload_stats.file_stored()
+
+    stored = StoredUpload(size=size, sha256=digest.hexdigest(), seconds=time.perf_counter() - started)
+    logger.info(f"Stored resumable upload {path}: {stored.size} bytes, sha256 {stored.sha256}")
+    return stored
+
+
+def get_upload_stats() -> dict[str, Any]:
+    """Get upload counters (active, completed and failed writes, bytes, average throughput, stored files)."""
+    return _upload_stats.stats()
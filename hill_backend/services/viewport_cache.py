@@ -0,0 +1,149 @@
+"""
+Viewport Cache
+Caches packed viewport responses and coalesces identical concurrent requests
+"""
+
+import asyncio
+import logging
+import math
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from config import settings
+from .executors import run_cpu
+
+logger = logging.getLogger(__name__)
+
+# Quantization grid: between 1/(2 * VIEWPORT_QUANTUM) and 1/VIEWPORT_QUANTUM of the range width
+VIEWPORT_QUANTUM = 512
+
+
+def quantize_range(x_min: float, x_max: float) -> tuple[float, float]:
+    """
+    Widen a range to a power-of-two grid relative to its width.
+
+    Nearby ranges (small pans, repeated debounced requests) map to the same
+    grid-aligned range and therefore to the same cache entry. The range
+    grows by less than 1/VIEWPORT_QUANTUM of its width on each side.
+
+    Args:
+        x_min: Start of range
+        x_max: End of range
+
+    Returns:
+        Tuple of (quantized start, quantized end)
+    """
+    width = x_max - x_min
+    if not width > 0 or not math.isfinite(width):
+        return x_min, x_max
+    step = 2.0 ** math.floor(math.log2(width / VIEWPORT_QUANTUM))
+    return math.floor(x_min / step) * step, math.ceil(x_max / step) * step
+
+
+class ViewportCache:
+    """
+    Size-bounded LRU cache of packed viewport responses with single-flight.
+
+    Values are (body, headers) tuples. Keys must identify the data version
+    (e.g. the reader's artifact version), so entries never need invalidating
+    and stale ones simply age out. While a value is being computed, identical
+    requests await the same task instead of computing it again. All methods
+    run on the event loop; the computation itself runs in the CPU pool.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of cached response bodies
+        """
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[bytes, dict[str, str]]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], tuple[bytes, dict[str, str]]]
+    ) -> tuple[bytes, dict[str, str]]:
+        """
+        Get a cached response, joining or starting its computation on a miss.
+
+        Args:
+            key: Cache key
+            compute: Blocking function returning (body, headers)
+
+        Returns:
+            Tuple of (body, headers); treat as read-only
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.bytes_saved += len(entry[0])
+            return entry
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # Independent of the requesting coroutine, so a disconnecting client
+            # does not cancel the computation for the requests waiting on it
+            task = asyncio.ensure_future(run_cpu(compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+            return await asyncio.shield(task)
+
+        entry = await asyncio.shield(task)
+        self.bytes_saved += len(entry[0])
+        return entry
+
+    def stats(self) -> dict[str, Any]:
+        """Cache counters and current size."""
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'maxBytes': self.max_bytes,
+            'hits': self.hits,
+            'coalesced': self.coalesced,
+            'misses': self.misses,
+            'hitRatio': (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'bytesSaved': self.bytes_saved,
+            'inflight': len(self._inflight),
+        }
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        """Store a finished computation; failures are not cached."""
+        del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._store(key, task.result())
+
+    def _store(self, key: Hashable, entry: tuple[bytes, dict[str, str]]):
+        size = len(entry[0])
+        if size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (body, _) = self._entries.popitem(last=False)
+            self._bytes -= len(body)
+            self.evictions += 1
+
+
+_viewport_cache = ViewportCache(settings.VIEWPORT_CACHE_MAX_MB * 1024 * 1024)
+
+
+def get_viewport_cache() -> ViewportCache:
+    """Get the viewport response cache."""
+    return _viewport_cache
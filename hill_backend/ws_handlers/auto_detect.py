@@ -4,7 +4,7 @@ Handles WebSocket connections for auto-detection agent
 """
 from fastapi import WebSocket, WebSocketDisconnect
 from datetime import datetime, timezone
-from database import get_db
+from repositories import detection_conversations_repo, files_repo
 import json
 import asyncio
 
@@ -39,16 +39,7 @@ async def handle_websocket(websocket: WebSocket, file_id: str):
                     del auto_detection_tasks[file_id]
                     
                     # Update database status
-                    db = get_db()
-                    db['auto_detection_conversations'].update_one(
-                        {'fileId': file_id},
-                        {
-                            '$set': {
-                                'status': 'cancelled',
-                                'updatedAt': datetime.now(tz=timezone.utc).isoformat()
-                            }
-                        }
-                    )
+                    await detection_conversations_repo.set_status(file_id, 'cancelled')
                 
                 await websocket.send_json({
                     'type': 'detection_cancelled',
@@ -92,36 +83,16 @@ async def start_auto_detection_process(websocket: WebSocket, file_id: str):
             from agents.auto_detect import run_auto_detection
             
             # Initialize conversation
-            db = get_db()
-            result = db['auto_detection_conversations'].update_one(
-                {'fileId': file_id},
-                {
-                    '$set': {
-                        'fileId': file_id,
-                        'messages': [],
-                        'status': 'started',
-                        'createdAt': datetime.now(tz=timezone.utc).isoformat(),
-                        'updatedAt': datetime.now(tz=timezone.utc).isoformat()
-                    }
-                },
-                upsert=True
-            )
+            conversation = await detection_conversations_repo.restart(file_id)
             
             # Get conversation ID and update file
-            conversation = db['auto_detection_conversations'].find_one({'fileId': file_id})
             if conversation and '_id' in conversation:
                 conversation_id = str(conversation['_id'])
-                from bson import ObjectId
-                db['files'].update_one(
-                    {'_id': ObjectId(file_id)},
-                    {'$set': {'autoDetectionConversationId': conversation_id}}
-                )
+                await files_repo.set(file_id, {'autoDetectionConversationId': conversation_id})
             
             # Define callback to save messages and stream to WebSocket
             async def auto_detection_callback(file_id: str, message: dict):
                 """Save message to DB and stream to WebSocket"""
-                db = get_db()
-                
                 # Create conversation message
                 conv_message = {
                     'type': message.get('type', 'progress'),
@@ -138,24 +109,15 @@ async def start_auto_detection_process(websocket: WebSocket, file_id: str):
                 if 'error' in message.get('data', {}):
                     conv_message['error'] = message['data']['error']
                 
-                # Database update operations
-                update_ops = {
-                    '$push': {'messages': conv_message},
-                    '$set': {
-                        'status': conv_message['status'],
-                        'updatedAt': datetime.now(tz=timezone.utc).isoformat()
-                    }
-                }
+                # Fields set along with the new message
+                fields = {'status': conv_message['status']}
                 
                 # Handle plan updates - save plan to database
                 if message.get('type') == 'plan_updated' and 'plan' in message.get('data', {}):
-                    update_ops['$set']['plan'] = message['data']['plan']
+                    fields['plan'] = message['data']['plan']
                 
                 # Save to database
-                db['auto_detection_conversations'].update_one(
-                    {'fileId': file_id},
-                    update_ops
-                )
+                await detection_conversations_repo.push_message(file_id, conv_message, fields)
                 
                 # Stream to WebSocket
                 if file_id in auto_detection_connections:
@@ -165,34 +127,18 @@ async def start_auto_detection_process(websocket: WebSocket, file_id: str):
             result = await run_auto_detection(file_id, "Auto-detection requested", auto_detection_callback)
             
             # Mark as completed
-            db['auto_detection_conversations'].update_one(
-                {'fileId': file_id},
-                {
-                    '$set': {
-                        'status': 'completed' if result.get('success') else 'failed',
-                        'updatedAt': datetime.now(tz=timezone.utc).isoformat()
-                    }
-                }
+            await detection_conversations_repo.set_status(
+                file_id, 'completed' if result.get('success') else 'failed'
             )
             
         except asyncio.CancelledError:
             # Task was cancelled by user
-            db = get_db()
-            db['auto_detection_conversations'].update_one(
-                {'fileId': file_id},
-                {
-                    '$set': {
-                        'status': 'cancelled',
-                        'updatedAt': datetime.now(tz=timezone.utc).isoformat()
-                    }
-                }
-            )
+            await detection_conversations_repo.set_status(file_id, 'cancelled')
             # Re-raise to propagate cancellation
             raise
             
         except Exception as e:
             # Save error to conversation
-            db = get_db()
             error_message = {
                 'type': 'error',
                 'status': 'failed',
@@ -201,16 +147,7 @@ async def start_auto_detection_process(websocket: WebSocket, file_id: str):
                 'error': str(e)
             }
             
-            db['auto_detection_conversations'].update_one(
-                {'fileId': file_id},
-                {
-                    '$push': {'messages': error_message},
-                    '$set': {
-                        'status': 'failed',
-                        'updatedAt': datetime.now(tz=timezone.utc).isoformat()
-                    }
-                }
-            )
+            await detection_conversations_repo.push_message(file_id, error_message, {'status': 'failed'})
             
             if file_id in auto_detection_connections:
                 await auto_detection_connections[file_id].send_json({
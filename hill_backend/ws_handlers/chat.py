@@ -4,7 +4,7 @@ Handles WebSocket connections for chat assistant
 """
 from fastapi import WebSocket, WebSocketDisconnect
 from datetime import datetime, timezone
-from database import get_db
+from repositories import chat_conversations_repo, files_repo
 from agents.chat import generate_ai_response, pending_notifications, set_current_user
 import json
 
@@ -50,25 +50,13 @@ async def handle_websocket(websocket: WebSocket, file_id: str):
                 continue
             
             # Get existing conversation
-            db = get_db()
-            conversation = db['chat_conversations'].find_one({'fileId': file_id})
+            conversation = await chat_conversations_repo.find_by_file(file_id)
             
             if not conversation:
-                conversation = {
-                    'fileId': file_id,
-                    'messages': [],
-                    'createdAt': datetime.now(tz=timezone.utc).isoformat(),
-                    'updatedAt': datetime.now(tz=timezone.utc).isoformat()
-                }
-                result = db['chat_conversations'].insert_one(conversation)
-                conversation_id = str(result.inserted_id)
+                conversation = await chat_conversations_repo.create(file_id)
                 
                 # Update file with conversation ID
-                from bson import ObjectId
-                db['files'].update_one(
-                    {'_id': ObjectId(file_id)},
-                    {'$set': {'chatConversationId': conversation_id}}
-                )
+                await files_repo.set(file_id, {'chatConversationId': str(conversation['_id'])})
             
             # Add user message
             user_msg = {
@@ -79,13 +67,7 @@ async def handle_websocket(websocket: WebSocket, file_id: str):
             conversation['messages'].append(user_msg)
             
             # Update database
-            db['chat_conversations'].update_one(
-                {'fileId': file_id},
-                {
-                    '$push': {'messages': user_msg},
-                    '$set': {'updatedAt': datetime.now(tz=timezone.utc).isoformat()}
-                }
-            )
+            await chat_conversations_repo.push_message(file_id, user_msg)
             
             # Send acknowledgment
             await websocket.send_json({
@@ -105,13 +87,7 @@ async def handle_websocket(websocket: WebSocket, file_id: str):
             conversation['messages'].append(ai_msg)
             
             # Update database
-            db['chat_conversations'].update_one(
-                {'fileId': file_id},
-                {
-                    '$push': {'messages': ai_msg},
-                    '$set': {'updatedAt': datetime.now(tz=timezone.utc).isoformat()}
-                }
-            )
+            await chat_conversations_repo.push_message(file_id, ai_msg)
             
             # Send AI response
             await websocket.send_json({
@@ -9,7 +9,9 @@ export interface FileModel extends BaseModel {
   nbEvent: string;
   description: string;
   rawPath: string;
-  jsonPath: string;
+  rawSize?: number;  // Bytes of the raw upload
+  sha256?: string;   // SHA-256 (hex) of the raw upload
+  jsonPath?: string;  // Only set when the parser writes the full JSON export
   label: string;
   lastUpdate: MongoDate;
   lastModifier: string;
@@ -22,6 +24,9 @@ export interface FileModel extends BaseModel {
   binaryPath?: string;
   metaPath?: string;
   overviewPath?: string;
+  overviewBinaryPath?: string;
+  overviewPoints?: number;
+  columns?: FileColumn[];
   totalPoints?: number;
   
   // X-axis metadata for timestamp handling
@@ -31,4 +36,26 @@ export interface FileModel extends BaseModel {
   xMax?: number;     // Max x value (timestamp or numeric)
 }
 
+/**
+ * Name, unit and color of one column of a file (the x column first)
+ */
+export interface FileColumn {
+  x: boolean;
+  name: string;
+  unit: string;
+  color?: string;
+}
 
+/**
+ * State of a resumable upload session
+ */
+export interface UploadStatus {
+  uploadId: string;
+  name: string;
+  size: number;
+  chunkSize: number;
+  totalChunks: number;
+  state: 'open' | 'finalizing' | 'done';
+  missing: number[];   // Indexes of the chunks not received yet
+  fileId?: string;     // File created by the upload, once done
+}
@@ -4,6 +4,7 @@ import { BaseModel } from './common.model';
  * Labeled event
  */
 export interface LabeledEvent {
+  id?: string; // Stable ID assigned by the backend
   className: string;
   color: string;
   description: string;
@@ -17,6 +18,7 @@ export interface LabeledEvent {
  * Guideline marker on chart
  */
 export interface Guideline {
+  id?: string; // Stable ID assigned by the backend
   yaxis: string; // Plotly.YAxisName | 'paper'
   y: string | number; // Plotly.Datum
   channelName: string;
@@ -24,6 +26,27 @@ export interface Guideline {
   hide: boolean;
 }
 
+/**
+ * Result of adding, updating or deleting one event or guideline
+ * (nbEvent is the file's new event count display; events only)
+ */
+export interface LabelItemResult {
+  id: string;
+  nbEvent?: string | null;
+}
+
+/**
+ * Events of a label overlapping a viewport, with counts per class
+ * (total is the number of events in the whole label)
+ */
+export interface LabelEventsInRange {
+  labelId: string;
+  total: number;
+  count: number;
+  classCounts: { [className: string]: number };
+  events: LabeledEvent[];
+}
+
 /**
  * Label model containing events and guidelines for a file
  */
@@ -1,7 +1,8 @@
 import { Injectable } from '@angular/core';
+import { HttpResponse } from '@angular/common/http';
 import { Observable, map } from 'rxjs';
 import { BaseRepository } from './base.repository';
-import { FileModel, DataModel } from '../models';
+import { FileModel, UploadStatus } from '../models';
 
 /**
  * Files Repository
@@ -22,18 +23,12 @@ export class FilesRepository extends BaseRepository<FileModel> {
   }
 
   /**
-   * Get single file with data
+   * Get the file document and its first-paint data (binary overview, or JSON
+   * for files parsed before overviews were stored in binary)
    */
-  getFile(fileId: string): Observable<{ fileInfo: FileModel; data: DataModel[] }> {
-    return this.apiService.get<string>(`${this.basePath}/${fileId}`).pipe(
-      map(response => {
-        const parsed = this.parseResponse<any>(response);
-        return {
-          fileInfo: this.parseResponse(parsed.fileInfo),
-          data: this.parseResponse(parsed.data)
-        };
-      })
-    );
+  getInitialData(fileId: string, encoding: string, compression: string): Observable<HttpResponse<ArrayBuffer>> {
+    const params = this.buildParams({ encoding, compression });
+    return this.apiService.getArrayBuffer(`${this.basePath}/${fileId}/initial`, params);
   }
 
   /**
@@ -48,6 +43,39 @@ export class FilesRepository extends BaseRepository<FileModel> {
     return this.apiService.upload(this.basePath, formData);
   }
 
+  /**
+   * Start a resumable upload of one file
+   */
+  initiateUpload(folderId: string, userName: string, file: File): Observable<UploadStatus> {
+    return this.apiService.post<UploadStatus>(`${this.basePath}/uploads`, {
+      folderId,
+      user: userName,
+      name: file.name,
+      size: file.size
+    });
+  }
+
+  /**
+   * Get the state of a resumable upload, with the chunks still missing
+   */
+  getUpload(uploadId: string): Observable<UploadStatus> {
+    return this.apiService.get<UploadStatus>(`${this.basePath}/uploads/${uploadId}`);
+  }
+
+  /**
+   * Send one chunk of a resumable upload
+   */
+  uploadChunk(uploadId: string, index: number, chunk: Blob): Observable<unknown> {
+    return this.apiService.put(`${this.basePath}/uploads/${uploadId}/chunks/${index}`, chunk);
+  }
+
+  /**
+   * Store a resumable upload once every chunk is sent, and queue the file for parsing
+   */
+  finalizeUpload(uploadId: string): Observable<{ fileId: string }> {
+    return this.apiService.post<{ fileId: string }>(`${this.basePath}/uploads/${uploadId}/finalize`);
+  }
+
   /**
    * Update file description
    */
@@ -76,10 +104,10 @@ export class FilesRepository extends BaseRepository<FileModel> {
   }
 
   /**
-   * Download JSON files (all files data in folder)
+   * Download JSON files (all files data in folder), as JSON text
    */
   downloadJsonFiles(folderId: string): Observable<string> {
-    return this.apiService.get<string>(`${this.basePath}/data/${folderId}`);
+    return this.apiService.getText(`${this.basePath}/data/${folderId}`);
   }
 
   /**
@@ -1,7 +1,7 @@
 import { Injectable, inject } from '@angular/core';
 import { Observable, map } from 'rxjs';
 import { BaseRepository } from './base.repository';
-import { LabelModel, LabeledEvent } from '../models';
+import { Guideline, LabelEventsInRange, LabelItemResult, LabelModel, LabeledEvent } from '../models';
 import { UserStateService } from '../services';
 
 /**
@@ -38,12 +38,12 @@ export class LabelsRepository extends BaseRepository<LabelModel> {
   }
 
   /**
-   * Add single event to label
+   * Add single event to label (only the event is sent; the backend assigns its ID)
    */
-  addEvent(labelId: string, event: LabeledEvent): Observable<string> {
-    return this.apiService.post(`${this.basePath}/event`, {
-      labelId,
-      ...event
+  addEvent(labelId: string, event: LabeledEvent): Observable<LabelItemResult> {
+    return this.apiService.post(`${this.basePath}/${labelId}/events`, {
+      item: event,
+      user: this.userName()
     });
   }
 
@@ -58,22 +58,29 @@ export class LabelsRepository extends BaseRepository<LabelModel> {
   }
 
   /**
-   * Update event in label
+   * Get the events overlapping an x range (either bound may be omitted)
    */
-  updateEvent(labelId: string, eventIndex: number, event: Partial<LabeledEvent>): Observable<string> {
-    return this.apiService.put(`${this.basePath}/event`, {
-      labelId,
-      eventIndex,
-      ...event
+  getEventsInRange(labelId: string, start?: number | string, end?: number | string): Observable<LabelEventsInRange> {
+    const params = this.buildParams({ start, end });
+    return this.apiService.get<LabelEventsInRange>(`${this.basePath}/${labelId}/events`, params);
+  }
+
+  /**
+   * Update fields of one event
+   */
+  updateEvent(labelId: string, eventId: string, changes: Partial<LabeledEvent>): Observable<LabelItemResult> {
+    return this.apiService.patch(`${this.basePath}/${labelId}/events/${eventId}`, {
+      changes,
+      user: this.userName()
     });
   }
 
   /**
-   * Delete event from label
+   * Delete one event
    */
-  deleteEvent(labelId: string, eventIndex: number): Observable<string> {
-    const params = this.buildParams({ labelId, eventIndex: eventIndex.toString() });
-    return this.apiService.delete(`${this.basePath}/event`, params);
+  deleteEvent(labelId: string, eventId: string): Observable<LabelItemResult> {
+    const params = this.buildParams({ user: this.userName() });
+    return this.apiService.delete(`${this.basePath}/${labelId}/events/${eventId}`, params);
   }
 
   /**
@@ -106,32 +113,35 @@ export class LabelsRepository extends BaseRepository<LabelModel> {
   }
 
   /**
-   * Add guideline to label
+   * Add guideline to label (the backend assigns its ID)
    */
-  addGuideline(labelId: string, guideline: any): Observable<string> {
-    return this.apiService.post(`${this.basePath}/guideline`, {
-      labelId,
-      ...guideline
+  addGuideline(labelId: string, guideline: Guideline): Observable<LabelItemResult> {
+    return this.apiService.post(`${this.basePath}/${labelId}/guidelines`, {
+      item: guideline,
+      user: this.userName()
     });
   }
 
   /**
-   * Update guideline in label
+   * Update fields of one guideline
    */
-  updateGuideline(labelId: string, guidelineIndex: number, guideline: any): Observable<string> {
-    return this.apiService.put(`${this.basePath}/guideline`, {
-      labelId,
-      guidelineIndex,
-      ...guideline
+  updateGuideline(labelId: string, guidelineId: string, changes: Partial<Guideline>): Observable<LabelItemResult> {
+    return this.apiService.patch(`${this.basePath}/${labelId}/guidelines/${guidelineId}`, {
+      changes,
+      user: this.userName()
     });
   }
 
   /**
-   * Delete guideline from label
+   * Delete one guideline
    */
-  deleteGuideline(labelId: string, guidelineIndex: number): Observable<string> {
-    const params = this.buildParams({ labelId, guidelineIndex: guidelineIndex.toString() });
-    return this.apiService.delete(`${this.basePath}/guideline`, params);
+  deleteGuideline(labelId: string, guidelineId: string): Observable<LabelItemResult> {
+    const params = this.buildParams({ user: this.userName() });
+    return this.apiService.delete(`${this.basePath}/${labelId}/guidelines/${guidelineId}`, params);
+  }
+
+  private userName(): string {
+    return this.userState.userInfo()?.name || 'Unknown';
   }
 }
 
@@ -1,5 +1,5 @@
 import { Injectable, inject } from '@angular/core';
-import { HttpClient, HttpParams, HttpHeaders } from '@angular/common/http';
+import { HttpClient, HttpParams, HttpHeaders, HttpResponse } from '@angular/common/http';
 import { Observable } from 'rxjs';
 import { environment } from '../../../../environments/environment';
 
@@ -23,6 +23,20 @@ export class ApiService {
     return this.http.get<T>(`${this.baseUrl}${path}`, { params });
   }
 
+  /**
+   * GET request for a binary body, with the response headers
+   */
+  getArrayBuffer(path: string, params?: HttpParams | { [key: string]: string | string[] }): Observable<HttpResponse<ArrayBuffer>> {
+    return this.http.get(`${this.baseUrl}${path}`, { params, observe: 'response', responseType: 'arraybuffer' });
+  }
+
+  /**
+   * GET request for a text body, returned as it is
+   */
+  getText(path: string, params?: HttpParams | { [key: string]: string | string[] }): Observable<string> {
+    return this.http.get(`${this.baseUrl}${path}`, { params, responseType: 'text' });
+  }
+
   /**
    * POST request
    */
@@ -1,13 +1,13 @@
 import { Component, EventEmitter, Input, Output, ViewChild, inject } from '@angular/core';
 import { CommonModule } from '@angular/common';
-import { HttpClient, HttpEventType } from '@angular/common/http';
+import { concatMap, from, tap } from 'rxjs';
 
 // PrimeNG imports
 import { FileUploadModule, FileUpload } from 'primeng/fileupload';
 import { MessageService } from 'primeng/api';
 
-// Core imports
-import { environment } from '../../../../../environments/environment';
+// Feature imports
+import { ChunkedUploadService } from '../../services';
 
 /**
  * File Upload Component
@@ -32,7 +32,7 @@ export class FileUploadComponent {
   @Output() uploadError = new EventEmitter<string>();
 
   // Inject services
-  private readonly http = inject(HttpClient);
+  private readonly chunkedUpload = inject(ChunkedUploadService);
   private readonly messageService = inject(MessageService);
 
   uploadedFileNames: string[] = [];
@@ -52,48 +52,48 @@ export class FileUploadComponent {
       return;
     }
 
-    this.uploadedFileNames = event.files.map((f: File) => f.name);
-    const formData = new FormData();
-    formData.append('data', this.folderId);
-    formData.append('user', this.userName);
-    
-    for (let file of event.files) {
-      formData.append('files', file, file.name);
-    }
+    const files: File[] = event.files;
+    const folderId = this.folderId;
+    const userName = this.userName;
+    this.uploadedFileNames = files.map(f => f.name);
     
     this.isUploading = true;
     this.uploadProgress = 0;
     
-    this.http.post(`${environment.apiUrl}/files`, formData, {
-      reportProgress: true,
-      observe: 'events'
-    }).subscribe({
-      next: (res) => {
-        if (res.type === HttpEventType.UploadProgress) {
-          // Cap at 80% — server still needs time to process after bytes are sent
-          this.uploadProgress = Math.min(80, Math.round(80 * res.loaded / (res.total || 1)));
-        }
-        if (res.type === HttpEventType.Response) {
-          // Animate to 100% so the user sees completion, then close
-          this.uploadProgress = 100;
-          this.messageService.add({
-            severity: 'success',
-            summary: 'Success',
-            detail: `${this.uploadedFileNames.length} file(s) uploaded successfully`
-          });
-          setTimeout(() => {
-            this.isUploading = false;
-            this.uploadComplete.emit();
-            this.clear();
-          }, 600);
-        }
+    const totalBytes = files.reduce((sum, file) => sum + file.size, 0) || 1;
+    const uploadedBytes = files.map(() => 0);
+    
+    // Files one after another, the chunks of each file in parallel
+    from(files).pipe(
+      concatMap((file, i) => this.chunkedUpload.upload(file, folderId, userName).pipe(
+        tap(progress => uploadedBytes[i] = progress.uploadedBytes)
+      ))
+    ).subscribe({
+      next: () => {
+        // Cap at 80% — the last file is still stored and queued after its bytes are sent
+        const sent = uploadedBytes.reduce((sum, bytes) => sum + bytes, 0);
+        this.uploadProgress = Math.min(80, Math.round(80 * sent / totalBytes));
+      },
+      complete: () => {
+        // Animate to 100% so the user sees completion, then close
+        this.uploadProgress = 100;
+        this.messageService.add({
+          severity: 'success',
+          summary: 'Success',
+          detail: `${this.uploadedFileNames.length} file(s) uploaded successfully`
+        });
+        setTimeout(() => {
+          this.isUploading = false;
+          this.uploadComplete.emit();
+          this.clear();
+        }, 600);
       },
       error: (error) => {
         console.error('Failed to upload files:', error);
         this.messageService.add({
           severity: 'error',
           summary: 'Error',
-          detail: 'Failed to upload files'
+          detail: 'Failed to upload files. Upload them again to resume where it stopped'
         });
         this.isUploading = false;
         this.uploadError.emit(error.message || 'Upload failed');
@@ -284,9 +284,19 @@ export class FilesPageComponent implements OnInit, OnDestroy {
       formData.append('data', this.folderInfo._id?.$oid || '');
       formData.append('user', this.userInfo.name);
       formData.append('file', file, file.name);
-      this.http.post(`${environment.apiUrl}/labels/events`, formData).subscribe({
-        next: () => {
-          this.messageService.add({ severity: 'success', summary: 'Success', detail: 'Labels imported' });
+      this.http.post<any>(`${environment.apiUrl}/labels/events`, formData).subscribe({
+        next: (response) => {
+          if (response?.failed > 0) {
+            const failedNames = response.files.filter((f: any) => !f.success).map((f: any) => f.fileName);
+            console.warn('Label import failures:', response.files.filter((f: any) => !f.success));
+            this.messageService.add({
+              severity: 'warn',
+              summary: 'Partially imported',
+              detail: `${response.imported} imported, ${response.failed} failed: ${failedNames.slice(0, 5).join(', ')}${failedNames.length > 5 ? ', ...' : ''}`
+            });
+          } else {
+            this.messageService.add({ severity: 'success', summary: 'Success', detail: 'Labels imported' });
+          }
           this.loadFolderAndFiles();
         },
         error: (error) => {
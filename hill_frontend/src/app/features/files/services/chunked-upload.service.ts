@@ -0,0 +1,96 @@
+import { Injectable, inject } from '@angular/core';
+import { Observable, catchError, concat, defer, from, map, mergeMap, of, retry, switchMap, tap, timer } from 'rxjs';
+import { FilesRepository } from '../../../core/repositories';
+import { UploadStatus } from '../../../core/models';
+
+/** Chunks of one file sent at the same time */
+export const UPLOAD_PARALLEL_CHUNKS = 4;
+
+/** Attempts per chunk before the upload fails (it can still be resumed) */
+const CHUNK_ATTEMPTS = 3;
+
+const RESUME_KEY_PREFIX = 'hill-upload:';
+
+export interface ChunkedUploadProgress {
+  uploadedBytes: number;
+  fileId?: string;   // Set once the file is stored and queued for parsing
+}
+
+/**
+ * Chunked Upload Service
+ * Uploads files with the backend's resumable upload protocol
+ *
+ * A file is sent in numbered chunks, several at a time, and stored once all
+ * of them are received. The session of an unfinished upload is remembered
+ * per folder and file, so uploading the same file again after a failure or
+ * a reload only sends the chunks the backend is still missing.
+ */
+@Injectable({
+  providedIn: 'root'
+})
+export class ChunkedUploadService {
+
+  private readonly filesRepo = inject(FilesRepository);
+
+  /**
+   * Upload a file and queue it for parsing
+   *
+   * Emits the bytes received by the backend so far (once at the start,
+   * then after every chunk), and finally the ID of the stored file.
+   */
+  upload(file: File, folderId: string, userName: string): Observable<ChunkedUploadProgress> {
+    const key = `${RESUME_KEY_PREFIX}${folderId}:${file.name}:${file.size}:${file.lastModified}`;
+
+    return this.openSession(file, folderId, userName, key).pipe(
+      switchMap(status => {
+        let uploadedBytes = file.size - status.missing.reduce((sum, index) => sum + this.chunkLength(status, index), 0);
+
+        const chunks$ = from(status.missing).pipe(
+          mergeMap(index => this.sendChunk(file, status, index), UPLOAD_PARALLEL_CHUNKS),
+          map(length => ({ uploadedBytes: uploadedBytes += length }))
+        );
+        const finalize$ = defer(() => this.filesRepo.finalizeUpload(status.uploadId)).pipe(
+          tap(() => localStorage.removeItem(key)),
+          map(result => ({ uploadedBytes: file.size, fileId: result.fileId }))
+        );
+
+        return concat(of({ uploadedBytes }), chunks$, finalize$);
+      })
+    );
+  }
+
+  /**
+   * Resume the remembered session of a file, or start a new one
+   */
+  private openSession(file: File, folderId: string, userName: string, key: string): Observable<UploadStatus> {
+    const create$ = defer(() => this.filesRepo.initiateUpload(folderId, userName, file)).pipe(
+      tap(status => localStorage.setItem(key, status.uploadId))
+    );
+
+    const uploadId = localStorage.getItem(key);
+    if (!uploadId) {
+      return create$;
+    }
+    // Sessions that are gone or no longer accept chunks start over
+    return this.filesRepo.getUpload(uploadId).pipe(
+      switchMap(status => status.state === 'open' ? of(status) : create$),
+      catchError(() => create$)
+    );
+  }
+
+  /**
+   * Send one chunk, retrying with a growing delay; emits its size
+   */
+  private sendChunk(file: File, status: UploadStatus, index: number): Observable<number> {
+    const start = index * status.chunkSize;
+    const chunk = file.slice(start, start + this.chunkLength(status, index));
+    return this.filesRepo.uploadChunk(status.uploadId, index, chunk).pipe(
+      retry({ count: CHUNK_ATTEMPTS - 1, delay: (_error, attempt) => timer(1000 * attempt) }),
+      map(() => chunk.size)
+    );
+  }
+
+  private chunkLength(status: UploadStatus, index: number): number {
+    return Math.min(status.chunkSize, status.size - index * status.chunkSize);
+  }
+}
@@ -0,0 +1,6 @@
+/**
+ * Files Services
+ * Export all files feature services
+ */
+
+export * from './chunked-upload.service';
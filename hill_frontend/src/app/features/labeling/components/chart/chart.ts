@@ -67,6 +67,10 @@ export class ChartComponent implements OnInit, AfterViewInit, OnDestroy {
   private fullXMin?: number;
   private fullXMax?: number;
   
+  // Last requested viewport (refetched when trace visibility changes)
+  private viewMin?: number;
+  private viewMax?: number;
+  
   constructor() {
     // React to data changes - reinitialize chart when data changes
     effect(() => {
@@ -170,6 +174,13 @@ export class ChartComponent implements OnInit, AfterViewInit, OnDestroy {
     // Store channel metadata for resampling
     this.extractChannelMetadata(currentData);
     
+    // Re-read the tile grid: its version changes when the file is reparsed
+    this.fetchController.resetTileSet();
+    
+    // Last requested viewport belongs to the previous file
+    this.viewMin = undefined;
+    this.viewMax = undefined;
+    
     // Clear existing channel list
     this.labelState.clearChannels();
     
@@ -255,6 +266,58 @@ export class ChartComponent implements OnInit, AfterViewInit, OnDestroy {
     element.on('plotly_doubleclick', () => {
       this.handleResetAxes();
     });
+    
+    // Fetch channels shown/hidden from the legend
+    element.on('plotly_restyle', (eventData: any) => {
+      this.onPlotlyRestyle(eventData);
+    });
+  }
+  
+  /**
+   * Handle Plotly restyle events
+   * Viewport requests only fetch visible channels, so re-request the current
+   * range when a legend click changes trace visibility
+   */
+  private onPlotlyRestyle(eventData: any): void {
+    const currentFileInfo = this.fileInfo();
+    
+    if (!currentFileInfo?.useBinaryFormat || !currentFileInfo._id?.$oid) {
+      return;
+    }
+    
+    const update = Array.isArray(eventData) ? eventData[0] : undefined;
+    if (!update || !('visible' in update)) {
+      return;
+    }
+    
+    const viewMin = this.viewMin ?? this.fullXMin;
+    const viewMax = this.viewMax ?? this.fullXMax;
+    if (viewMin !== undefined && viewMax !== undefined) {
+      this.handleViewportChange(viewMin, viewMax, currentFileInfo._id.$oid);
+    }
+  }
+  
+  /**
+   * Names of the channels currently visible in the chart
+   * Returns undefined when all channels are visible (no filtering needed)
+   */
+  private getVisibleChannelNames(): string[] | undefined {
+    const plotData = (this.chartDiv?.nativeElement as any)?.data;
+    if (!Array.isArray(plotData)) {
+      return undefined;
+    }
+    
+    const channelNames = new Set(this.channelMeta.map(c => c.name));
+    const channelTraces = plotData.filter((t: any) => channelNames.has(t.name));
+    const visible = channelTraces
+      .filter((t: any) => t.visible !== 'legendonly' && t.visible !== false)
+      .map((t: any) => t.name as string);
+    
+    // Keep at least one channel so the response still carries the x-axis
+    if (visible.length === channelTraces.length || visible.length === 0) {
+      return undefined;
+    }
+    return visible;
   }
   
   /**
@@ -376,8 +439,11 @@ export class ChartComponent implements OnInit, AfterViewInit, OnDestroy {
    * The actual response is handled by the viewportData$ subscription
    */
   private handleViewportChange(viewMin: number, viewMax: number, fileId: string): void {
-    console.debug('[Viewport] Requesting data for range:', { viewMin, viewMax });
-    this.fetchController.requestViewport(fileId, viewMin, viewMax, 5000);
+    const channels = this.getVisibleChannelNames();
+    console.debug('[Viewport] Requesting data for range:', { viewMin, viewMax, channels });
+    this.viewMin = viewMin;
+    this.viewMax = viewMax;
+    this.fetchController.requestViewport(fileId, viewMin, viewMax, 5000, channels);
   }
   
   /**
@@ -412,15 +478,24 @@ export class ChartComponent implements OnInit, AfterViewInit, OnDestroy {
       }
     }
     
+    // Match channels to traces by name: the response may hold only the visible channels
+    const currentPlotData = (element as any).data;
+    const traceIndices: number[] = [];
+    const matchedChannels: DataModel[] = [];
+    for (const ch of channels) {
+      const index = currentPlotData.findIndex((t: any) => t.name === ch.name);
+      if (index >= 0) {
+        traceIndices.push(index);
+        matchedChannels.push(ch);
+      }
+    }
+    
     // Build update object for traces
     const traceUpdate: any = {
-      x: channels.map(() => xData),
-      y: channels.map(ch => ch.data)
+      x: matchedChannels.map(() => xData),
+      y: matchedChannels.map(ch => ch.data)
     };
     
-    // Update all traces
-    const traceIndices = channels.map((_, i) => i);
-    
     // If we need to preserve the viewport, also update layout
     if (viewMin !== undefined && viewMax !== undefined) {
       // Convert viewport to Date if needed for x-axis
@@ -434,15 +509,12 @@ export class ChartComponent implements OnInit, AfterViewInit, OnDestroy {
       
       // Use Plotly.react to update both data and layout atomically
       // This prevents the viewport from jumping
-      const currentPlotData = (element as any).data;
       const currentLayout = (element as any).layout;
       
       // Update trace data
       for (let i = 0; i < traceIndices.length; i++) {
-        if (currentPlotData[i]) {
-          currentPlotData[i].x = xData;
-          currentPlotData[i].y = channels[i].data;
-        }
+        currentPlotData[traceIndices[i]].x = xData;
+        currentPlotData[traceIndices[i]].y = matchedChannels[i].data;
       }
       
       // Preserve x-axis range
@@ -477,8 +549,8 @@ export class ChartComponent implements OnInit, AfterViewInit, OnDestroy {
             currentLabelInfo.guidelines.push(newGuideline);
             this.labelState.updateLabel(currentLabelInfo);
             
-            // Auto-save to database
-            this.labelingActions.queueAutoSave(currentLabelInfo);
+            // Save the new guideline to database
+            this.labelingActions.addGuideline(currentLabelInfo, newGuideline);
           }
           
           // Reset button state
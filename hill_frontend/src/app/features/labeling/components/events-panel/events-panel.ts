@@ -148,11 +148,12 @@ export class EventsPanelComponent {
     
     const index = this.labelInfo.events.findIndex(e => e === event);
     if (index !== -1) {
-      this.labelInfo.events[index].hide = !this.labelInfo.events[index].hide;
+      const changed = this.labelInfo.events[index];
+      changed.hide = !changed.hide;
       this.labelState.updateLabel(this.labelInfo);
       
-      // Auto-save to database
-      this.labelingActions.queueAutoSave(this.labelInfo);
+      // Save the change to database
+      this.labelingActions.updateEvent(this.labelInfo, changed, { hide: changed.hide });
     }
   }
   
@@ -165,8 +166,8 @@ export class EventsPanelComponent {
     this.labelInfo.events = this.labelInfo.events.filter(e => e !== eventToRemove);
     this.labelState.updateLabel(this.labelInfo);
     
-    // Auto-save to database
-    this.labelingActions.queueAutoSave(this.labelInfo);
+    // Delete from database
+    this.labelingActions.removeEvent(this.labelInfo, eventToRemove);
   }
   
   /**
@@ -139,11 +139,12 @@ export class GuidelinesPanelComponent {
     
     const index = this.labelInfo.guidelines.findIndex(g => g === guideline);
     if (index !== -1) {
-      this.labelInfo.guidelines[index].hide = !this.labelInfo.guidelines[index].hide;
+      const changed = this.labelInfo.guidelines[index];
+      changed.hide = !changed.hide;
       this.labelState.updateLabel(this.labelInfo);
       
-      // Auto-save to database
-      this.labelingActions.queueAutoSave(this.labelInfo);
+      // Save the change to database
+      this.labelingActions.updateGuideline(this.labelInfo, changed, { hide: changed.hide });
     }
   }
   
@@ -156,7 +157,7 @@ export class GuidelinesPanelComponent {
     this.labelInfo.guidelines = this.labelInfo.guidelines.filter(g => g !== guidelineToRemove);
     this.labelState.updateLabel(this.labelInfo);
     
-    // Auto-save to database
-    this.labelingActions.queueAutoSave(this.labelInfo);
+    // Delete from database
+    this.labelingActions.removeGuideline(this.labelInfo, guidelineToRemove);
   }
 }
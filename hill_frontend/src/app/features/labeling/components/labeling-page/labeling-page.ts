@@ -16,12 +16,12 @@ import { DialogModule } from 'primeng/dialog';
 
 // Core imports
 import { UserStateService } from '../../../../core/services';
-import { LabelsRepository, UsersRepository, FilesRepository, ProjectsRepository, FoldersRepository } from '../../../../core/repositories';
+import { LabelsRepository, UsersRepository, ProjectsRepository, FoldersRepository } from '../../../../core/repositories';
 import { FileModel, FolderModel, LabelModel, ProjectModel, DataModel, UserModel } from '../../../../core/models';
 import { environment } from '../../../../../environments/environment';
 
 // Feature services
-import { LabelStateService, AutoDetectionService, LabelingActionsService, FetchControllerService } from '../../services';
+import { LabelStateService, AutoDetectionService, LabelingActionsService, FetchControllerService, FileDataService } from '../../services';
 
 // Shared services
 import { AiChatService } from '../../../../shared/services';
@@ -92,7 +92,7 @@ export class LabelingPageComponent implements OnInit, OnDestroy {
   private readonly userState = inject(UserStateService);
   private readonly labelState = inject(LabelStateService);
   private readonly projectsRepo = inject(ProjectsRepository);
-  private readonly filesRepo = inject(FilesRepository);
+  private readonly fileData = inject(FileDataService);
   private readonly foldersRepo = inject(FoldersRepository);
   private readonly labelsRepo = inject(LabelsRepository);
   private readonly autoDetectionService = inject(AutoDetectionService);
@@ -264,7 +264,7 @@ export class LabelingPageComponent implements OnInit, OnDestroy {
     this.activeTab = '0';
     
     // Load file data
-    this.filesRepo.getFile(fileId).subscribe({
+    this.fileData.loadFile(fileId).subscribe({
       next: (fileData) => {
         const file = fileData.fileInfo;
         const data = fileData.data;
@@ -576,8 +576,9 @@ export class LabelingPageComponent implements OnInit, OnDestroy {
   onSaveEventDescription(newDescription: string): void {
     if (this.selectedEvent && this.labelInfo && this.selectedEventIndex !== undefined) {
       // Update the description in the event at the correct index
-      if (this.labelInfo.events && this.labelInfo.events[this.selectedEventIndex]) {
-        this.labelInfo.events[this.selectedEventIndex].description = newDescription;
+      const event = this.labelInfo.events?.[this.selectedEventIndex];
+      if (event) {
+        event.description = newDescription;
         
         // Also update the selected event reference
         this.selectedEvent.description = newDescription;
@@ -588,8 +589,10 @@ export class LabelingPageComponent implements OnInit, OnDestroy {
       // Update label in state
       this.labelState.updateLabel(this.labelInfo);
       
-      // Auto-save to database
-      this.labelingActions.saveLabel(this.labelInfo).subscribe();
+      // Save the changed description to database
+      if (event) {
+        this.labelingActions.updateEvent(this.labelInfo, event, { description: newDescription });
+      }
     }
   }
   
@@ -370,8 +370,8 @@ export class LabelingToolbarComponent {
           this.labelInfo!.events.push(newEvent);
           this.labelState.updateLabel(this.labelInfo!);
 
-          // Auto-save to database
-          this.labelingActions.queueAutoSave(this.labelInfo!);
+          // Save the new event to database
+          this.labelingActions.addEvent(this.labelInfo!, newEvent);
 
           // Show success message
           this.messageService.add({
@@ -422,8 +422,8 @@ export class LabelingToolbarComponent {
       this.labelInfo.events.push(newEvent);
       this.labelState.updateLabel(this.labelInfo);
       
-      // Auto-save to database
-      this.labelingActions.queueAutoSave(this.labelInfo);
+      // Save the new event to database
+      this.labelingActions.addEvent(this.labelInfo, newEvent);
       
       // Clear selection and close dialog
       this.labelState.clearLabelSelection();
@@ -5,9 +5,12 @@ import { map, catchError, switchMap } from 'rxjs/operators';
 
 // Core imports
 import { UserStateService } from '../../../core/services';
-import { FilesRepository, FoldersRepository, LabelsRepository, ProjectsRepository, UsersRepository } from '../../../core/repositories';
+import { FoldersRepository, LabelsRepository, ProjectsRepository, UsersRepository } from '../../../core/repositories';
 import { FileModel, FolderModel, LabelModel, DataModel } from '../../../core/models';
 
+// Feature services
+import { FileDataService } from '../services/file-data.service';
+
 /**
  * Labeling Data Resolver
  * Pre-loads all necessary data before navigating to the labeling page
@@ -23,7 +26,7 @@ export interface LabelingResolverData {
 export const labelingDataResolver: ResolveFn<LabelingResolverData | null> = (
   route: ActivatedRouteSnapshot
 ) => {
-  const filesRepo = inject(FilesRepository);
+  const fileData = inject(FileDataService);
   const foldersRepo = inject(FoldersRepository);
   const labelsRepo = inject(LabelsRepository);
   const projectsRepo = inject(ProjectsRepository);
@@ -73,7 +76,7 @@ export const labelingDataResolver: ResolveFn<LabelingResolverData | null> = (
       return of(null);
     }),
     // Now load file data
-    switchMap(() => filesRepo.getFile(fileId)),
+    switchMap(() => fileData.loadFile(fileId)),
     catchError(error => {
       console.error('Failed to load file:', error);
       return of(null);
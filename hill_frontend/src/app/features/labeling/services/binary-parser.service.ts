@@ -1,4 +1,5 @@
 import { Injectable } from '@angular/core';
+import { DataModel, FileModel } from '../../../core/models';
 
 /**
  * Response from viewport API endpoint
@@ -19,6 +20,26 @@ export interface ViewportResponse {
   };
 }
 
+/**
+ * Response headers as read by the parser (fetch Headers or Angular HttpHeaders)
+ */
+export type ResponseHeaders = Pick<Headers, 'get'>;
+
+/**
+ * File document and chart data of the initial-load API
+ */
+export interface InitialData {
+  fileInfo: FileModel;
+  data: DataModel[];
+}
+
+/**
+ * Body encodings requested from the viewport API (see X-Encoding / X-Compression)
+ * float32 + deflate is typically 3-6x smaller than plain float64
+ */
+export const VIEWPORT_ENCODING = 'float32';
+export const VIEWPORT_COMPRESSION = 'deflate';
+
 /**
  * Binary Parser Service
  * Parses binary ArrayBuffer responses from the viewport API
@@ -28,6 +49,67 @@ export interface ViewportResponse {
 })
 export class BinaryParserService {
 
+  /**
+   * Decode a compact viewport body into the plain float64 layout
+   * 
+   * - X-Compression: deflate -> zlib stream of the byte-shuffled values
+   * - X-Encoding: float32 -> [x0 as float64][x - x0 as float32][channels as float32]
+   * 
+   * @param buffer The binary ArrayBuffer from the response
+   * @param headers The response headers containing metadata
+   * @returns [x_values][ch1_values]... as float64
+   */
+  async decodeBody(buffer: ArrayBuffer, headers: ResponseHeaders): Promise<ArrayBuffer> {
+    const encoding = headers.get('X-Encoding') || 'float64';
+    const compression = headers.get('X-Compression') || 'none';
+    if (buffer.byteLength === 0 || (encoding === 'float64' && compression === 'none')) {
+      return buffer;
+    }
+
+    const headerBytes = encoding === 'float32' ? 8 : 0;
+    const width = encoding === 'float32' ? 4 : 8;
+    let bytes = new Uint8Array(buffer);
+
+    if (compression === 'deflate') {
+      const stream = new Blob([buffer]).stream().pipeThrough(new DecompressionStream('deflate'));
+      const inflated = new Uint8Array(await new Response(stream).arrayBuffer());
+      bytes = new Uint8Array(inflated.length);
+      bytes.set(inflated.subarray(0, headerBytes));
+      bytes.set(this.unshuffle(inflated.subarray(headerBytes), width), headerBytes);
+    }
+
+    if (encoding !== 'float32') {
+      return bytes.buffer;
+    }
+
+    const x0 = new DataView(bytes.buffer).getFloat64(0, true);
+    const values = new Float32Array(bytes.buffer, 8, (bytes.length - 8) / 4);
+    const pointsPerColumn = parseInt(headers.get('X-Returned-Points') || '0', 10);
+    const out = new Float64Array(values.length);
+    for (let i = 0; i < values.length; i++) {
+      out[i] = values[i];
+    }
+    for (let i = 0; i < pointsPerColumn; i++) {
+      out[i] += x0;
+    }
+    return out.buffer;
+  }
+
+  /**
+   * Undo the byte shuffle: lane k holds byte k of every value
+   */
+  private unshuffle(shuffled: Uint8Array, width: number): Uint8Array {
+    const count = shuffled.length / width;
+    const out = new Uint8Array(shuffled.length);
+    for (let lane = 0; lane < width; lane++) {
+      const base = lane * count;
+      for (let i = 0; i < count; i++) {
+        out[i * width + lane] = shuffled[base + i];
+      }
+    }
+    return out;
+  }
+
   /**
    * Parse a viewport response from the backend
    * 
@@ -35,7 +117,7 @@ export class BinaryParserService {
    * @param headers The response headers containing metadata
    * @returns Parsed ViewportResponse with typed arrays
    */
-  parseViewportResponse(buffer: ArrayBuffer, headers: Headers): ViewportResponse {
+  parseViewportResponse(buffer: ArrayBuffer, headers: ResponseHeaders): ViewportResponse {
     // Check if buffer is valid
     if (!buffer || buffer.byteLength === 0) {
       console.warn('[BinaryParser] Empty buffer received');
@@ -114,6 +196,78 @@ export class BinaryParserService {
     };
   }
   
+  /**
+   * Parse a binary initial-load response (GET /files/{id}/initial)
+   * 
+   * Layout: [preface length as uint32 LE][file document as JSON][overview],
+   * where the overview is a viewport body described by the viewport headers
+   * 
+   * @param buffer The binary ArrayBuffer from the response
+   * @param headers The response headers containing metadata
+   * @returns File document and overview in the DataModel format
+   */
+  async parseInitialData(buffer: ArrayBuffer, headers: ResponseHeaders): Promise<InitialData> {
+    const prefaceLength = new DataView(buffer).getUint32(0, true);
+    const fileInfo: FileModel = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, prefaceLength)));
+    const body = buffer.slice(4 + prefaceLength);
+    const response = this.parseViewportResponse(await this.decodeBody(body, headers), headers);
+
+    const columns = fileInfo.columns ?? [];
+    const xColumn = columns.find(c => c.x);
+    const channelMeta = columns
+      .filter(c => !c.x)
+      .map(c => ({ name: c.name, unit: c.unit, color: c.color ?? '#000000' }));
+    const data = this.toDataModelFormat(response, xColumn?.name ?? '', xColumn?.unit ?? '', channelMeta);
+    return { fileInfo, data };
+  }
+
+  /**
+   * Concatenate consecutive responses (e.g. adjacent tiles) into one
+   *
+   * @param parts Responses in x order, with the same channels
+   * @returns Single ViewportResponse covering all parts
+   */
+  mergeViewportResponses(parts: ViewportResponse[]): ViewportResponse {
+    const nonEmpty = parts.filter(p => p.x.length > 0);
+    if (nonEmpty.length === 0) {
+      return parts[0] ?? this.createEmptyResponse();
+    }
+    if (nonEmpty.length === 1) {
+      return nonEmpty[0];
+    }
+
+    const concat = (arrays: Float64Array[]): Float64Array => {
+      const out = new Float64Array(arrays.reduce((n, a) => n + a.length, 0));
+      let offset = 0;
+      for (const a of arrays) {
+        out.set(a, offset);
+        offset += a.length;
+      }
+      return out;
+    };
+
+    const first = nonEmpty[0].metadata;
+    const last = nonEmpty[nonEmpty.length - 1].metadata;
+    const channels = new Map<string, Float64Array>();
+    for (const name of first.channelNames) {
+      channels.set(name, concat(nonEmpty.map(p => p.channels.get(name) ?? new Float64Array(p.x.length).fill(NaN))));
+    }
+    const x = concat(nonEmpty.map(p => p.x));
+
+    return {
+      x,
+      channels,
+      metadata: {
+        ...first,
+        totalPoints: nonEmpty.reduce((n, p) => n + p.metadata.totalPoints, 0),
+        returnedPoints: x.length,
+        isFullResolution: nonEmpty.every(p => p.metadata.isFullResolution),
+        xMin: first.xMin,
+        xMax: last.xMax
+      }
+    };
+  }
+
   /**
    * Create an empty response for edge cases
    */
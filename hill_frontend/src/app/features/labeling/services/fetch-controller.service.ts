@@ -1,7 +1,12 @@
 import { Injectable, inject, signal } from '@angular/core';
 import { Observable, Subject, EMPTY, from } from 'rxjs';
 import { catchError, debounceTime, switchMap, tap, finalize } from 'rxjs/operators';
-import { BinaryParserService, ViewportResponse } from './binary-parser.service';
+import {
+  BinaryParserService,
+  ViewportResponse,
+  VIEWPORT_ENCODING,
+  VIEWPORT_COMPRESSION
+} from './binary-parser.service';
 import { environment } from '../../../../environments/environment';
 
 export interface ViewportRequest {
@@ -9,6 +14,21 @@ export interface ViewportRequest {
   xMin: number;
   xMax: number;
   maxPoints: number;
+  /** Channel names to fetch; all channels when omitted */
+  channels?: string[];
+}
+
+/**
+ * Tile grid of a binary file (GET /files/{id}/tiles)
+ */
+export interface TileSet {
+  version: string;
+  xMin: number;
+  xMax: number;
+  totalPoints: number;
+  tilePoints: number;
+  maxLevel: number;
+  channels: string[];
 }
 
 export interface ViewportResult {
@@ -21,6 +41,9 @@ export interface ViewportResult {
  * Fetch Controller Service
  * Manages viewport data fetching with debouncing and request cancellation
  * Uses switchMap to automatically cancel stale requests
+ *
+ * Files with a tile grid are fetched as fixed, versioned tiles that the
+ * browser and nginx can cache; other files use the free-range viewport API.
  */
 @Injectable({
   providedIn: 'root'
@@ -31,8 +54,12 @@ export class FetchControllerService {
   private readonly apiUrl = environment.apiUrl;
 
   private currentController: AbortController | null = null;
+  private readonly encodingQuery = `encoding=${VIEWPORT_ENCODING}&compression=${VIEWPORT_COMPRESSION}`;
   private readonly DEBOUNCE_MS = 150;
 
+  /** Tile grid of the current file (null if the file has none) */
+  private tileSet: { fileId: string; promise: Promise<TileSet | null> } | null = null;
+
   /** Whether a fetch is currently in progress */
   readonly isLoading = signal(false);
 
@@ -58,8 +85,15 @@ export class FetchControllerService {
   /**
    * Request viewport data (debounced, auto-cancels previous requests)
    */
-  requestViewport(fileId: string, xMin: number, xMax: number, maxPoints: number = 5000): void {
-    this.viewportRequest$.next({ fileId, xMin, xMax, maxPoints });
+  requestViewport(fileId: string, xMin: number, xMax: number, maxPoints: number = 5000, channels?: string[]): void {
+    this.viewportRequest$.next({ fileId, xMin, xMax, maxPoints, channels });
+  }
+
+  /**
+   * Forget the cached tile grid, e.g. when a file is (re)opened after reparsing
+   */
+  resetTileSet(): void {
+    this.tileSet = null;
   }
 
   /**
@@ -74,38 +108,10 @@ export class FetchControllerService {
     this.currentController = new AbortController();
     const signal = this.currentController.signal;
 
-    const url = `${this.apiUrl}/files/${req.fileId}/viewport?x_min=${req.xMin}&x_max=${req.xMax}&max_points=${req.maxPoints}`;
-
     return from(
-      fetch(url, { signal })
-        .then(async response => {
-          if (!response.ok) {
-            const text = await response.text();
-            throw new Error(`HTTP ${response.status}: ${response.statusText} - ${text}`);
-          }
-
-          const contentType = response.headers.get('Content-Type') || '';
-          if (!contentType.includes('octet-stream')) {
-            const text = await response.text();
-            console.error('[FetchController] Expected binary data but got:', contentType, text.substring(0, 200));
-            throw new Error(`Expected binary data but got ${contentType}: ${text.substring(0, 100)}`);
-          }
-
-          const buffer = await response.arrayBuffer();
-
-          console.debug(`[FetchController] Received ${buffer.byteLength} bytes, headers:`, {
-            totalPoints: response.headers.get('X-Total-Points'),
-            returnedPoints: response.headers.get('X-Returned-Points'),
-            numColumns: response.headers.get('X-Num-Columns'),
-            channelNames: response.headers.get('X-Channel-Names')
-          });
-
-          return { buffer, headers: response.headers };
-        })
-        .then(({ buffer, headers }) => {
-          const parsed = this.binaryParser.parseViewportResponse(buffer, headers);
-          return { response: parsed, xMin: req.xMin, xMax: req.xMax } as ViewportResult;
-        })
+      this.getTileSet(req.fileId)
+        .then(tileSet => tileSet ? this.fetchTiles(req, tileSet, signal) : this.fetchRange(req, signal))
+        .then(response => ({ response, xMin: req.xMin, xMax: req.xMax } as ViewportResult))
     ).pipe(
       finalize(() => {
         this.currentController = null;
@@ -113,6 +119,97 @@ export class FetchControllerService {
     );
   }
 
+  /**
+   * Get the tile grid of a file, fetched once per opened file
+   */
+  private getTileSet(fileId: string): Promise<TileSet | null> {
+    if (!this.tileSet || this.tileSet.fileId !== fileId) {
+      const promise = fetch(`${this.apiUrl}/files/${fileId}/tiles`)
+        .then(response => response.ok ? response.json() as Promise<TileSet> : null)
+        .catch(() => null);
+      this.tileSet = { fileId, promise };
+    }
+    return this.tileSet.promise;
+  }
+
+  /**
+   * Fetch the tiles covering the requested range and merge them
+   * The level is the deepest whose tiles are at least as wide as the range,
+   * so at most two tiles are needed; each holds `tilePoints` points per channel
+   */
+  private async fetchTiles(req: ViewportRequest, tileSet: TileSet, signal: AbortSignal): Promise<ViewportResponse> {
+    const span = tileSet.xMax - tileSet.xMin;
+    const viewSpan = req.xMax - req.xMin;
+    const level = span > 0 && viewSpan > 0
+      ? Math.min(tileSet.maxLevel, Math.max(0, Math.floor(Math.log2(span / viewSpan))))
+      : 0;
+    const count = 2 ** level;
+    const width = span / count;
+    const tileAt = (x: number) => width > 0
+      ? Math.min(count - 1, Math.max(0, Math.floor((x - tileSet.xMin) / width)))
+      : 0;
+
+    let query = `v=${encodeURIComponent(tileSet.version)}&${this.encodingQuery}`;
+    if (req.channels) {
+      query += `&channels=${encodeURIComponent(req.channels.join(','))}`;
+    }
+
+    const indices: number[] = [];
+    for (let i = tileAt(req.xMin); i <= tileAt(req.xMax); i++) {
+      indices.push(i);
+    }
+
+    const parts = await Promise.all(indices.map(i =>
+      this.fetchBinary(`${this.apiUrl}/files/${req.fileId}/tiles/${level}/${i}?${query}`, signal)
+    ));
+    return this.binaryParser.mergeViewportResponses(parts);
+  }
+
+  /**
+   * Fetch an arbitrary range from the viewport endpoint
+   */
+  private fetchRange(req: ViewportRequest, signal: AbortSignal): Promise<ViewportResponse> {
+    let url = `${this.apiUrl}/files/${req.fileId}/viewport?x_min=${req.xMin}&x_max=${req.xMax}&max_points=${req.maxPoints}&${this.encodingQuery}`;
+    if (req.channels) {
+      url += `&channels=${encodeURIComponent(req.channels.join(','))}`;
+    }
+    return this.fetchBinary(url, signal);
+  }
+
+  /**
+   * Fetch and parse one binary viewport/tile response
+   */
+  private fetchBinary(url: string, signal: AbortSignal): Promise<ViewportResponse> {
+    return fetch(url, { signal })
+      .then(async response => {
+        if (!response.ok) {
+          const text = await response.text();
+          throw new Error(`HTTP ${response.status}: ${response.statusText} - ${text}`);
+        }
+
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!contentType.includes('octet-stream')) {
+          const text = await response.text();
+          console.error('[FetchController] Expected binary data but got:', contentType, text.substring(0, 200));
+          throw new Error(`Expected binary data but got ${contentType}: ${text.substring(0, 100)}`);
+        }
+
+        const buffer = await response.arrayBuffer();
+
+        console.debug(`[FetchController] Received ${buffer.byteLength} bytes, headers:`, {
+          totalPoints: response.headers.get('X-Total-Points'),
+          returnedPoints: response.headers.get('X-Returned-Points'),
+          numColumns: response.headers.get('X-Num-Columns'),
+          channelNames: response.headers.get('X-Channel-Names')
+        });
+
+        return { buffer, headers: response.headers };
+      })
+      .then(async ({ buffer, headers }) =>
+        this.binaryParser.parseViewportResponse(await this.binaryParser.decodeBody(buffer, headers), headers)
+      );
+  }
+
   /**
    * Cancel any pending request
    */
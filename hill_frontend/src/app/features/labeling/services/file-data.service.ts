@@ -0,0 +1,42 @@
+import { Injectable, inject } from '@angular/core';
+import { Observable, from, of, switchMap } from 'rxjs';
+import { FilesRepository } from '../../../core/repositories';
+import {
+  BinaryParserService,
+  InitialData,
+  VIEWPORT_ENCODING,
+  VIEWPORT_COMPRESSION
+} from './binary-parser.service';
+
+/**
+ * File Data Service
+ * Loads a file document and its first-paint chart data in one request
+ *
+ * Files with a binary overview arrive as one binary body (decoded like a
+ * viewport response); older files arrive as a single JSON document.
+ */
+@Injectable({
+  providedIn: 'root'
+})
+export class FileDataService {
+
+  private readonly filesRepo = inject(FilesRepository);
+  private readonly binaryParser = inject(BinaryParserService);
+
+  /**
+   * Load a file document and its initial chart data
+   */
+  loadFile(fileId: string): Observable<InitialData> {
+    return this.filesRepo.getInitialData(fileId, VIEWPORT_ENCODING, VIEWPORT_COMPRESSION).pipe(
+      switchMap(response => {
+        const buffer = response.body ?? new ArrayBuffer(0);
+        const contentType = response.headers.get('Content-Type') || '';
+        if (contentType.includes('application/json')) {
+          const parsed: InitialData = JSON.parse(new TextDecoder().decode(buffer));
+          return of(parsed);
+        }
+        return from(this.binaryParser.parseInitialData(buffer, response.headers));
+      })
+    );
+  }
+}
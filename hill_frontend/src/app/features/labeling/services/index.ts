@@ -11,4 +11,5 @@ export * from './labeling-actions.service';
 // Viewport data services for large dataset optimization
 export * from './binary-parser.service';
 export * from './fetch-controller.service';
+export * from './file-data.service';
 
@@ -5,13 +5,14 @@ import { HttpClient } from '@angular/common/http';
 import { DomSanitizer, SafeResourceUrl } from '@angular/platform-browser';
 
 // Core imports
-import { LabelsRepository, FilesRepository, UsersRepository } from '../../../core/repositories';
+import { LabelsRepository, UsersRepository } from '../../../core/repositories';
 import { UserStateService } from '../../../core/services';
-import { FileModel, FolderModel, LabelModel, UserModel, DataModel } from '../../../core/models';
+import { FileModel, FolderModel, LabelModel, UserModel, DataModel, LabeledEvent, Guideline, LabelItemResult } from '../../../core/models';
 import { environment } from '../../../../environments/environment';
 
 // Feature services
 import { LabelStateService } from './label-state.service';
+import { FileDataService } from './file-data.service';
 
 // PrimeNG
 import { MessageService } from 'primeng/api';
@@ -20,6 +21,7 @@ import { MessageService } from 'primeng/api';
  * Labeling Actions Service
  * Handles all business logic for labeling operations:
  * - Save labels (manual and auto-save)
+ * - Save single events and guidelines (only the change is sent)
  * - Import/Export labels
  * - Download data
  * - Share folders
@@ -28,7 +30,7 @@ import { MessageService } from 'primeng/api';
 @Injectable()
 export class LabelingActionsService {
   private readonly labelsRepo = inject(LabelsRepository);
-  private readonly filesRepo = inject(FilesRepository);
+  private readonly fileData = inject(FileDataService);
   private readonly usersRepo = inject(UsersRepository);
   private readonly http = inject(HttpClient);
   private readonly sanitizer = inject(DomSanitizer);
@@ -96,6 +98,92 @@ export class LabelingActionsService {
     this.autoSaveQueue$.next({ label, labelId });
   }
 
+  /**
+   * Save a new event; the event receives its backend ID
+   */
+  addEvent(label: LabelModel, event: LabeledEvent): void {
+    this.saveItem(label, labelId => this.labelsRepo.addEvent(labelId, event), result => event.id = result.id);
+  }
+
+  /**
+   * Save changed fields of an event
+   */
+  updateEvent(label: LabelModel, event: LabeledEvent, changes: Partial<LabeledEvent>): void {
+    if (!event.id) {
+      // Not saved yet (or saved before events had IDs): save the whole label
+      this.queueAutoSave(label);
+      return;
+    }
+    this.saveItem(label, labelId => this.labelsRepo.updateEvent(labelId, event.id!, changes));
+  }
+
+  /**
+   * Delete an event that was removed from the label
+   */
+  removeEvent(label: LabelModel, event: LabeledEvent): void {
+    if (!event.id) {
+      this.queueAutoSave(label);
+      return;
+    }
+    this.saveItem(label, labelId => this.labelsRepo.deleteEvent(labelId, event.id!));
+  }
+
+  /**
+   * Save a new guideline; the guideline receives its backend ID
+   */
+  addGuideline(label: LabelModel, guideline: Guideline): void {
+    this.saveItem(label, labelId => this.labelsRepo.addGuideline(labelId, guideline), result => guideline.id = result.id);
+  }
+
+  /**
+   * Save changed fields of a guideline
+   */
+  updateGuideline(label: LabelModel, guideline: Guideline, changes: Partial<Guideline>): void {
+    if (!guideline.id) {
+      this.queueAutoSave(label);
+      return;
+    }
+    this.saveItem(label, labelId => this.labelsRepo.updateGuideline(labelId, guideline.id!, changes));
+  }
+
+  /**
+   * Delete a guideline that was removed from the label
+   */
+  removeGuideline(label: LabelModel, guideline: Guideline): void {
+    if (!guideline.id) {
+      this.queueAutoSave(label);
+      return;
+    }
+    this.saveItem(label, labelId => this.labelsRepo.deleteGuideline(labelId, guideline.id!));
+  }
+
+  /**
+   * Send a single-item change (silent); on failure, warn and reload the label from the backend
+   */
+  private saveItem(
+    label: LabelModel,
+    request: (labelId: string) => Observable<LabelItemResult>,
+    onSaved?: (result: LabelItemResult) => void
+  ): void {
+    const labelId = label._id?.$oid;
+    if (!labelId) {
+      console.warn('Cannot save: label ID is missing');
+      return;
+    }
+    request(labelId).subscribe({
+      next: (result) => onSaved?.(result),
+      error: (error) => {
+        console.error('Save failed:', error);
+        this.messageService.add({
+          severity: 'warn',
+          summary: 'Auto-save Failed',
+          detail: 'Failed to save changes'
+        });
+        this.labelsRepo.getLabel(labelId).subscribe((freshLabel: LabelModel) => this.labelState.updateLabel(freshLabel));
+      }
+    });
+  }
+
   /**
    * Import labels from a JSON file
    */
@@ -185,7 +273,7 @@ export class LabelingActionsService {
       throw new Error('No file selected');
     }
     
-    return this.filesRepo.getFile(fileId).pipe(
+    return this.fileData.loadFile(fileId).pipe(
       tap({
         next: (result: { fileInfo: FileModel; data: DataModel[] }) => {
           const json = JSON.stringify(result.data);
@@ -0,0 +1,4 @@
+"""
+Worker Benchmarks
+Micro-benchmarks for hot paths in the workers
+"""
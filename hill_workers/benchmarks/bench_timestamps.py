@@ -0,0 +1,79 @@
+"""
+Timestamp Parsing Benchmark
+Compares the per-row strptime loop with the bulk TimestampEngine
+
+Usage:
+    python -m benchmarks.bench_timestamps [--rows N] [--repeat N]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.timestamps import TimestampEngine
+
+FORMATS = [
+    ('%Y-%m-%d %H:%M:%S.%f', '10ms'),
+    ('%Y-%m-%d %H:%M:%S', '1s'),
+    ('%d/%m/%Y %H:%M:%S', '1s'),
+]
+
+
+def make_time_strings(n_rows: int, fmt: str, freq: str) -> list[str]:
+    """Generate a regular series of time strings in the given format."""
+    index = pd.date_range('2024-03-01 00:00:00', periods=n_rows, freq=freq)
+    return index.strftime(fmt).tolist()
+
+
+def legacy_loop(time_strings: list[str], fmt: str) -> np.ndarray:
+    """The previous implementation: one strptime call per row."""
+    timestamps = np.zeros(len(time_strings), dtype=np.float64)
+    for i, ts in enumerate(time_strings):
+        timestamps[i] = datetime.strptime(ts.strip(), fmt).timestamp()
+    return timestamps
+
+
+def best_of(func, repeat: int) -> tuple[float, np.ndarray]:
+    """Run func `repeat` times and return the fastest wall time and the last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500_000, help='Rows per format')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per implementation (best is reported)')
+    args = parser.parse_args()
+
+    print(f"{'format':<24} {'rows':>10} {'loop (s)':>10} {'engine (s)':>11} {'speedup':>8}  match")
+    for fmt, freq in FORMATS:
+        strings = make_time_strings(args.rows, fmt, freq)
+        loop_time, expected = best_of(lambda: legacy_loop(strings, fmt), args.repeat)
+        engine = TimestampEngine(fmt)
+        engine_time, actual = best_of(lambda: engine.parse(strings), args.repeat)
+        match = np.allclose(actual, expected, rtol=0, atol=1e-6) and engine.unparseable == 0
+        print(f"{fmt:<24} {args.rows:>10} {loop_time:>10.3f} {engine_time:>11.3f} "
+              f"{loop_time / engine_time:>7.1f}x  {match}")
+
+    # Mixed input: a few malformed rows take the per-row fallback
+    fmt = FORMATS[0][0]
+    strings = make_time_strings(args.rows, fmt, FORMATS[0][1])
+    for i in range(0, args.rows, max(1, args.rows // 10)):
+        strings[i] = 'n/a'
+    engine = TimestampEngine(fmt)
+    engine_time, _ = best_of(lambda: engine.parse(strings), args.repeat)
+    print(f"\nWith malformed rows: {engine.unparseable} unparseable of {args.rows}, engine {engine_time:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
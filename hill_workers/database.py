@@ -5,6 +5,7 @@ Handles MongoDB connection and provides database access
 import pymongo
 
 from config import settings
+from indexes import audit_queries, ensure_indexes
 
 # Global database connection
 _db = None
@@ -18,6 +19,19 @@ def init_database():
     return _db
 
 
+def create_indexes():
+    """
+    Create the registered indexes (see indexes.py).
+
+    With MONGO_AUDIT_QUERIES set, the hot lookups are then explained and
+    any that still scan a whole collection are logged as warnings.
+    """
+    db = get_db()
+    ensure_indexes(db)
+    if settings.MONGO_AUDIT_QUERIES:
+        audit_queries(db)
+
+
 def get_db():
     """Get database instance"""
     global _db
@@ -0,0 +1,22 @@
+"""
+Worker Services
+Storage helpers shared by the worker implementations
+"""
+
+from .parsed_table import ParsedTable, ParsedChannel
+from .binary_store import BinaryStoreWriter, map_binary_columns, write_overview_binary
+from .json_export import write_json_from_table, write_json_from_binary
+from .overview import OverviewBuilder
+from .lod_pyramid import LodPyramidBuilder
+
+__all__ = [
+    'ParsedTable',
+    'ParsedChannel',
+    'BinaryStoreWriter',
+    'map_binary_columns',
+    'write_overview_binary',
+    'write_json_from_table',
+    'write_json_from_binary',
+    'OverviewBuilder',
+    'LodPyramidBuilder',
+]
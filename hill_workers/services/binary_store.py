@@ -0,0 +1,262 @@
+"""
+Binary Store Writer
+Writes parsed time series to the memory-mappable binary format read by the backend
+"""
+import logging
+import os
+import shutil
+from typing import Optional
+import numpy as np
+import simplejson as json
+
+from .lod_pyramid import LodPyramidBuilder
+
+logger = logging.getLogger(__name__)
+
+# Version 2: row-major (n_points, n_cols); version 3: column-major (n_cols, n_points)
+BINARY_FORMAT_VERSION = 3
+
+
+class BinaryStoreWriter:
+    """
+    Append-only writer for the column-major float64 binary store.
+
+    The `.bin` file holds every column contiguously: [x][ch1][ch2]..., each of
+    length n_points, so a reader can map one channel without touching the
+    others. Since the length is only known at the end, appended blocks go to
+    one temporary file per column and are concatenated by `finish()`; memory
+    use depends on the block size and not on the file length. A table that
+    is already in memory is written by `write()` instead, straight into the
+    binary file. The x-axis range is tracked incrementally and written to
+    `_meta.json`, together with the LOD pyramid built from the same blocks.
+    
+    Finished files replace existing ones atomically (new inode), so a reader
+    that still maps the previous store keeps seeing consistent data. The
+    metadata is replaced before the binary file, and readers reject a binary
+    file whose size does not match it, so a reader opened in between never
+    pairs the new metadata with the old data.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        x_name: str,
+        x_unit: str,
+        channels: list[dict],
+        build_lod: bool = True
+    ):
+        """
+        Prepare the writer (column files are opened by the first `append()`).
+
+        Args:
+            output_path: Base path for output files (without extension)
+            x_name: X-axis name
+            x_unit: X-axis unit
+            channels: Channel descriptors with 'name', 'unit' and 'color'
+            build_lod: Also write the min/max LOD pyramid (`_lod.bin`)
+        """
+        self.binary_path = f"{output_path}.bin"
+        self.meta_path = f"{output_path}_meta.json"
+        self.x_name = x_name
+        self.x_unit = x_unit
+        self.channels = channels
+        self.n_cols = 1 + len(channels)
+        self.n_points = 0
+        self.x_min: Optional[float] = None
+        self.x_max: Optional[float] = None
+        self._column_paths = [f"{self.binary_path}.col{i}.tmp" for i in range(self.n_cols)]
+        self._column_files = []
+        self._lod = LodPyramidBuilder(output_path, self.n_cols) if build_lod else None
+
+    def append(self, x: np.ndarray, channel_arrays: list[np.ndarray]):
+        """
+        Append a block of rows.
+
+        Args:
+            x: X-axis values, shape (N,)
+            channel_arrays: One array per channel, each shape (N,)
+        """
+        if len(x) == 0:
+            return
+
+        if not self._column_files:
+            self._column_files = [open(path, 'wb') for path in self._column_paths]
+        for fh, column in zip(self._column_files, [x] + list(channel_arrays)):
+            np.ascontiguousarray(column, dtype=np.float64).tofile(fh)
+        self._track(x, channel_arrays)
+
+    def finish(self, x_type: str, x_format: Optional[str] = None) -> dict:
+        """
+        Write the binary file from the column files and write its metadata.
+
+        Args:
+            x_type: 'timestamp' or 'numeric'
+            x_format: strftime format for timestamp display
+
+        Returns:
+            Metadata dict with file information
+        """
+        self._close_column_files()
+        with open(f"{self.binary_path}.tmp", 'wb') as out:
+            if self.n_points:
+                for path in self._column_paths:
+                    with open(path, 'rb') as f:
+                        shutil.copyfileobj(f, out)
+        self._remove_column_files()
+        return self._publish(x_type, x_format)
+
+    def write(
+        self,
+        x: np.ndarray,
+        channel_arrays: list[np.ndarray],
+        x_type: str,
+        x_format: Optional[str] = None
+    ) -> dict:
+        """
+        Write a whole table and its metadata, without temporary column files.
+
+        Args:
+            x: X-axis values, shape (N,)
+            channel_arrays: One array per channel, each shape (N,)
+            x_type: 'timestamp' or 'numeric'
+            x_format: strftime format for timestamp display
+
+        Returns:
+            Metadata dict with file information
+        """
+        with open(f"{self.binary_path}.tmp", 'wb') as out:
+            for column in [x] + list(channel_arrays):
+                np.ascontiguousarray(column, dtype=np.float64).tofile(out)
+        if len(x):
+            self._track(x, channel_arrays)
+        return self._publish(x_type, x_format)
+
+    def _track(self, x: np.ndarray, channel_arrays: list[np.ndarray]):
+        """Feed a written block to the LOD pyramid, the point count and the x-axis range."""
+        n = len(x)
+        if self._lod is not None:
+            block = np.empty((n, self.n_cols), dtype=np.float64)
+            block[:, 0] = x
+            for i, ch in enumerate(channel_arrays):
+                block[:, i + 1] = ch
+            self._lod.append(block)
+
+        self.n_points += n
+        if not np.isnan(x).all():
+            block_min = float(np.nanmin(x))
+            block_max = float(np.nanmax(x))
+            self.x_min = block_min if self.x_min is None else min(self.x_min, block_min)
+            self.x_max = block_max if self.x_max is None else max(self.x_max, block_max)
+
+    def _publish(self, x_type: str, x_format: Optional[str]) -> dict:
+        """Write the metadata, then put it and the written binary file in place (metadata first)."""
+        meta = {
+            "format": "binary",
+            "version": BINARY_FORMAT_VERSION,
+            "layout": "column-major",
+            "shape": [self.n_points, self.n_cols],
+            "dtype": "float64",
+            "totalPoints": self.n_points,
+            "xColumn": {
+                "name": self.x_name,
+                "unit": self.x_unit,
+                "type": x_type,  # 'timestamp' or 'numeric'
+                "column": 0,
+                "min": self.x_min if self.x_min is not None else 0.0,
+                "max": self.x_max if self.x_max is not None else 0.0,
+            },
+            "channels": [
+                {
+                    "name": ch['name'],
+                    "unit": ch.get('unit', ''),
+                    "color": ch.get('color', '#000000'),
+                    "column": i + 1
+                }
+                for i, ch in enumerate(self.channels)
+            ]
+        }
+
+        if self._lod is not None:
+            lod_meta = self._lod.finish()
+            if lod_meta:
+                meta["lod"] = lod_meta
+
+        # Add format string for timestamp display
+        if x_type == 'timestamp' and x_format:
+            meta["xColumn"]["format"] = x_format
+            meta["xColumn"]["timezone"] = "local"  # Default to local, can be configured
+
+        with open(f"{self.meta_path}.tmp", 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(f"{self.meta_path}.tmp", self.meta_path)
+        logger.info(f"Saved metadata file: {self.meta_path}")
+
+        os.replace(f"{self.binary_path}.tmp", self.binary_path)
+        logger.info(f"Saved binary file: {self.binary_path}, columns: {self.n_cols}, points: {self.n_points}")
+        return meta
+
+    def abort(self):
+        """Close and remove partially written files."""
+        self._close_column_files()
+        self._remove_column_files()
+        if self._lod is not None:
+            self._lod.abort()
+        for path in (f"{self.binary_path}.tmp", f"{self.meta_path}.tmp"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _close_column_files(self):
+        for fh in self._column_files:
+            if not fh.closed:
+                fh.close()
+
+    def _remove_column_files(self):
+        for path in self._column_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def write_overview_binary(overview_path: str, x: np.ndarray, channel_arrays: list[np.ndarray]):
+    """
+    Write an overview as float64 columns ([x][ch1][ch2]..., each contiguous).
+
+    This is the plain float64 layout of the backend's viewport responses, so
+    the overview is served for the first paint without decoding.
+
+    Args:
+        overview_path: Output path
+        x: X-axis values, shape (N,)
+        channel_arrays: One array per channel, each shape (N,)
+    """
+    with open(f"{overview_path}.tmp", 'wb') as f:
+        for column in [x] + list(channel_arrays):
+            np.ascontiguousarray(column, dtype=np.float64).tofile(f)
+    os.replace(f"{overview_path}.tmp", overview_path)
+    logger.info(f"Saved overview to {overview_path}: {len(x)} points")
+
+
+def map_binary_columns(binary_path: str, meta: dict) -> np.ndarray:
+    """
+    Memory-map a binary store as a (n_cols, n_points) array of columns.
+
+    Works for both layouts: version 3 files map directly, version 2
+    (row-major) files are exposed through a transposed, strided view.
+
+    Args:
+        binary_path: Path to the .bin file
+        meta: Metadata dict of the binary store
+
+    Returns:
+        Read-only array where [i] is column i
+    """
+    n_points, n_cols = meta['shape']
+    if n_points == 0:
+        return np.zeros((n_cols, 0), dtype=np.float64)
+    dtype = np.dtype(meta.get('dtype', 'float64'))
+    if meta.get('version', 1) >= 3:
+        return np.memmap(binary_path, dtype=dtype, mode='r', shape=(n_cols, n_points))
+    return np.memmap(binary_path, dtype=dtype, mode='r', shape=(n_points, n_cols)).T
@@ -0,0 +1,97 @@
+"""
+JSON Export
+Writes parsed data in the legacy list-of-channels JSON format
+"""
+import logging
+import numpy as np
+import simplejson as json
+
+from .binary_store import map_binary_columns
+from .parsed_table import ParsedTable
+from .timestamps import format_timestamps
+
+logger = logging.getLogger(__name__)
+
+# Rows converted per block when writing a column
+JSON_EXPORT_BLOCK_ROWS = 100_000
+
+
+def _write_traces(json_path: str, traces: list[tuple[dict, np.ndarray]], x_format: str | None):
+    """
+    Write traces to JSON, converting each column in fixed-size blocks.
+
+    Args:
+        json_path: Output JSON path
+        traces: (trace header without 'data', column array) pairs; the x trace first
+        x_format: strftime format to render timestamp x values as strings, or None
+    """
+    with open(json_path, 'w') as f:
+        f.write('[')
+        for trace_idx, (header, column) in enumerate(traces):
+            if trace_idx:
+                f.write(', ')
+            # Open the trace object and leave its data list open for streaming
+            f.write(json.dumps(header)[:-1] + ', "data": [')
+            for start in range(0, len(column), JSON_EXPORT_BLOCK_ROWS):
+                block = np.array(column[start:start + JSON_EXPORT_BLOCK_ROWS])
+                if header['x'] and x_format:
+                    values = format_timestamps(block, x_format)
+                else:
+                    values = block.tolist()
+                if start:
+                    f.write(', ')
+                f.write(json.dumps(values, ignore_nan=True)[1:-1])
+            f.write(']}')
+        f.write(']')
+
+
+def write_json_from_table(table: ParsedTable, json_path: str):
+    """
+    Write a parsed table to JSON.
+
+    Timestamp x values are written as formatted time strings, as in the
+    original parser output.
+
+    Args:
+        table: Parsed table
+        json_path: Output JSON path
+    """
+    traces = [({'x': True, 'name': table.x_name, 'unit': table.x_unit}, table.x)]
+    for ch in table.channels:
+        traces.append(({'x': False, 'name': ch.name, 'unit': ch.unit, 'color': ch.color}, ch.data))
+
+    x_format = table.x_format if table.x_type == 'timestamp' else None
+    _write_traces(json_path, traces, x_format)
+    logger.info(f"Saved JSON to {json_path}")
+
+
+def write_json_from_binary(binary_path: str, meta: dict, json_path: str):
+    """
+    Export a binary store to JSON.
+
+    Columns are read from the memory-mapped file in fixed-size blocks and
+    written as they are converted, so the full dataset is never held as
+    Python objects.
+
+    Args:
+        binary_path: Path to the .bin file
+        meta: Metadata dict of the binary store
+        json_path: Output JSON path
+    """
+    x_info = meta['xColumn']
+    x_format = x_info.get('format') if x_info.get('type') == 'timestamp' else None
+
+    columns = map_binary_columns(binary_path, meta)
+
+    traces = [({'x': True, 'name': x_info['name'], 'unit': x_info.get('unit', '')}, columns[0])]
+    for ch in meta['channels']:
+        traces.append(({
+            'x': False,
+            'name': ch['name'],
+            'unit': ch.get('unit', ''),
+            'color': ch.get('color', '#000000'),
+        }, columns[ch['column']]))
+
+    _write_traces(json_path, traces, x_format)
+    del traces, columns
+    logger.info(f"Exported binary store to JSON: {json_path}")
@@ -0,0 +1,258 @@
+"""
+LOD Pyramid Builder
+Builds min/max/first/last summaries of the binary store at power-of-two decimation levels
+"""
+import logging
+import os
+import shutil
+from typing import Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows per bucket at the finest level
+LOD_BASE_BUCKET = 32
+# Levels with fewer buckets than this are not kept (the raw data is small enough there)
+LOD_MIN_BUCKETS = 64
+# Rows written per bucket: first, min, max, last
+LOD_ROWS_PER_BUCKET = 4
+
+
+class _Buckets:
+    """Per-bucket summaries of consecutive rows, one entry per bucket"""
+
+    def __init__(self, x_first, x_mid, x_last, first, minimum, maximum, last):
+        self.x_first = x_first
+        self.x_mid = x_mid
+        self.x_last = x_last
+        self.first = first
+        self.minimum = minimum
+        self.maximum = maximum
+        self.last = last
+
+    def __len__(self) -> int:
+        return len(self.x_first)
+
+    @classmethod
+    def from_rows(cls, rows: np.ndarray, bucket_size: int) -> '_Buckets':
+        """Summarize rows (shape (m * bucket_size, n_cols), or fewer rows for one partial bucket)."""
+        n_buckets = -(-len(rows) // bucket_size)
+        size = len(rows) // n_buckets
+        blocks = rows.reshape(n_buckets, size, rows.shape[1])
+        return cls(
+            x_first=blocks[:, 0, 0],
+            x_mid=blocks[:, size // 2, 0],
+            x_last=blocks[:, -1, 0],
+            first=blocks[:, 0, 1:],
+            # fmin/fmax skip NaN and give NaN only for all-NaN buckets, without warnings
+            minimum=np.fmin.reduce(blocks[:, :, 1:], axis=1),
+            maximum=np.fmax.reduce(blocks[:, :, 1:], axis=1),
+            last=blocks[:, -1, 1:],
+        )
+
+    def slice(self, start: int, stop: Optional[int] = None) -> '_Buckets':
+        """Buckets [start:stop]."""
+        s = np.s_[start:stop]
+        return _Buckets(self.x_first[s], self.x_mid[s], self.x_last[s],
+                        self.first[s], self.minimum[s], self.maximum[s], self.last[s])
+
+    def merge_pairs(self) -> '_Buckets':
+        """Merge buckets (0, 1), (2, 3), ... into buckets twice as large; length must be even."""
+        even = np.s_[0::2]
+        odd = np.s_[1::2]
+        return _Buckets(
+            x_first=self.x_first[even],
+            x_mid=self.x_first[odd],
+            x_last=self.x_last[odd],
+            first=self.first[even],
+            minimum=np.fmin(self.minimum[even], self.minimum[odd]),
+            maximum=np.fmax(self.maximum[even], self.maximum[odd]),
+            last=self.last[odd],
+        )
+
+    @staticmethod
+    def concat(parts: list['_Buckets']) -> '_Buckets':
+        """Concatenate bucket lists."""
+        return _Buckets(*(
+            np.concatenate([getattr(p, name) for p in parts])
+            for name in ('x_first', 'x_mid', 'x_last', 'first', 'minimum', 'maximum', 'last')
+        ))
+
+    def to_rows(self) -> np.ndarray:
+        """
+        Lay buckets out as rows of the binary store format.
+
+        Each bucket becomes [x_first, first...], [x_mid, min...], [x_mid, max...],
+        [x_last, last...], so x stays sorted and the rows can be read like raw data.
+        """
+        n_buckets = len(self)
+        n_cols = 1 + self.first.shape[1]
+        rows = np.empty((n_buckets, LOD_ROWS_PER_BUCKET, n_cols), dtype=np.float64)
+        rows[:, 0, 0] = self.x_first
+        rows[:, 0, 1:] = self.first
+        rows[:, 1, 0] = self.x_mid
+        rows[:, 1, 1:] = self.minimum
+        rows[:, 2, 0] = self.x_mid
+        rows[:, 2, 1:] = self.maximum
+        rows[:, 3, 0] = self.x_last
+        rows[:, 3, 1:] = self.last
+        return rows.reshape(n_buckets * LOD_ROWS_PER_BUCKET, n_cols)
+
+
+class _Level:
+    """One pyramid level, written to its own temporary file as buckets complete"""
+
+    def __init__(self, bucket_size: int, temp_path: str):
+        self.bucket_size = bucket_size
+        self.temp_path = temp_path
+        self.n_buckets = 0
+        self._fh = open(temp_path, 'wb')
+
+    def write(self, buckets: _Buckets):
+        if len(buckets):
+            buckets.to_rows().tofile(self._fh)
+            self.n_buckets += len(buckets)
+
+    def close(self):
+        if not self._fh.closed:
+            self._fh.close()
+
+
+class LodPyramidBuilder:
+    """
+    Build a level-of-detail pyramid from blocks of binary store rows.
+
+    Level k summarizes buckets of LOD_BASE_BUCKET * 2**k rows with the first,
+    minimum, maximum and last value of every channel. The finest level is
+    computed from raw rows and each coarser level from pairs of buckets of the
+    level below, so memory holds at most one partial bucket per level. Levels
+    are concatenated into `{output_path}_lod.bin` by `finish()`; the last bucket
+    of each level may cover fewer rows.
+    """
+
+    def __init__(self, output_path: str, n_cols: int):
+        """
+        Initialize the builder.
+
+        Args:
+            output_path: Base path for output files (without extension)
+            n_cols: Number of columns (x plus channels)
+        """
+        self.lod_path = f"{output_path}_lod.bin"
+        self.n_cols = n_cols
+        self._output_path = output_path
+        self._levels: list[_Level] = []
+        self._raw_carry = np.empty((0, n_cols), dtype=np.float64)
+        # Unpaired bucket of each level, waiting for its neighbour
+        self._bucket_carry: list[Optional[_Buckets]] = []
+
+    def append(self, rows: np.ndarray):
+        """
+        Add rows in store order.
+
+        Args:
+            rows: Block of shape (N, n_cols)
+        """
+        if len(rows) == 0:
+            return
+        if len(self._raw_carry):
+            rows = np.concatenate([self._raw_carry, rows])
+
+        n_complete = len(rows) // LOD_BASE_BUCKET * LOD_BASE_BUCKET
+        self._raw_carry = np.array(rows[n_complete:])
+        if n_complete:
+            self._add_buckets(0, _Buckets.from_rows(rows[:n_complete], LOD_BASE_BUCKET), create=True)
+
+    def finish(self) -> Optional[dict]:
+        """
+        Flush partial buckets and write the pyramid file.
+
+        Returns:
+            Pyramid metadata for `_meta.json`, or None if no level is large enough
+        """
+        if len(self._raw_carry):
+            self._add_buckets(0, _Buckets.from_rows(self._raw_carry, LOD_BASE_BUCKET), create=False)
+            self._raw_carry = self._raw_carry[:0]
+
+        # The unpaired last bucket of each level is also the (partial) last bucket of the next
+        for k in range(len(self._levels) - 1):
+            carry = self._bucket_carry[k]
+            if carry is not None:
+                self._bucket_carry[k] = None
+                self._add_buckets(k + 1, carry, create=False)
+
+        for level in self._levels:
+            level.close()
+
+        kept = [level for level in self._levels if level.n_buckets >= LOD_MIN_BUCKETS]
+        if not kept:
+            self._remove_temp_files()
+            return None
+
+        row_bytes = self.n_cols * np.dtype(np.float64).itemsize
+        levels_meta = []
+        offset = 0
+        with open(f"{self.lod_path}.tmp", 'wb') as out:
+            for level in kept:
+                with open(level.temp_path, 'rb') as f:
+                    shutil.copyfileobj(f, out)
+                n_rows = level.n_buckets * LOD_ROWS_PER_BUCKET
+                levels_meta.append({
+                    "bucketSize": level.bucket_size,
+                    "rows": n_rows,
+                    "offset": offset,
+                })
+                offset += n_rows * row_bytes
+        self._remove_temp_files()
+        os.replace(f"{self.lod_path}.tmp", self.lod_path)
+
+        logger.info(f"Saved LOD pyramid: {self.lod_path}, "
+                    f"{len(levels_meta)} levels ({levels_meta[0]['bucketSize']}..{levels_meta[-1]['bucketSize']} rows/bucket)")
+        return {
+            "path": os.path.basename(self.lod_path),
+            "rowsPerBucket": LOD_ROWS_PER_BUCKET,
+            "levels": levels_meta,
+        }
+
+    def abort(self):
+        """Remove temporary and partially written files."""
+        for level in self._levels:
+            level.close()
+        self._remove_temp_files()
+        try:
+            os.remove(f"{self.lod_path}.tmp")
+        except OSError:
+            pass
+
+    def _add_buckets(self, k: int, buckets: _Buckets, create: bool):
+        """
+        Write buckets of level k and pass merged pairs on to level k + 1.
+
+        Args:
+            k: Level index
+            buckets: Consecutive buckets of level k
+            create: Whether a missing level may be created
+        """
+        if k >= len(self._levels):
+            if not create:
+                return
+            bucket_size = LOD_BASE_BUCKET * 2 ** k
+            self._levels.append(_Level(bucket_size, f"{self._output_path}_lod{bucket_size}.tmp"))
+            self._bucket_carry.append(None)
+
+        self._levels[k].write(buckets)
+
+        carry = self._bucket_carry[k]
+        if carry is not None:
+            buckets = _Buckets.concat([carry, buckets])
+        n_even = len(buckets) // 2 * 2
+        self._bucket_carry[k] = buckets.slice(n_even) if n_even < len(buckets) else None
+        if n_even:
+            self._add_buckets(k + 1, buckets.slice(0, n_even).merge_pairs(), create)
+
+    def _remove_temp_files(self):
+        for level in self._levels:
+            try:
+                os.remove(level.temp_path)
+            except OSError:
+                pass
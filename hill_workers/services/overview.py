@@ -0,0 +1,111 @@
+"""
+Overview Builder
+Incrementally downsamples blocks of rows into the initial-display overview
+"""
+import logging
+import numpy as np
+from tsdownsample import NaNMinMaxLTTBDownsampler
+
+logger = logging.getLogger(__name__)
+
+
+class OverviewBuilder:
+    """
+    Build a MinMaxLTTB overview from blocks of rows.
+
+    Each block is reduced to at most `target_points_per_channel` points per
+    channel (union of indices across channels) as it arrives. Reduced rows are
+    buffered and compacted again whenever the buffer grows beyond
+    `compact_factor` times the union size, so memory stays bounded regardless
+    of how many blocks are added. A single block is reduced exactly once.
+    """
+
+    def __init__(self, target_points_per_channel: int = 5000, compact_factor: int = 4):
+        """
+        Initialize the builder.
+
+        Args:
+            target_points_per_channel: Target points per channel in the overview
+            compact_factor: Buffer size (in multiples of the target) that triggers compaction
+        """
+        self.target_points = target_points_per_channel
+        self.compact_factor = compact_factor
+        self.downsampler = NaNMinMaxLTTBDownsampler()
+        self.total_points = 0
+        self._x_blocks: list[np.ndarray] = []
+        self._channel_blocks: list[list[np.ndarray]] = []
+        self._buffered = 0
+
+    def add(self, x: np.ndarray, channel_arrays: list[np.ndarray]):
+        """
+        Add a block of rows.
+
+        Args:
+            x: X-axis values, shape (N,)
+            channel_arrays: One array per channel, each shape (N,)
+        """
+        n = len(x)
+        if n == 0:
+            return
+        self.total_points += n
+
+        x_out, channels_out = self._reduce(x, channel_arrays)
+        self._x_blocks.append(x_out)
+        self._channel_blocks.append(channels_out)
+        self._buffered += len(x_out)
+
+        # The union of per-channel indices can hold up to target * n_channels rows
+        if self._buffered > self.compact_factor * self.target_points * max(1, len(channel_arrays)):
+            self._compact()
+
+    def result(self) -> tuple[np.ndarray, list[np.ndarray]]:
+        """
+        Get the final overview.
+
+        Returns:
+            Tuple of (x values, list of channel arrays)
+        """
+        self._compact()
+        if not self._x_blocks:
+            return np.array([], dtype=np.float64), []
+        return self._x_blocks[0], self._channel_blocks[0]
+
+    def _compact(self):
+        """Merge buffered blocks and reduce them back to the target size."""
+        if len(self._x_blocks) <= 1:
+            return
+        x = np.concatenate(self._x_blocks)
+        channels = [
+            np.concatenate([block[i] for block in self._channel_blocks])
+            for i in range(len(self._channel_blocks[0]))
+        ]
+        x_out, channels_out = self._reduce(x, channels)
+        self._x_blocks = [x_out]
+        self._channel_blocks = [channels_out]
+        self._buffered = len(x_out)
+
+    def _reduce(self, x: np.ndarray, channel_arrays: list[np.ndarray]) -> tuple[np.ndarray, list[np.ndarray]]:
+        """Reduce a block to the union of MinMaxLTTB indices of every channel."""
+        n_points = len(x)
+        if n_points <= self.target_points:
+            return x, channel_arrays
+
+        x_contig = np.ascontiguousarray(x, dtype=np.float64)
+        all_indices = set()
+
+        for ch in channel_arrays:
+            try:
+                ch_contig = np.ascontiguousarray(ch, dtype=np.float64)
+                indices = self.downsampler.downsample(x_contig, ch_contig, n_out=self.target_points)
+                all_indices.update(indices.tolist())
+            except Exception as e:
+                logger.warning(f"MinMaxLTTB failed: {e}, using uniform sampling")
+                step = max(1, n_points // self.target_points)
+                all_indices.update(range(0, n_points, step))
+
+        if not channel_arrays:
+            step = max(1, n_points // self.target_points)
+            all_indices.update(range(0, n_points, step))
+
+        selected = np.array(sorted(all_indices), dtype=np.int64)
+        return x[selected], [ch[selected] for ch in channel_arrays]
@@ -0,0 +1,114 @@
+"""
+Parsed Table
+Columnar in-memory representation of a parsed file
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+
+
+@dataclass
+class ParsedChannel:
+    """One channel column with its display settings"""
+    name: str
+    unit: str
+    color: str
+    data: np.ndarray
+
+
+@dataclass
+class ParsedTable:
+    """
+    Parsed file as NumPy columns.
+
+    The x-axis is always float64: Unix timestamps for time axes (converted
+    once at parse time) or the original numeric values.
+    """
+    x: np.ndarray
+    x_name: str
+    x_unit: str = ''
+    x_type: str = 'numeric'  # 'timestamp' or 'numeric'
+    x_format: Optional[str] = None  # strftime format for timestamp display
+    channels: list[ParsedChannel] = field(default_factory=list)
+
+    @property
+    def n_points(self) -> int:
+        """Number of rows."""
+        return len(self.x)
+
+    @property
+    def x_min(self) -> float:
+        """Smallest x value (0.0 if x has no valid values)."""
+        if self.n_points == 0 or np.isnan(self.x).all():
+            return 0.0
+        return float(np.nanmin(self.x))
+
+    @property
+    def x_max(self) -> float:
+        """Largest x value (0.0 if x has no valid values)."""
+        if self.n_points == 0 or np.isnan(self.x).all():
+            return 0.0
+        return float(np.nanmax(self.x))
+
+    @property
+    def channel_arrays(self) -> list[np.ndarray]:
+        """Channel data in column order."""
+        return [ch.data for ch in self.channels]
+
+    @property
+    def channel_descriptors(self) -> list[dict]:
+        """Channel name/unit/color dicts, as stored in binary metadata."""
+        return [{'name': ch.name, 'unit': ch.unit, 'color': ch.color} for ch in self.channels]
+
+    @property
+    def column_descriptors(self) -> list[dict]:
+        """X and channel headers of the JSON format (without data), in column order."""
+        return [{'x': True, 'name': self.x_name, 'unit': self.x_unit}] + [
+            {'x': False, **descriptor} for descriptor in self.channel_descriptors
+        ]
+
+    def with_columns(self, x: np.ndarray, channel_arrays: list[np.ndarray]) -> 'ParsedTable':
+        """
+        Create a table with the same axis and channel settings but new data.
+
+        Args:
+            x: New x values
+            channel_arrays: New channel data, one array per channel
+
+        Returns:
+            New ParsedTable
+        """
+        return ParsedTable(
+            x=x,
+            x_name=self.x_name,
+            x_unit=self.x_unit,
+            x_type=self.x_type,
+            x_format=self.x_format,
+            channels=[
+                ParsedChannel(name=ch.name, unit=ch.unit, color=ch.color, data=data)
+                for ch, data in zip(self.channels, channel_arrays)
+            ]
+        )
+
+    def to_json_dict(self) -> list[dict]:
+        """
+        Convert to the list-of-channels JSON format with numeric x values.
+
+        Returns:
+            List of {'x', 'name', 'unit', ['color'], 'data'} dicts
+        """
+        result = [{
+            'x': True,
+            'name': self.x_name,
+            'unit': self.x_unit,
+            'data': self.x.tolist()
+        }]
+        for ch in self.channels:
+            result.append({
+                'x': False,
+                'name': ch.name,
+                'unit': ch.unit,
+                'color': ch.color,
+                'data': ch.data.tolist()
+            })
+        return result
@@ -0,0 +1,177 @@
+"""
+Timestamp Helpers
+Vectorized conversions between datetimes, time strings and Unix timestamps
+"""
+from datetime import datetime
+from typing import Optional
+import numpy as np
+import pandas as pd
+from dateutil.tz import tzlocal
+
+_EPOCH = pd.Timestamp(0, tz='UTC')
+_HOUR_NS = 3600 * 10**9
+
+
+def datetimes_to_timestamps(dt: pd.Series) -> np.ndarray:
+    """
+    Convert a datetime Series to Unix timestamps.
+
+    Wall-clock values are interpreted in local time, matching
+    datetime.strptime(...).timestamp() used for string x-axes.
+
+    Localizing with the system timezone is slow per element, so the UTC
+    offset is looked up once per distinct date-hour prefix and broadcast to
+    every row in that hour. Hours containing a DST transition (offset differs
+    between the start and end of the hour, or is ambiguous/nonexistent) are
+    localized row by row.
+
+    Args:
+        dt: pandas Series of datetimes (naive or tz-aware)
+
+    Returns:
+        float64 array of seconds since epoch (NaN for NaT)
+    """
+    if dt.dt.tz is not None:
+        dt = dt.dt.tz_localize(None)
+    if len(dt) == 0:
+        return np.array([], dtype=np.float64)
+
+    missing = dt.isna().to_numpy()
+    wall_ns = np.where(missing, 0, dt.to_numpy(dtype='datetime64[ns]').view(np.int64))
+    codes, hours = pd.factorize(wall_ns // _HOUR_NS)
+    hour_start = hours * _HOUR_NS
+    start_offset = _utc_offsets(hour_start)
+    end_offset = _utc_offsets(hour_start + (_HOUR_NS - 1))
+    cacheable = ~np.isnan(start_offset) & (start_offset == end_offset)
+
+    timestamps = (wall_ns + np.where(cacheable, start_offset, 0).astype(np.int64)[codes]) / 1e9
+
+    exact = ~cacheable[codes] | missing
+    if exact.any():
+        timestamps[exact] = _localize_exact(dt[exact])
+    return timestamps
+
+
+def _utc_offsets(wall_ns: np.ndarray) -> np.ndarray:
+    """UTC minus local wall time in ns for each instant (NaN if ambiguous or nonexistent)."""
+    local = pd.Series(pd.to_datetime(wall_ns)).dt.tz_localize(tzlocal(), ambiguous='NaT', nonexistent='NaT')
+    utc_ns = (local - _EPOCH).to_numpy(dtype='timedelta64[ns]').view(np.int64)
+    return np.where(local.isna().to_numpy(), np.nan, (utc_ns - wall_ns).astype(np.float64))
+
+
+def _localize_exact(dt: pd.Series) -> np.ndarray:
+    """Per-element local time conversion for rows the offset cache cannot handle."""
+    local = dt.dt.tz_localize(tzlocal(), ambiguous='NaT', nonexistent='shift_forward')
+    return ((local - _EPOCH) / pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64)
+
+
+def format_timestamps(timestamps: np.ndarray, fmt: str) -> list:
+    """
+    Format Unix timestamps as local time strings.
+
+    Args:
+        timestamps: float64 array of seconds since epoch
+        fmt: strftime format string
+
+    Returns:
+        List of formatted strings (None for NaN)
+    """
+    micros = np.round(np.asarray(timestamps, dtype=np.float64) * 1e6)
+    dt = pd.Series(pd.to_datetime(micros, unit='us', utc=True))
+    strings = dt.dt.tz_convert(tzlocal()).dt.strftime(fmt)
+    return strings.where(dt.notna(), None).tolist()
+
+
+_ISO_DATE_FORMAT = '%Y-%m-%d'
+
+
+def _split_format(fmt: str) -> tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Split a strftime format into its date and time-of-day parts.
+
+    Args:
+        fmt: strftime format string
+
+    Returns:
+        Tuple of (date format, separator, time format), or Nones when the
+        format is not a date followed by a time
+    """
+    for sep in (' ', 'T'):
+        date_fmt, found, time_fmt = fmt.partition(sep)
+        if found and '%d' in date_fmt and '%H' not in date_fmt and '%H' in time_fmt:
+            return date_fmt, sep, time_fmt
+    return None, None, None
+
+
+class TimestampEngine:
+    """
+    Parse time strings with a known strftime format in bulk.
+
+    Rows are parsed with pandas' vectorized parser and converted to local
+    timestamps with the per-hour offset cache of datetimes_to_timestamps.
+    pandas only has a fast path for ISO dates, so for other date layouts
+    (e.g. '%d/%m/%Y %H:%M:%S') each distinct date prefix is parsed once and
+    rewritten as ISO before the bulk parse. Only rows rejected by the bulk parser are retried one by one with
+    datetime.strptime; rows that still fail become NaN and are counted in
+    `unparseable`.
+    """
+
+    # Use the date-prefix cache when rows outnumber distinct dates by this factor
+    DATE_CACHE_MIN_ROWS_PER_DATE = 2
+
+    def __init__(self, fmt: str):
+        """
+        Initialize the engine.
+
+        Args:
+            fmt: strftime format string
+        """
+        self.fmt = fmt
+        self.date_fmt, self.sep, self.time_fmt = _split_format(fmt)
+        self.unparseable = 0
+
+    def parse(self, time_strings) -> np.ndarray:
+        """
+        Convert time strings to Unix timestamps (local time, as datetime.timestamp()).
+
+        Args:
+            time_strings: Sequence of time strings
+
+        Returns:
+            float64 array of seconds since epoch (NaN for unparseable rows)
+        """
+        strings = pd.Series(time_strings, dtype=object).astype(str).str.strip()
+        dt = self._parse_bulk(strings)
+
+        failed = np.flatnonzero(dt.isna().to_numpy())
+        if len(failed):
+            # Per-row fallback only for rows the bulk parser rejected
+            for i in failed:
+                try:
+                    dt.iloc[i] = datetime.strptime(strings.iloc[i], self.fmt)
+                except ValueError:
+                    pass
+
+        timestamps = datetimes_to_timestamps(dt)
+        self.unparseable = int(np.isnan(timestamps).sum())
+        return timestamps
+
+    def _parse_bulk(self, strings: pd.Series) -> pd.Series:
+        """Vectorized parse; rows that do not match the format are NaT."""
+        if self.date_fmt is not None and self.date_fmt != _ISO_DATE_FORMAT and len(strings):
+            parts = np.char.partition(strings.to_numpy(dtype=str), self.sep)
+            codes, dates = pd.factorize(parts[:, 0])
+            if len(dates) * self.DATE_CACHE_MIN_ROWS_PER_DATE <= len(strings):
+                # Unparseable dates become '' so their rows fail and take the fallback
+                iso_dates = (
+                    pd.to_datetime(pd.Series(dates), format=self.date_fmt, errors='coerce')
+                    .dt.strftime(_ISO_DATE_FORMAT + self.sep)
+                    .fillna('')
+                    .to_numpy(dtype=str)
+                )
+                iso_strings = pd.Series(np.char.add(iso_dates[codes], parts[:, 2]), dtype=object, index=strings.index)
+                return pd.to_datetime(
+                    iso_strings, format=_ISO_DATE_FORMAT + self.sep + self.time_fmt, errors='coerce'
+                )
+
+        return pd.to_datetime(strings, format=self.fmt, errors='coerce')
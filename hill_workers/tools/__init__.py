@@ -0,0 +1,4 @@
+"""
+Worker Tools
+One-off maintenance commands for data produced by the workers
+"""
@@ -0,0 +1,74 @@
+"""
+Binary Store Backfill
+Parses files stored before every file got a binary store and binary overview
+(small files were only written as JSON) into the binary format
+
+Run: python -m tools.backfill_binary_store [--dry-run]
+
+Each file is parsed again from its raw upload with its template, exactly as a
+reparse would, and its document is only updated once all outputs are written.
+A file that fails to parse is logged and keeps its current outputs and status,
+so the command can be re-run safely. The backend can keep running. The IDs to
+convert are listed up front, so no cursor is held open (and timed out) while
+the files are parsed.
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from database import get_db, get_data_folder_path
+from workers.file_parser import FileParseJob
+
+logger = logging.getLogger(__name__)
+
+# Parsed files without a binary store or without a binary overview
+PENDING_FILTER = {
+    'parsing': 'parsed',
+    '$or': [
+        {'binaryPath': {'$exists': False}},
+        {'overviewBinaryPath': {'$exists': False}},
+    ],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Store every parsed file in the binary format')
+    parser.add_argument('--dry-run', action='store_true', help='Count files that would be parsed')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO),
+        format=settings.LOG_FORMAT,
+        datefmt=settings.LOG_DATE_FORMAT
+    )
+
+    db = get_db()
+    if args.dry_run:
+        count = db['files'].count_documents(PENDING_FILTER)
+        logger.info(f"Backfill dry run: {count} files would be parsed")
+        return
+
+    job = FileParseJob(db, get_data_folder_path())
+    converted = failed = 0
+    for file_id in db['files'].distinct('_id', PENDING_FILTER):
+        # Skipped if a reparse stored it in the meantime
+        file_doc = db['files'].find_one({'_id': file_id, **PENDING_FILTER})
+        if file_doc is None:
+            continue
+        try:
+            job.ingest(file_doc)
+            converted += 1
+        except Exception as e:
+            logger.error(f"Could not convert file {file_doc['_id']} ({file_doc.get('name')}): {e}")
+            failed += 1
+
+    logger.info(f"Backfill finished: {converted} files converted, {failed} failed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+File Reference Backfill
+Stores folderId, projectId and templateId on file documents uploaded before
+the backend started writing them
+
+Run: python -m tools.backfill_file_refs [--dry-run]
+
+Each folder updates the files in its `fileList` with one `update_many`, and
+only files whose references are missing or stale are written, so the command
+can be re-run safely. The backend also fills the references in lazily, so it
+can keep running during the backfill. Folders are listed by ID up front and
+read one at a time, so no cursor is held open during the updates.
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from database import get_db
+
+logger = logging.getLogger(__name__)
+
+
+def folder_refs(folder: dict) -> dict:
+    """
+    References the files of a folder keep to it
+
+    Args:
+        folder: Folder document
+
+    Returns:
+        Dict with folderId, projectId and templateId
+    """
+    return {
+        'folderId': str(folder['_id']),
+        'projectId': folder['project']['id'],
+        'templateId': folder['template']['id'],
+    }
+
+
+def stale_filter(file_ids: list[ObjectId], refs: dict) -> dict:
+    """
+    Filter matching the files of a folder whose references differ from `refs`
+
+    Args:
+        file_ids: IDs of the folder's files
+        refs: Expected references
+
+    Returns:
+        MongoDB filter
+    """
+    return {
+        '_id': {'$in': file_ids},
+        '$or': [{field: {'$ne': value}} for field, value in refs.items()],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Store folder, project and template IDs on file documents')
+    parser.add_argument('--dry-run', action='store_true', help='Count files that would be updated')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO),
+        format=settings.LOG_FORMAT,
+        datefmt=settings.LOG_DATE_FORMAT
+    )
+
+    db = get_db()
+    nb_folders = updated = 0
+    for folder_id in db['folders'].distinct('_id'):
+        folder = db['folders'].find_one({'_id': folder_id}, {'project': 1, 'template': 1, 'fileList': 1})
+        if folder is None:
+            continue
+        nb_folders += 1
+        file_ids = []
+        for file_id in folder.get('fileList', []):
+            try:
+                file_ids.append(ObjectId(file_id))
+            except (InvalidId, TypeError):
+                logger.warning(f"Skipping invalid file ID {file_id!r} in folder {folder['_id']}")
+        if not file_ids:
+            continue
+
+        refs = folder_refs(folder)
+        if args.dry_run:
+            count = db['files'].count_documents(stale_filter(file_ids, refs))
+            if count:
+                logger.info(f"Would update {count} files of folder {folder['_id']}")
+            updated += count
+            continue
+
+        result = db['files'].update_many(stale_filter(file_ids, refs), {'$set': refs})
+        updated += result.modified_count
+
+    verb = 'would be updated' if args.dry_run else 'updated'
+    logger.info(f"Backfill finished: {nb_folders} folders, {updated} files {verb}")
+
+
+if __name__ == '__main__':
+    main()
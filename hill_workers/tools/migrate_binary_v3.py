@@ -0,0 +1,142 @@
+"""
+Binary Store Migration
+Converts row-major version 2 binary stores to the column-major version 3 layout
+
+Run: python -m tools.migrate_binary_v3 [--dry-run] [--data-folder PATH]
+
+Stores are rewritten in place (same `.bin` and `_meta.json` paths), so the
+database does not change. The LOD pyramid is rebuilt at the same time. Run it
+while the backend is stopped, or restart the backend afterwards, so no reader
+sees a half-replaced store.
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+import simplejson as json
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from services import BinaryStoreWriter
+
+logger = logging.getLogger(__name__)
+
+META_SUFFIX = '_meta.json'
+
+
+def find_stores(data_folder: Path) -> list[tuple[Path, dict]]:
+    """
+    Find binary stores under a folder
+    
+    Args:
+        data_folder: Root folder to scan
+    
+    Returns:
+        List of (meta path, metadata) for every binary store
+    """
+    stores = []
+    for meta_path in sorted(data_folder.rglob(f'*{META_SUFFIX}')):
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable metadata {meta_path}: {e}")
+            continue
+        if meta.get('format') == 'binary':
+            stores.append((meta_path, meta))
+    return stores
+
+
+def migrate_store(meta_path: Path, meta: dict, block_rows: int) -> dict:
+    """
+    Rewrite one version 2 store in the version 3 layout
+    
+    Args:
+        meta_path: Path to the store's `_meta.json`
+        meta: Current metadata
+        block_rows: Rows copied per block
+    
+    Returns:
+        New metadata
+    """
+    base_path = str(meta_path)[:-len(META_SUFFIX)]
+    binary_path = f'{base_path}.bin'
+    n_points, n_cols = meta['shape']
+    x_info = meta['xColumn']
+    channels = sorted(meta['channels'], key=lambda ch: ch['column'])
+    
+    # Write next to the store so the final renames stay on one filesystem
+    tmp_dir = tempfile.mkdtemp(prefix='.migrate_v3_', dir=meta_path.parent)
+    try:
+        tmp_base = os.path.join(tmp_dir, Path(base_path).name)
+        writer = BinaryStoreWriter(tmp_base, x_info['name'], x_info.get('unit', ''), channels)
+        try:
+            if n_points:
+                rows = np.memmap(binary_path, dtype=np.float64, mode='r', shape=(n_points, n_cols))
+                for start in range(0, n_points, block_rows):
+                    block = np.array(rows[start:start + block_rows])
+                    writer.append(block[:, 0], [block[:, ch['column']] for ch in channels])
+                del rows
+        except Exception:
+            writer.abort()
+            raise
+        new_meta = writer.finish(x_info.get('type', 'numeric'), x_info.get('format'))
+        
+        # Data files first, metadata last: the new metadata only appears once its files exist
+        os.replace(writer.binary_path, binary_path)
+        if 'lod' in new_meta:
+            os.replace(os.path.join(tmp_dir, new_meta['lod']['path']), f'{base_path}_lod.bin')
+        os.replace(writer.meta_path, meta_path)
+        return new_meta
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert version 2 binary stores to the version 3 layout')
+    parser.add_argument('--data-folder', default=str(settings.DATA_FOLDER_PATH), help='Data folder to scan')
+    parser.add_argument('--block-rows', type=int, default=settings.STREAMING_CHUNK_ROWS, help='Rows copied per block')
+    parser.add_argument('--dry-run', action='store_true', help='List stores that would be migrated')
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO),
+        format=settings.LOG_FORMAT,
+        datefmt=settings.LOG_DATE_FORMAT
+    )
+    
+    stores = find_stores(Path(args.data_folder))
+    pending = [(path, meta) for path, meta in stores if meta.get('version', 1) == 2]
+    legacy = [path for path, meta in stores if meta.get('version', 1) < 2]
+    logger.info(f"Found {len(stores)} binary stores, {len(pending)} to migrate")
+    for path in legacy:
+        # Version 1 stores have index x-axes; reparse the file instead
+        logger.warning(f"Skipping version 1 store (reparse the file to upgrade): {path}")
+    
+    migrated = failed = 0
+    for meta_path, meta in pending:
+        if args.dry_run:
+            logger.info(f"Would migrate {meta_path} ({meta['totalPoints']} points)")
+            continue
+        try:
+            migrate_store(meta_path, meta, args.block_rows)
+            migrated += 1
+            logger.info(f"Migrated {meta_path}")
+        except Exception as e:
+            failed += 1
+            logger.error(f"Failed to migrate {meta_path}: {e}", exc_info=True)
+    
+    if not args.dry_run:
+        logger.info(f"Migration finished: {migrated} migrated, {failed} failed, {len(legacy)} skipped")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,13 +5,17 @@ Consumes file parsing tasks from Redis Streams and processes them
 Run: python -m workers.file_parser
 """
 import logging
+import multiprocessing
+import os
 import sys
 import time
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
-import simplejson as json
 import pandas as pd
 import numpy as np
 from bson.objectid import ObjectId
@@ -20,11 +24,21 @@ from bson.objectid import ObjectId
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import settings
-from database import get_db, get_data_folder_path
+from database import create_indexes, get_db, get_data_folder_path
 from redis_client import get_redis_client
+from services import (
+    ParsedTable,
+    ParsedChannel,
+    BinaryStoreWriter,
+    OverviewBuilder,
+    write_overview_binary,
+    write_json_from_table,
+    write_json_from_binary,
+)
+from services.timestamps import datetimes_to_timestamps, TimestampEngine
 
-# Threshold for using binary format (100k points)
-BINARY_FORMAT_THRESHOLD = 100_000
+# Files with fewer points are displayed in full instead of through a downsampled overview
+OVERVIEW_THRESHOLD = 100_000
 
 # Common time format patterns for auto-detection
 TIME_FORMAT_PATTERNS = [
@@ -100,99 +114,6 @@ def is_numeric_series(series: pd.Series) -> bool:
         return False
 
 
-def parse_time_string(time_str: str, fmt: str) -> float:
-    """
-    Parse a time string to Unix timestamp (seconds since epoch).
-    
-    Args:
-        time_str: Time string to parse
-        fmt: strftime format string or 'auto'
-    
-    Returns:
-        Unix timestamp as float (includes fractional seconds)
-    """
-    try:
-        if fmt == 'auto':
-            dt = pd.to_datetime(time_str)
-            return dt.timestamp()
-        else:
-            dt = datetime.strptime(str(time_str).strip(), fmt)
-            return dt.timestamp()
-    except Exception as e:
-        raise ValueError(f"Failed to parse time '{time_str}' with format '{fmt}': {e}")
-
-
-def convert_times_to_timestamps(time_strings: list, fmt: str) -> tuple[np.ndarray, str]:
-    """
-    Convert a list of time strings to Unix timestamps.
-    
-    Args:
-        time_strings: List of time strings
-        fmt: strftime format string or 'auto'
-    
-    Returns:
-        Tuple of (numpy array of timestamps, detected/confirmed format string)
-    """
-    n = len(time_strings)
-    timestamps = np.zeros(n, dtype=np.float64)
-    
-    # For 'auto' format, use pandas for bulk conversion (faster)
-    if fmt == 'auto':
-        try:
-            dt_series = pd.to_datetime(time_strings)
-            # Get the inferred format from first value for display
-            sample = str(time_strings[0]).strip()
-            detected_fmt = detect_display_format(sample, dt_series[0])
-            timestamps = (dt_series.astype('int64') / 1e9).values  # Convert to seconds
-            return timestamps, detected_fmt
-        except Exception as e:
-            raise ValueError(f"Failed to parse times with auto format: {e}")
-    
-    # Parse individually with known format
-    for i, ts in enumerate(time_strings):
-        timestamps[i] = parse_time_string(ts, fmt)
-    
-    return timestamps, fmt
-
-
-def detect_display_format(sample_str: str, parsed_dt: datetime) -> str:
-    """
-    Determine the best display format for a time string.
-    
-    Args:
-        sample_str: Original time string
-        parsed_dt: Parsed datetime
-    
-    Returns:
-        strftime format string for display
-    """
-    sample = str(sample_str).strip()
-    
-    # Check if has microseconds
-    has_micro = '.' in sample and any(c.isdigit() for c in sample.split('.')[-1])
-    
-    # Check if has date part
-    has_date = '-' in sample or '/' in sample
-    
-    # Check if has time part
-    has_time = ':' in sample
-    
-    if has_date and has_time:
-        if has_micro:
-            return '%Y-%m-%d %H:%M:%S.%f'
-        else:
-            return '%Y-%m-%d %H:%M:%S'
-    elif has_date:
-        return '%Y-%m-%d'
-    elif has_time:
-        if has_micro:
-            return '%H:%M:%S.%f'
-        else:
-            return '%H:%M:%S'
-    else:
-        return '%Y-%m-%d %H:%M:%S'  # Default
-
-
 # ===== Logging Setup =====
 
 def setup_logging():
@@ -225,7 +146,7 @@ def setup_logging():
 
 logger = logging.getLogger(__name__)
 
-def parse_file(db, f, data_folder_path):
+def parse_file(db, f, data_folder_path, templateInfo=None):
     """
     Parse file according to template configuration
     
@@ -233,24 +154,17 @@ def parse_file(db, f, data_folder_path):
         db: Database instance
         f: File document from MongoDB
         data_folder_path: Path to data folder
+        templateInfo: Template document (looked up from the file's folder if omitted)
     
     Returns:
-        List of channel data dictionaries
+        ParsedTable with the x-axis and channel columns
     """
-    json_dict = []
     file_id = str(f['_id'])
     
     logger.debug(f"Parsing file ID: {file_id}")
     
-    # Get folder and template info
-    folderInfo = db['folders'].find_one({'fileList': file_id})
-    if folderInfo is None:
-        raise ValueError(f"Folder not found for file {file_id}")
-    
-    templateId = folderInfo['template']['id']
-    templateInfo = db['templates'].find_one({'_id': ObjectId(templateId)})
     if templateInfo is None:
-        raise ValueError(f"Template not found: {templateId}")
+        templateInfo = get_file_template(db, f)
     
     local_path = f'{data_folder_path}/{f["rawPath"]}'
     
@@ -294,80 +208,112 @@ def parse_file(db, f, data_folder_path):
 
     if use_index:
         # Use row index as x-axis (0 to N-1)
-        x = list(range(len(df)))
         logger.info(f"Using row index as x-axis: 0 to {len(df) - 1}")
-        json_dict.append({
-            'x': True,
-            'name': 'index',
-            'unit': '',
-            'data': x
-        })
+        table = ParsedTable(x=np.arange(len(df), dtype=np.float64), x_name='index')
     else:
         columnNames = df.columns.values.tolist()
-        x_regex = templateInfo['x']['regex']
-
-        if 'col:' in x_regex:
-            x_regex = x_regex.replace('col:', '').strip()
-            try:
-                x_regex = int(x_regex)
-            except:
-                raise Exception(f'expect col:[number], got col:{x_regex} for x_axis')
-            x = df.iloc[:, x_regex]
-        else:
-            for c in columnNames:
-                if re.match(x_regex, c):
-                    break
-            else:
-                logger.error(f"Available columns: {columnNames}")
-                raise Exception(f'x axis not found for regex {x_regex}')
-            x = df[c]
-
-        # Validate: if isTime is not enabled, x-axis must be numeric
+        x = df.iloc[:, resolve_x_column(templateInfo, columnNames)]
         is_time_enabled = templateInfo.get('x', {}).get('isTime', False)
+        x_numeric, x_format = convert_x_series(x, is_time_enabled)
+        table = ParsedTable(
+            x=x_numeric,
+            x_name=templateInfo['x']['name'],
+            x_unit=templateInfo['x'].get('unit', ''),
+            x_type='timestamp' if is_time_enabled else 'numeric',
+            x_format=x_format
+        )
+    
+    # Extract channels
+    for channel in templateInfo['channels']:
+        channel_data = get_channel(channel, df)
+        if channel_data is None:
+            continue
+        table.channels.append(ParsedChannel(
+            name=channel['channelName'],
+            unit=channel['unit'],
+            color=channel['color'],
+            data=channel_data
+        ))
+    
+    logger.debug(f"Parsed {len(table.channels)} channels from file")
+    return table
+
 
-        if not is_time_enabled and not is_numeric_series(x):
+def convert_x_series(x: pd.Series, is_time_enabled: bool) -> tuple[np.ndarray, Optional[str]]:
+    """
+    Convert the x-axis column to float64
+    
+    Args:
+        x: x-axis column
+        is_time_enabled: Whether the template marks the x-axis as time
+    
+    Returns:
+        Tuple of (float64 values - Unix timestamps for time axes, display format or None)
+    """
+    # Validate: if isTime is not enabled, x-axis must be numeric
+    if not is_time_enabled:
+        if not is_numeric_series(x):
             sample_value = x.iloc[0] if len(x) > 0 else "N/A"
             raise Exception(
                 f'X-axis contains non-numeric values (e.g., "{sample_value}"), '
                 f'but "isTime" is not enabled in the template. '
                 f'Please enable "isTime" for the x-axis if the data contains timestamps.'
             )
-
-        # Convert to time if needed (default to False if not specified)
-        if is_time_enabled:
+        return pd.to_numeric(x).to_numpy(dtype=np.float64), None
+    
+    timestamps = convert_time_strings(x)
+    if timestamps is None:
+        try:
+            x_dt = pd.to_datetime(x)
+        except:
             try:
-                x_dt = pd.to_datetime(x)
+                x_dt = pd.to_datetime(x, format='mixed')
             except:
-                try:
-                    x_dt = pd.to_datetime(x, format='mixed')
-                except:
-                    raise Exception('x axis cannot be converted to time')
-            time_fmt = '%Y-%m-%d %H:%M:%S.%f' if x_dt.dt.microsecond.any() else '%Y-%m-%d %H:%M:%S'
-            x = x_dt.dt.strftime(time_fmt)
-
-        x = x.values.tolist()
-        json_dict.append({
-            'x': True,
-            'name': templateInfo['x']['name'],
-            'unit': templateInfo['x'].get('unit', ''),
-            'data': x
-        })
+                raise Exception('x axis cannot be converted to time')
+        timestamps = datetimes_to_timestamps(x_dt)
+    has_micro = bool(np.any(np.modf(timestamps[~np.isnan(timestamps)])[0]))
+    time_fmt = '%Y-%m-%d %H:%M:%S.%f' if has_micro else '%Y-%m-%d %H:%M:%S'
+    return timestamps, time_fmt
+
+
+def convert_time_strings(x: pd.Series) -> Optional[np.ndarray]:
+    """
+    Convert a column of time strings with a detected format in bulk
     
-    # Extract channels
-    for channel in templateInfo['channels']:
-        channel_data = get_channel(channel, df)
-        if channel_data is None:
-            continue
-        json_dict.append({
-            'x': False,
-            'name': channel['channelName'],
-            'unit': channel['unit'],
-            'color': channel['color'],
-            'data': channel_data
-        })
+    Only formats with a date are handled; datetime columns, time-only and
+    undetected formats are left to pandas' inference. Columns with rows the
+    detected format rejects are re-parsed with format='mixed'.
     
-    logger.debug(f"Parsed {len(json_dict)} channels from file")
-    return json_dict
+    Args:
+        x: x-axis column
+    
+    Returns:
+        float64 array of Unix timestamps, or None if the column is left to pandas
+    
+    Raises:
+        Exception: If rows match neither the detected format nor format='mixed'
+    """
+    if pd.api.types.is_datetime64_any_dtype(x) or not pd.api.types.is_object_dtype(x):
+        return None
+    samples = x.dropna()
+    fmt = detect_time_format(samples.iloc[:1].tolist())
+    if fmt is None or '%d' not in fmt:
+        return None
+    
+    engine = TimestampEngine(fmt)
+    timestamps = engine.parse(x)
+    # Missing values are NaN either way
+    unparseable = engine.unparseable - (len(x) - len(samples))
+    if not unparseable:
+        return timestamps
+    
+    try:
+        return datetimes_to_timestamps(pd.to_datetime(x, format='mixed'))
+    except Exception:
+        raise Exception(
+            f'x axis cannot be converted to time: {unparseable} of {len(x)} '
+            f"values do not match the detected format '{fmt}'"
+        )
 
 
 def get_channel(channel, df):
@@ -379,9 +325,86 @@ def get_channel(channel, df):
         df: pandas DataFrame
     
     Returns:
-        List of channel values or None if not found and not mandatory
+        float64 array of channel values or None if not found and not mandatory
+    """
+    column = resolve_channel_column(channel, df.columns.values.tolist())
+    if column is None:
+        return None
+    
+    return df.iloc[:, column].astype(float).to_numpy(dtype=np.float64)
+
+
+def get_file_template(db, file_doc: dict) -> dict:
+    """
+    Look up the template of a file
+    
+    Uses the file's `templateId`; files uploaded before it was stored fall
+    back to the template of the folder listing them.
+    
+    Args:
+        db: Database instance
+        file_doc: File document from MongoDB
+    
+    Returns:
+        Template document
+    """
+    templateId = file_doc.get('templateId')
+    if templateId is None:
+        file_id = str(file_doc['_id'])
+        folderInfo = db['folders'].find_one({'fileList': file_id}, {'template': 1})
+        if folderInfo is None:
+            raise ValueError(f"Folder not found for file {file_id}")
+        templateId = folderInfo['template']['id']
+    
+    templateInfo = db['templates'].find_one({'_id': ObjectId(templateId)})
+    if templateInfo is None:
+        raise ValueError(f"Template not found: {templateId}")
+    
+    return templateInfo
+
+
+def resolve_x_column(templateInfo, columnNames) -> int:
+    """
+    Find the position of the x-axis column
+    
+    Args:
+        templateInfo: Template document
+        columnNames: List of column names
+    
+    Returns:
+        Column position
+    """
+    x_regex = templateInfo['x']['regex']
+    
+    if 'col:' in x_regex:
+        x_regex = x_regex.replace('col:', '').strip()
+        try:
+            x_regex = int(x_regex)
+        except:
+            raise Exception(f'expect col:[number], got col:{x_regex} for x_axis')
+        if not -len(columnNames) <= x_regex < len(columnNames):
+            raise Exception(f'x axis column col:{x_regex} out of range')
+        return x_regex % len(columnNames)
+    
+    for i, c in enumerate(columnNames):
+        if re.match(x_regex, str(c)):
+            return i
+    
+    logger.error(f"Available columns: {columnNames}")
+    raise Exception(f'x axis not found for regex {x_regex}')
+
+
+def resolve_channel_column(channel, columnNames) -> Optional[int]:
+    """
+    Find the position of a channel column
+    
+    Args:
+        channel: Channel configuration dict
+        columnNames: List of column names
+    
+    Returns:
+        Column position or None if not found and not mandatory
     """
-    columnNames = df.columns.values.tolist()
     channel_regex = channel['regex']
     
     if 'col:' in channel_regex:
@@ -393,268 +416,532 @@ def get_channel(channel, df):
                 return None
             else:
                 raise Exception(f'expect col:[number], got col:{channel_regex} for {channel["channelName"]}')
-        channel_data = df.iloc[:, channel_regex].astype(float)
-    else:
-        for c in columnNames:
-            if channel_regex == c:
-                break
-        else:
-            if channel['mandatory'] == False:
-                return None
-            else:
-                raise Exception(f'Channel {channel["channelName"]} not found')
-        channel_data = df[c].astype(float)
+        if not -len(columnNames) <= channel_regex < len(columnNames):
+            raise Exception(f'Channel column col:{channel_regex} out of range for {channel["channelName"]}')
+        return channel_regex % len(columnNames)
+    
+    for i, c in enumerate(columnNames):
+        if channel_regex == c:
+            return i
     
-    channel_data = channel_data.values.tolist()
-    return channel_data
+    if channel['mandatory'] == False:
+        return None
+    raise Exception(f'Channel {channel["channelName"]} not found')
 
 
-def save_as_binary_format(json_dict: list, output_path: str) -> dict:
+def save_as_binary_format(table: ParsedTable, output_path: str) -> dict:
     """
     Save parsed data in memory-mappable binary format.
     
-    For time-based x-axis:
-    - Converts time strings to Unix timestamps (float64 seconds since epoch)
-    - Stores format string in metadata for display conversion
-    
-    For numeric x-axis:
-    - Stores values directly as float64
+    The table's x-axis is already float64 (Unix timestamps for time axes),
+    so it is written as-is; the format string is stored in metadata for
+    display conversion.
     
     Args:
-        json_dict: Parsed data in JSON format (list of channel dicts)
+        table: Parsed table
         output_path: Base path for output files (without extension)
     
     Returns:
         Metadata dict with file information
     """
-    # Find x-axis and channels
-    x_trace = next(d for d in json_dict if d['x'])
-    channels = [d for d in json_dict if not d['x']]
+    # Write columns (column-major: [x][ch1][ch2]..., each contiguous)
+    writer = BinaryStoreWriter(output_path, table.x_name, table.x_unit, table.channel_descriptors)
+    try:
+        # NaN values are kept as NaN for proper handling
+        return writer.write(table.x, table.channel_arrays, table.x_type, table.x_format)
+    except Exception:
+        writer.abort()
+        raise
+
+
+def generate_overview_data(table: ParsedTable, target_points_per_channel: int = 5000) -> ParsedTable:
+    """
+    Generate downsampled overview data for initial chart display.
     
-    n_points = len(x_trace['data'])
-    n_cols = 1 + len(channels)  # x + channels
+    Uses MinMaxLTTB with union of indices to preserve important features.
+    X values are numeric (timestamps for time axes).
+    
+    Args:
+        table: Parsed table
+        target_points_per_channel: Target points per channel
+    
+    Returns:
+        Downsampled table
+    """
+    builder = OverviewBuilder(target_points_per_channel)
+    builder.add(table.x, table.channel_arrays)
+    x_out, channels_out = builder.result()
+    logger.info(f"Generated overview: {table.n_points} -> {len(x_out)} points")
+    return table.with_columns(x_out, channels_out)
+
+
+# ===== Streaming Ingestion =====
+
+class CsvChunkReader:
+    """
+    Read a CSV file in bounded chunks and apply the template's x/channel mapping.
     
-    # Determine if x-axis is time-based (string) or numeric
-    x_data = x_trace['data']
-    x_is_time = isinstance(x_data[0], str) if x_data else False
+    Only the mapped columns are parsed. Iterating yields one ParsedTable per
+    chunk; time x-axes are converted to Unix timestamps chunk by chunk.
+    """
     
-    if x_is_time:
-        # Detect time format
-        sample_strings = x_data[:10]  # Use first 10 for detection
-        detected_format = detect_time_format(sample_strings)
+    def __init__(self, local_path: str, templateInfo: dict, chunk_rows: int):
+        """
+        Resolve the column mapping from the CSV header
+        
+        Args:
+            local_path: Path to the CSV file
+            templateInfo: Template document
+            chunk_rows: Rows per chunk
+        """
+        self.local_path = local_path
+        self.head_row = templateInfo['headRow']
+        self.skip_row = templateInfo['skipRow']
+        self.chunk_rows = chunk_rows
         
-        if detected_format is None:
-            logger.warning("Could not detect time format, treating as numeric indices")
-            x_numeric = np.arange(n_points, dtype=np.float64)
-            x_type = 'numeric'
-            x_format = None
+        try:
+            columnNames = pd.read_csv(local_path, header=self.head_row, nrows=0).columns.values.tolist()
+        except Exception as e:
+            raise Exception(f'Cannot open CSV file: {e}')
+        
+        x_config = templateInfo.get('x', {})
+        self.use_index = x_config.get('useIndex', False)
+        self.x_is_time = False if self.use_index else x_config.get('isTime', False)
+        if self.use_index:
+            self.x_name = 'index'
+            self.x_unit = ''
+            self.x_column = None
         else:
-            # Convert time strings to Unix timestamps
-            logger.info(f"Detected time format: {detected_format}")
-            try:
-                x_numeric, x_format = convert_times_to_timestamps(x_data, detected_format)
-                x_type = 'timestamp'
-                logger.info(f"Converted {n_points} time strings to timestamps")
-                logger.info(f"Timestamp range: {x_numeric[0]:.3f} to {x_numeric[-1]:.3f}")
-            except Exception as e:
-                logger.error(f"Failed to convert times: {e}, using numeric indices")
-                x_numeric = np.arange(n_points, dtype=np.float64)
-                x_type = 'numeric'
-                x_format = None
-    else:
-        x_numeric = np.array(x_data, dtype=np.float64)
-        x_type = 'numeric'
-        x_format = None
-    
-    # Create numpy array (row-major: each row is [x, ch1, ch2, ...])
-    arr = np.zeros((n_points, n_cols), dtype=np.float64)
-    arr[:, 0] = x_numeric
-    
-    for i, ch in enumerate(channels):
-        ch_data = np.array(ch['data'], dtype=np.float64)
-        # Handle NaN values - keep as NaN for proper handling
-        arr[:, i + 1] = ch_data
-    
-    # Save binary file
-    binary_path = f"{output_path}.bin"
-    arr.tofile(binary_path)
-    
-    logger.info(f"Saved binary file: {binary_path}, shape: {arr.shape}")
-    
-    # Create metadata
-    meta = {
-        "format": "binary",
-        "version": 2,  # Version 2 uses timestamps instead of indices
-        "shape": [n_points, n_cols],
-        "dtype": "float64",
-        "totalPoints": n_points,
-        "xColumn": {
-            "name": x_trace['name'],
-            "unit": x_trace.get('unit', ''),
-            "type": x_type,  # 'timestamp' or 'numeric'
-            "column": 0,
-            "min": float(x_numeric[0]),
-            "max": float(x_numeric[-1]),
-        },
-        "channels": [
-            {
-                "name": ch['name'],
-                "unit": ch.get('unit', ''),
-                "color": ch.get('color', '#000000'),
-                "column": i + 1
-            }
-            for i, ch in enumerate(channels)
-        ]
-    }
-    
-    # Add format string for timestamp display
-    if x_type == 'timestamp' and x_format:
-        meta["xColumn"]["format"] = x_format
-        meta["xColumn"]["timezone"] = "local"  # Default to local, can be configured
-    
-    # Save metadata
-    meta_path = f"{output_path}_meta.json"
-    with open(meta_path, 'w') as f:
-        json.dump(meta, f, indent=2)
-    
-    logger.info(f"Saved metadata file: {meta_path}")
-    
-    return meta
-
-
-def generate_overview_data(json_dict: list, target_points_per_channel: int = 5000) -> tuple[list, dict]:
+            self.x_name = templateInfo['x']['name']
+            self.x_unit = templateInfo['x'].get('unit', '')
+            self.x_column = resolve_x_column(templateInfo, columnNames)
+        
+        self.channels = []
+        self.channel_columns = []
+        for channel in templateInfo['channels']:
+            column = resolve_channel_column(channel, columnNames)
+            if column is None:
+                continue
+            self.channels.append(ParsedChannel(
+                name=channel['channelName'],
+                unit=channel['unit'],
+                color=channel['color'],
+                data=np.empty(0, dtype=np.float64)
+            ))
+            self.channel_columns.append(column)
+        
+        self.usecols = sorted(set(self.channel_columns + ([] if self.x_column is None else [self.x_column])))
+        # Positions inside each chunk, which only contains usecols
+        self._chunk_pos = {column: i for i, column in enumerate(self.usecols)}
+        self.has_microseconds = False
+    
+    def __iter__(self):
+        rows_seen = 0
+        reader = pd.read_csv(
+            self.local_path,
+            header=self.head_row,
+            usecols=self.usecols or None,
+            chunksize=self.chunk_rows
+        )
+        for chunk in reader:
+            # Equivalent of df.loc[skipRow:, :] on the full frame
+            chunk = chunk[chunk.index >= self.skip_row]
+            n = len(chunk)
+            if n == 0:
+                continue
+            
+            if self.use_index:
+                x = np.arange(rows_seen, rows_seen + n, dtype=np.float64)
+            else:
+                x = self._convert_x(chunk.iloc[:, self._chunk_pos[self.x_column]])
+            
+            channel_arrays = [
+                chunk.iloc[:, self._chunk_pos[column]].astype(float).to_numpy(dtype=np.float64)
+                for column in self.channel_columns
+            ]
+            rows_seen += n
+            yield self.empty_table().with_columns(x, channel_arrays)
+    
+    def _convert_x(self, x: pd.Series) -> np.ndarray:
+        """Convert one chunk of the x column to float64"""
+        x_numeric, fmt = convert_x_series(x, self.x_is_time)
+        if fmt and fmt.endswith('.%f'):
+            self.has_microseconds = True
+        return x_numeric
+    
+    @property
+    def x_format(self) -> Optional[str]:
+        """Display format for time x-axes, known once all chunks are read"""
+        if not self.x_is_time:
+            return None
+        return '%Y-%m-%d %H:%M:%S.%f' if self.has_microseconds else '%Y-%m-%d %H:%M:%S'
+    
+    def empty_table(self) -> ParsedTable:
+        """Table with the resolved axis and channel settings and no rows"""
+        return ParsedTable(
+            x=np.empty(0, dtype=np.float64),
+            x_name=self.x_name,
+            x_unit=self.x_unit,
+            x_type='timestamp' if self.x_is_time else 'numeric',
+            x_format=self.x_format,
+            channels=self.channels
+        )
+
+
+def should_stream_file(local_path: str, templateInfo: dict) -> bool:
     """
-    Generate downsampled overview data for initial chart display.
+    Decide whether a file is ingested with the streaming CSV path
     
-    Uses MinMaxLTTB with union of indices to preserve important features.
-    For time-based x-axis, converts to timestamps for consistent handling.
+    Args:
+        local_path: Path to the raw file
+        templateInfo: Template document
+    
+    Returns:
+        True for CSV files at or above STREAMING_THRESHOLD_MB
+    """
+    if templateInfo['fileType'] != '.csv':
+        return False
+    try:
+        size = Path(local_path).stat().st_size
+    except OSError:
+        return False
+    return size >= settings.STREAMING_THRESHOLD_MB * 1024 * 1024
+
+
+def stream_csv_to_binary(
+    local_path: str,
+    templateInfo: dict,
+    output_path: str,
+    chunk_rows: int,
+    target_points_per_channel: int = 5000
+) -> tuple[dict, ParsedTable]:
+    """
+    Parse a CSV file chunk by chunk straight into the binary store.
+    
+    Peak memory depends on chunk_rows, not on file size: each chunk is
+    appended to the .bin file and folded into the overview before the next
+    one is read.
     
     Args:
-        json_dict: Parsed data in JSON format
-        target_points_per_channel: Target points per channel
+        local_path: Path to the CSV file
+        templateInfo: Template document
+        output_path: Base path for output files (without extension)
+        chunk_rows: Rows per chunk
+        target_points_per_channel: Target points per channel for the overview
     
     Returns:
-        Tuple of (downsampled data in JSON format, overview metadata dict)
+        Tuple of (binary metadata, downsampled overview table)
     """
-    from tsdownsample import MinMaxLTTBDownsampler, NaNMinMaxLTTBDownsampler
+    reader = CsvChunkReader(local_path, templateInfo, chunk_rows)
+    writer = BinaryStoreWriter(output_path, reader.x_name, reader.x_unit, reader.empty_table().channel_descriptors)
+    overview = OverviewBuilder(target_points_per_channel)
     
-    # Find x-axis and channels
-    x_trace = next(d for d in json_dict if d['x'])
-    channels = [d for d in json_dict if not d['x']]
+    try:
+        for chunk in reader:
+            writer.append(chunk.x, chunk.channel_arrays)
+            overview.add(chunk.x, chunk.channel_arrays)
+            logger.debug(f"Streamed {writer.n_points} rows")
+    except Exception:
+        writer.abort()
+        raise
+    
+    if writer.n_points == 0:
+        writer.abort()
+        raise Exception('CSV file contains no data rows')
+    
+    # The display format is only known once every chunk has been read
+    full = reader.empty_table()
+    meta = writer.finish(full.x_type, full.x_format)
+    
+    x_out, channels_out = overview.result()
+    logger.info(f"Generated overview: {meta['totalPoints']} -> {len(x_out)} points")
+    return meta, full.with_columns(x_out, channels_out)
+
+
+# ===== Parse Jobs =====
+
+class FileParseJob:
+    """Parses one file and records the result on its database document"""
     
-    n_points = len(x_trace['data'])
-    x_data = x_trace['data']
-    x_is_time = isinstance(x_data[0], str) if x_data else False
+    def __init__(self, db, data_folder_path: str):
+        """
+        Initialize job runner
+        
+        Args:
+            db: Database instance
+            data_folder_path: Root folder of raw and parsed files
+        """
+        self.db = db
+        self.data_folder_path = data_folder_path
     
-    # Prepare x values and detect format
-    x_format = None
-    if x_is_time:
-        sample_strings = x_data[:10]
-        detected_format = detect_time_format(sample_strings)
-        if detected_format:
-            try:
-                x_numeric, x_format = convert_times_to_timestamps(x_data, detected_format)
-            except:
-                # Fallback to indices
-                x_numeric = np.arange(n_points, dtype=np.float64)
-                x_is_time = False
-        else:
-            x_numeric = np.arange(n_points, dtype=np.float64)
-            x_is_time = False
-    else:
-        x_numeric = np.array(x_data, dtype=np.float64)
-    
-    # Overview metadata
-    overview_meta = {
-        'xType': 'timestamp' if x_is_time else 'numeric',
-        'xFormat': x_format,
-        'xMin': float(x_numeric[0]),
-        'xMax': float(x_numeric[-1]),
-        'totalPoints': n_points
-    }
-    
-    # No resampling needed if data is small
-    if n_points <= target_points_per_channel:
-        # Still convert times to timestamps for consistency
-        if x_is_time and x_format:
-            result = [{
-                'x': True,
-                'name': x_trace['name'],
-                'unit': x_trace.get('unit', ''),
-                'data': x_numeric.tolist()
-            }]
-        else:
-            result = [{
-                'x': True,
-                'name': x_trace['name'],
-                'unit': x_trace.get('unit', ''),
-                'data': x_data if not x_is_time else x_numeric.tolist()
-            }]
-        
-        for ch in channels:
-            result.append({
-                'x': False,
-                'name': ch['name'],
-                'unit': ch.get('unit', ''),
-                'color': ch.get('color', '#000000'),
-                'data': ch['data']
-            })
-        
-        overview_meta['overviewPoints'] = n_points
-        return result, overview_meta
-    
-    # Collect channel data as numpy arrays
-    channel_arrays = []
-    for ch in channels:
-        ch_arr = np.array(ch['data'], dtype=np.float64)
-        ch_arr = np.nan_to_num(ch_arr, nan=0.0)  # Replace NaN for algorithm
-        channel_arrays.append(ch_arr)
-    
-    # Run MinMaxLTTB on each channel and collect indices
-    downsampler = NaNMinMaxLTTBDownsampler()
-    all_indices = set()
-    
-    for ch_arr in channel_arrays:
+    def run(self, file_id: str):
+        """
+        Parse a file and update its document
+        
+        Errors are recorded as the file's parsing status and not raised, so
+        the caller can always acknowledge the message afterwards.
+        
+        Args:
+            file_id: MongoDB file ID
+        """
         try:
-            indices = downsampler.downsample(x_numeric, ch_arr, n_out=target_points_per_channel)
-            all_indices.update(indices.tolist())
+            # Get file from database
+            file_doc = self.db['files'].find_one({'_id': ObjectId(file_id)})
+            
+            if not file_doc:
+                logger.error(f"File not found in database: {file_id}")
+                return
+            
+            self.ingest(file_doc)
+            
         except Exception as e:
-            logger.warning(f"MinMaxLTTB failed: {e}, using uniform sampling")
-            step = max(1, n_points // target_points_per_channel)
-            indices = list(range(0, n_points, step))[:target_points_per_channel]
-            all_indices.update(indices)
+            logger.error(f"Failed to process file {file_id}: {e}", exc_info=True)
+            mark_file_error(self.db, file_id, e)
     
-    # Sort indices
-    selected_indices = sorted(all_indices)
+    def ingest(self, file_doc: dict) -> dict:
+        """
+        Parse a file, write its outputs and update its document
+        
+        Args:
+            file_doc: File document from MongoDB
+        
+        Returns:
+            Fields set on the file document
+        
+        Raises:
+            Exception: If the file cannot be parsed (the document is not changed)
+        """
+        file_name = file_doc.get('name', 'unknown')
+        logger.info(f"Parsing file: {file_name}")
+        
+        templateInfo = get_file_template(self.db, file_doc)
+        local_path = f'{self.data_folder_path}/{file_doc["rawPath"]}'
+        
+        # Large CSV files are streamed chunk by chunk into the binary store
+        if should_stream_file(local_path, templateInfo):
+            update_data = self._ingest_streaming(file_doc, templateInfo, local_path)
+        else:
+            table = parse_file(self.db, file_doc, self.data_folder_path, templateInfo)
+            update_data = self._ingest_table(file_doc, table)
+        
+        update = {'$set': update_data}
+        if 'jsonPath' not in update_data:
+            # The JSON export of an earlier parse was removed
+            update['$unset'] = {'jsonPath': ''}
+        self.db['files'].update_one({'_id': file_doc['_id']}, update)
+        
+        logger.info(f"Successfully processed file: {file_name} "
+                    f"({update_data['totalPoints']} points, xType={update_data['xType']})")
+        return update_data
     
-    logger.info(f"Generated overview: {n_points} -> {len(selected_indices)} points")
+    def _output_paths(self, file_doc: dict) -> tuple[Path, str, str]:
+        """
+        Create the output directory of a file
+        
+        Args:
+            file_doc: File document from MongoDB
+        
+        Returns:
+            Tuple of (output directory, file stem, path prefix stored in the database)
+        """
+        local_folder = Path(file_doc["rawPath"]).parent
+        file_stem = Path(file_doc["rawPath"]).stem
+        output_dir = Path(self.data_folder_path) / local_folder
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        project_id = local_folder.parent.name if local_folder.parent.name else str(local_folder.parent)
+        file_id_name = local_folder.name
+        
+        return output_dir, file_stem, f'{project_id}/{file_id_name}'
     
-    # Build output with timestamps (not time strings)
-    result = []
+    def _ingest_table(self, file_doc: dict, table: ParsedTable) -> dict:
+        """
+        Write the outputs of a parsed table
+        
+        Args:
+            file_doc: File document from MongoDB
+            table: Parsed table
+        
+        Returns:
+            Fields to set on the file document
+        """
+        output_dir, file_stem, db_prefix = self._output_paths(file_doc)
+        
+        # Every file is stored in the binary format, whatever its size
+        save_as_binary_format(table, str(output_dir / file_stem))
+        
+        if table.n_points >= OVERVIEW_THRESHOLD:
+            # Generate overview data for initial display
+            overview = generate_overview_data(table, target_points_per_channel=5000)
+        else:
+            # Small files are displayed in full
+            overview = table
+        
+        self._save_overview(output_dir / f"{file_stem}_overview.bin", overview)
+        
+        json_file_path = output_dir / f"{file_stem}.json"
+        if settings.WRITE_JSON_EXPORT:
+            write_json_from_table(table, str(json_file_path))
+        else:
+            self._remove_json_export(json_file_path)
+        
+        return self._build_update_data(
+            db_prefix,
+            file_stem,
+            overview,
+            json_export=settings.WRITE_JSON_EXPORT,
+            total_points=table.n_points,
+            x_type=table.x_type,
+            x_format=table.x_format,
+            x_min=table.x_min,
+            x_max=table.x_max
+        )
+    
+    def _ingest_streaming(self, file_doc: dict, templateInfo: dict, local_path: str) -> dict:
+        """
+        Ingest a large CSV file with bounded memory
+        
+        Args:
+            file_doc: File document from MongoDB
+            templateInfo: Template document
+            local_path: Path to the raw CSV file
+        
+        Returns:
+            Fields to set on the file document
+        """
+        logger.info(f"Using streaming ingestion for large CSV file "
+                    f"(chunk size: {settings.STREAMING_CHUNK_ROWS} rows)")
+        
+        output_dir, file_stem, db_prefix = self._output_paths(file_doc)
+        
+        binary_base_path = str(output_dir / file_stem)
+        meta, overview = stream_csv_to_binary(
+            local_path,
+            templateInfo,
+            binary_base_path,
+            chunk_rows=settings.STREAMING_CHUNK_ROWS,
+            target_points_per_channel=5000
+        )
+        self._save_overview(output_dir / f"{file_stem}_overview.bin", overview)
+        
+        json_file_path = output_dir / f"{file_stem}.json"
+        if settings.WRITE_JSON_EXPORT:
+            write_json_from_binary(f"{binary_base_path}.bin", meta, str(json_file_path))
+        else:
+            self._remove_json_export(json_file_path)
+        
+        x_column = meta['xColumn']
+        return self._build_update_data(
+            db_prefix,
+            file_stem,
+            overview,
+            json_export=settings.WRITE_JSON_EXPORT,
+            total_points=meta['totalPoints'],
+            x_type=x_column['type'],
+            x_format=x_column.get('format'),
+            x_min=x_column['min'],
+            x_max=x_column['max']
+        )
+    
+    def _save_overview(self, overview_file_path: Path, overview: ParsedTable):
+        """Save overview columns in the binary viewport layout"""
+        write_overview_binary(str(overview_file_path), overview.x, overview.channel_arrays)
+    
+    @staticmethod
+    def _remove_json_export(json_file_path: Path):
+        """Delete the full JSON left by an earlier parse, which would now be stale"""
+        if json_file_path.exists():
+            json_file_path.unlink()
+            logger.info(f"Removed stale JSON export: {json_file_path}")
+    
+    @staticmethod
+    def _build_update_data(
+        db_prefix: str,
+        file_stem: str,
+        overview: ParsedTable,
+        json_export: bool,
+        total_points: int,
+        x_type: str,
+        x_format: Optional[str],
+        x_min: float,
+        x_max: float
+    ) -> dict:
+        """Build the file document update for a parsed file (`jsonPath` only if the JSON was written)"""
+        update_data = {
+            'parsing': 'parsed',
+            'overviewBinaryPath': f'{db_prefix}/{file_stem}_overview.bin',
+            'overviewPoints': overview.n_points,
+            'columns': overview.column_descriptors,
+            'useBinaryFormat': True,
+            'binaryPath': f'{db_prefix}/{file_stem}.bin',
+            'metaPath': f'{db_prefix}/{file_stem}_meta.json',
+            'totalPoints': total_points,
+            'xType': x_type,
+            'xMin': x_min,
+            'xMax': x_max,
+        }
+        if json_export:
+            update_data['jsonPath'] = f'{db_prefix}/{file_stem}.json'
+        if x_format:
+            update_data['xFormat'] = x_format
+        return update_data
+
+
+def mark_file_error(db, file_id: str, error: Exception):
+    """
+    Record a parsing failure on the file document
     
-    # X-axis - always use numeric values (timestamps or original numbers)
-    x_out = [float(x_numeric[i]) for i in selected_indices]
+    Args:
+        db: Database instance
+        file_id: MongoDB file ID
+        error: Exception that stopped parsing
+    """
+    try:
+        db['files'].update_one(
+            {'_id': ObjectId(file_id)},
+            {'$set': {'parsing': f'error: {str(error)}'}}
+        )
+        logger.info(f"Updated file status to error")
+    except Exception as update_error:
+        logger.error(f"Failed to update error status: {update_error}")
+
+
+def estimate_job_memory(local_path: str) -> int:
+    """
+    Estimate the memory a parse job needs, in bytes of raw file
     
-    result.append({
-        'x': True,
-        'name': x_trace['name'],
-        'unit': x_trace.get('unit', ''),
-        'data': x_out
-    })
+    Large CSV files are streamed in bounded chunks, so their weight is
+    capped at the streaming threshold.
     
-    # Channels
-    for ch in channels:
-        ch_out = [ch['data'][i] for i in selected_indices]
-        result.append({
-            'x': False,
-            'name': ch['name'],
-            'unit': ch.get('unit', ''),
-            'color': ch.get('color', '#000000'),
-            'data': ch_out
-        })
+    Args:
+        local_path: Path to the raw file
     
-    overview_meta['overviewPoints'] = len(selected_indices)
-    return result, overview_meta
+    Returns:
+        Estimated weight in bytes
+    """
+    try:
+        size = Path(local_path).stat().st_size
+    except OSError:
+        return 0
+    if Path(local_path).suffix.lower() == '.csv':
+        size = min(size, settings.STREAMING_THRESHOLD_MB * 1024 * 1024)
+    return size
+
+
+# Job runner of a pool process, created by the pool initializer
+_pool_job: Optional[FileParseJob] = None
+
+
+def _init_pool_process():
+    """Set up logging and a database connection in a new pool process"""
+    global _pool_job
+    setup_logging()
+    _pool_job = FileParseJob(get_db(), get_data_folder_path())
+
+
+def run_parse_job(file_id: str):
+    """Pool entry point: parse one file in the current process"""
+    _pool_job.run(file_id)
 
 
 # ===== Worker Class =====
@@ -662,11 +949,25 @@ def generate_overview_data(json_dict: list, target_points_per_channel: int = 500
 class FileParserWorker:
     """File parsing worker using Redis Streams"""
     
+    # Redis read timeout while jobs are running, so finished jobs are acknowledged promptly
+    INFLIGHT_POLL_MS = 200
+    
     def __init__(self):
         """Initialize worker"""
         self.db = get_db()
+        create_indexes()
         self.data_folder_path = get_data_folder_path()
         self.redis = get_redis_client()
+        self.job = FileParseJob(self.db, self.data_folder_path)
+        
+        self.num_processes = settings.PARSER_PROCESSES or os.cpu_count() or 1
+        self.max_inflight_bytes = settings.PARSER_MAX_INFLIGHT_MB * 1024 * 1024
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # future -> (msg_id, file_id, weight in bytes)
+        self._inflight: dict[Future, tuple[bytes, str, int]] = {}
+        self._inflight_bytes = 0
+        # Messages read from Redis but waiting for a free slot or memory budget
+        self._waiting: deque[tuple[bytes, str, int]] = deque()
         
         logger.info("FileParserWorker initialized")
         logger.info(f"Worker name: {settings.WORKER_NAME}")
@@ -679,6 +980,9 @@ class FileParserWorker:
         logger.info(f"Consumer group: {self.redis.PARSER_GROUP}")
         logger.info(f"Batch size: {settings.BATCH_SIZE}")
         logger.info(f"Block time: {settings.BLOCK_TIME_MS}ms")
+        logger.info(f"Parser processes: {self.num_processes}")
+        if self.num_processes > 1:
+            logger.info(f"Max in-flight file size: {settings.PARSER_MAX_INFLIGHT_MB}MB")
         logger.info("=" * 60)
         
         # Health check
@@ -688,6 +992,9 @@ class FileParserWorker:
         
         logger.info("Redis connection established")
         
+        if self.num_processes > 1:
+            self._start_pool()
+        
         last_stats_log = time.time()
         
         while True:
@@ -697,6 +1004,10 @@ class FileParserWorker:
                     self._log_queue_stats()
                     last_stats_log = time.time()
                 
+                if self._pool is not None:
+                    self._run_pool_step()
+                    continue
+                
                 # Read messages from queue (blocking)
                 messages = self.redis.read_messages(
                     consumer_name=settings.WORKER_NAME,
@@ -720,11 +1031,15 @@ class FileParserWorker:
                 logger.error(f"Error in worker loop: {e}", exc_info=True)
                 time.sleep(5)  # Brief pause before retry
         
+        if self._pool is not None:
+            # Unfinished jobs stay unacknowledged in Redis
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        
         logger.info("File Parser Worker stopped")
     
     def _process_message(self, msg_id: bytes, data: dict):
         """
-        Process a single message from the queue
+        Process a single message from the queue in this process
         
         Args:
             msg_id: Redis message ID
@@ -736,165 +1051,102 @@ class FileParserWorker:
         
         logger.info(f"Processing message {msg_id_str} for file {file_id}")
         
+        self.job.run(file_id)
+        
+        # Acknowledge after success or recorded failure (prevents infinite retry)
+        self.redis.acknowledge(msg_id)
+    
+    # ----- Process pool -----
+    
+    def _start_pool(self):
+        """Create the parser process pool"""
+        # Spawn so pool processes open their own MongoDB connections
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.num_processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_pool_process
+        )
+    
+    def _run_pool_step(self):
+        """Acknowledge finished jobs, submit waiting ones, and read more messages"""
+        self._collect_finished(timeout=0)
+        self._submit_waiting()
+        
+        free_slots = self.num_processes - len(self._inflight)
+        if self._waiting or free_slots <= 0:
+            # Wait for a job to finish before taking more work
+            self._collect_finished(timeout=settings.BLOCK_TIME_MS / 1000)
+            return
+        
+        messages = self.redis.read_messages(
+            consumer_name=settings.WORKER_NAME,
+            count=min(settings.BATCH_SIZE, free_slots),
+            block_ms=self.INFLIGHT_POLL_MS if self._inflight else settings.BLOCK_TIME_MS
+        )
+        
+        for stream_name, message_list in messages:
+            for msg_id, data in message_list:
+                file_id = data[b'file_id'].decode('utf-8')
+                self._waiting.append((msg_id, file_id, self._job_weight(file_id)))
+        
+        self._submit_waiting()
+    
+    def _job_weight(self, file_id: str) -> int:
+        """Estimated memory of parsing a file (0 if it cannot be determined)"""
         try:
-            # Get file from database
-            file_doc = self.db['files'].find_one({'_id': ObjectId(file_id)})
-            
-            if not file_doc:
-                logger.error(f"File not found in database: {file_id}")
-                self.redis.acknowledge(msg_id)
-                return
-            
-            file_name = file_doc.get('name', 'unknown')
-            logger.info(f"Parsing file: {file_name}")
-            
-            # Parse file
-            json_dict = parse_file(self.db, file_doc, self.data_folder_path)
-            
-            # Determine total points from x-axis
-            x_trace = next(d for d in json_dict if d['x'])
-            total_points = len(x_trace['data'])
-            
-            # Setup paths
-            local_folder = Path(file_doc["rawPath"]).parent
-            file_stem = Path(file_doc["rawPath"]).stem
-            output_dir = Path(self.data_folder_path) / local_folder
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            project_id = local_folder.parent.name if local_folder.parent.name else str(local_folder.parent)
-            file_id_name = local_folder.name
-            
-            # Determine x-axis type from parsed data (needed for both storage paths)
-            x_data = x_trace['data']
-            x_is_time = isinstance(x_data[0], str) if x_data else False
-
-            if x_is_time:
-                sample_strings = x_data[:10]
-                detected_format = detect_time_format(sample_strings)
-                if detected_format:
-                    x_type = 'timestamp'
-                    x_format = detected_format
-                    # Convert to timestamps to get min/max
-                    x_numeric, _ = convert_times_to_timestamps(x_data, detected_format)
-                    x_min = float(x_numeric[0])
-                    x_max = float(x_numeric[-1])
-                else:
-                    x_type = 'numeric'
-                    x_format = None
-                    x_min = 0
-                    x_max = total_points - 1
-            else:
-                x_type = 'numeric'
-                x_format = None
-                x_numeric = np.array(x_data, dtype=np.float64)
-                x_min = float(x_numeric[0])
-                x_max = float(x_numeric[-1])
-
-            # Determine storage format based on size
-            use_binary_format = total_points >= BINARY_FORMAT_THRESHOLD
-
-            if use_binary_format:
-                logger.info(f"Using binary format for large file: {total_points} points")
-                
-                # Save binary format
-                binary_base_path = str(output_dir / file_stem)
-                save_as_binary_format(json_dict, binary_base_path)
-                
-                # Generate and save overview data for initial display
-                overview_data, overview_meta = generate_overview_data(json_dict, target_points_per_channel=5000)
-                overview_path = f"{local_folder}/{file_stem}_overview.json"
-                overview_file_path = Path(self.data_folder_path) / overview_path
-                
-                # Save overview with metadata embedded
-                overview_output = {
-                    'meta': overview_meta,
-                    'data': overview_data
-                }
-                with open(overview_file_path, 'w') as f:
-                    json.dump(overview_output, f, ignore_nan=True)
-                
-                logger.info(f"Saved overview to {overview_path}")
-                
-                # Also save full JSON for backward compatibility (optional, can be removed later)
-                json_path = f"{local_folder}/{file_stem}.json"
-                json_file_path = Path(self.data_folder_path) / json_path
-                
-                with open(json_file_path, 'w') as f:
-                    json.dump(json_dict, f, ignore_nan=True)
-                
-                # Update database with binary format info
-                update_data = {
-                    'parsing': 'parsed',
-                    'jsonPath': f'{project_id}/{file_id_name}/{file_stem}.json',
-                    'binaryPath': f'{project_id}/{file_id_name}/{file_stem}.bin',
-                    'metaPath': f'{project_id}/{file_id_name}/{file_stem}_meta.json',
-                    'overviewPath': f'{project_id}/{file_id_name}/{file_stem}_overview.json',
-                    'useBinaryFormat': True,
-                    'totalPoints': total_points,
-                    'xType': x_type,
-                    'xMin': x_min,
-                    'xMax': x_max,
-                }
-                if x_format:
-                    update_data['xFormat'] = x_format
-                
-                self.db['files'].update_one(
-                    {'_id': file_doc['_id']},
-                    {'$set': update_data}
-                )
-                
-                logger.info(f"Successfully processed large file: {file_name} ({total_points} points, xType={x_type})")
-            
-            else:
-                logger.info(f"Using JSON format for small file: {total_points} points")
-                
-                # Save JSON (original behavior)
-                json_path = f"{local_folder}/{file_stem}.json"
-                json_file_path = Path(self.data_folder_path) / json_path
-                
-                with open(json_file_path, 'w') as f:
-                    json.dump(json_dict, f, ignore_nan=True)
-                
-                logger.info(f"Saved JSON to {json_path}")
-                
-                # Update database
-                update_data = {
-                    'parsing': 'parsed',
-                    'jsonPath': f'{project_id}/{file_id_name}/{file_stem}.json',
-                    'useBinaryFormat': False,
-                    'totalPoints': total_points,
-                    'xType': x_type,
-                    'xMin': x_min,
-                    'xMax': x_max,
-                }
-                if x_format:
-                    update_data['xFormat'] = x_format
-
-                self.db['files'].update_one(
-                    {'_id': file_doc['_id']},
-                    {'$set': update_data}
-                )
-
-                logger.info(f"Successfully processed file: {file_name} ({total_points} points, xType={x_type})")
-            
-            # Acknowledge success
-            self.redis.acknowledge(msg_id)
-            
-        except Exception as e:
-            logger.error(f"Failed to process file {file_id}: {e}", exc_info=True)
-            
-            # Update file status with error
-            try:
-                self.db['files'].update_one(
-                    {'_id': ObjectId(file_id)},
-                    {'$set': {'parsing': f'error: {str(e)}'}}
-                )
-                logger.info(f"Updated file status to error")
-            except Exception as update_error:
-                logger.error(f"Failed to update error status: {update_error}")
+            file_doc = self.db['files'].find_one({'_id': ObjectId(file_id)}, {'rawPath': 1})
+        except Exception:
+            return 0
+        if not file_doc or 'rawPath' not in file_doc:
+            return 0
+        return estimate_job_memory(f'{self.data_folder_path}/{file_doc["rawPath"]}')
+    
+    def _submit_waiting(self):
+        """Submit waiting messages in order while slots and memory budget allow"""
+        while self._waiting and len(self._inflight) < self.num_processes:
+            msg_id, file_id, weight = self._waiting[0]
+            # A file larger than the whole budget runs alone
+            if self._inflight and self._inflight_bytes + weight > self.max_inflight_bytes:
+                break
             
-            # Acknowledge to prevent infinite retry
+            self._waiting.popleft()
+            logger.info(f"Processing message {msg_id.decode('utf-8')} for file {file_id} "
+                        f"(~{weight / 1024 / 1024:.1f}MB, {len(self._inflight) + 1} in flight)")
+            future = self._pool.submit(run_parse_job, file_id)
+            self._inflight[future] = (msg_id, file_id, weight)
+            self._inflight_bytes += weight
+    
+    def _collect_finished(self, timeout: float):
+        """
+        Acknowledge messages whose jobs have finished
+        
+        Args:
+            timeout: Seconds to wait for at least one job to finish
+        """
+        if not self._inflight:
+            return
+        
+        done, _ = wait(list(self._inflight), timeout=timeout, return_when=FIRST_COMPLETED)
+        
+        # A crashed process (e.g. killed for memory) fails every job of the pool
+        pool_broken = any(isinstance(f.exception(), BrokenProcessPool) for f in done)
+        if pool_broken:
+            done, _ = wait(list(self._inflight))
+        
+        for future in done:
+            msg_id, file_id, weight = self._inflight.pop(future)
+            self._inflight_bytes -= weight
+            error = future.exception()
+            if error is not None:
+                # Jobs record their own errors, so this is a crashed pool process
+                logger.error(f"Parse job for file {file_id} failed: {error}")
+                mark_file_error(self.db, file_id, error)
             self.redis.acknowledge(msg_id)
+        
+        if pool_broken:
+            logger.warning("Parser process pool broken, restarting it")
+            self._pool.shutdown(wait=False)
+            self._start_pool()
     
     def _log_queue_stats(self):
         """Log queue statistics"""
@@ -902,6 +1154,9 @@ class FileParserWorker:
             queue_len = self.redis.get_queue_length()
             pending = self.redis.get_pending_count()
             logger.info(f"Queue stats - Total messages: {queue_len}, Pending ACK: {pending}")
+            if self._pool is not None:
+                logger.info(f"Parse jobs - In flight: {len(self._inflight)} "
+                            f"(~{self._inflight_bytes / 1024 / 1024:.1f}MB), Waiting: {len(self._waiting)}")
         except Exception as e:
             logger.error(f"Failed to get queue stats: {e}")
 